@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import json
+import sys
+from argparse import ArgumentParser
+
+from benchmarks.cases import default_suite
+from benchmarks.report import (compare_reports, format_regressions,
+                               format_results, load_report, make_report,
+                               save_report)
+from fs.manager.profiler import PROFILE_FORMATS, profiled
+
+
+def parser_factory() -> ArgumentParser:
+    """
+    Create arg parser for benchmarks runner.
+    """
+
+    parser = ArgumentParser(
+        description="Measure fs commands throughput and latency.",
+    )
+
+    parser.add_argument(
+        "--iterations",
+        action="store",
+        type=int,
+        default=50,
+        metavar="n",
+        help="timed runs of every benchmark.",
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store",
+        type=int,
+        default=5,
+        metavar="n",
+        help="untimed runs of every benchmark before measuring.",
+    )
+    parser.add_argument(
+        "--seed",
+        action="store",
+        type=int,
+        default=0,
+        metavar="seed",
+        help="seed for random generators to make runs reproducible.",
+    )
+    parser.add_argument(
+        "--filter",
+        action="store",
+        type=str,
+        default="",
+        metavar="name",
+        help="run only benchmarks which name contains `name`.",
+    )
+    parser.add_argument(
+        "--output",
+        action="store",
+        type=str,
+        metavar="path",
+        help="save JSON report to `path`.",
+    )
+    parser.add_argument(
+        "--baseline",
+        action="store",
+        type=str,
+        metavar="path",
+        help="compare results with JSON report stored at `path`.",
+    )
+    parser.add_argument(
+        "--threshold",
+        action="store",
+        type=float,
+        default=0.2,
+        metavar="fraction",
+        help="relative slowdown against baseline treated as regression.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store",
+        type=str,
+        metavar="out",
+        help="profile the whole run, save results to `out`.",
+    )
+    parser.add_argument(
+        "--profile-format",
+        action="store",
+        choices=PROFILE_FORMATS,
+        default="pstats",
+        help="format of `--profile` output: pstats or collapsed stacks.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        default=False,
+        help="print JSON report instead of a table.",
+    )
+
+    return parser
+
+
+def main() -> int:
+    parser = parser_factory()
+    args = parser.parse_args()
+
+    with profiled(args.profile, args.profile_format):
+        results = [
+            benchmark.run(args.iterations, warmup=args.warmup, seed=args.seed)
+            for benchmark in default_suite()
+            if args.filter in benchmark.name
+        ]
+
+    report = make_report(
+        results, iterations=args.iterations, warmup=args.warmup, seed=args.seed
+    )
+
+    if args.output:
+        save_report(report, args.output)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_results(report))
+
+    if args.baseline:
+        regressions = compare_reports(
+            load_report(args.baseline), report, args.threshold
+        )
+
+        if regressions:
+            print(f"\nRegressions against `{args.baseline}`:", file=sys.stderr)
+            print(format_regressions(regressions), file=sys.stderr)
+            return 1
+
+        print(f"\nNo regressions against `{args.baseline}`.", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
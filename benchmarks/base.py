@@ -0,0 +1,171 @@
+import contextlib
+import os
+import random
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Generator
+from dataclasses import dataclass, field
+from typing import Any
+
+from constants import N_DESCRIPTORS, PATH_DIVIDER
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.umount import UmountCommand
+from fs.exceptions import FSNotMounted
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    params: dict[str, Any]
+    iterations: int
+    total_s: float
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p99_us: float
+    min_us: float
+    max_us: float
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]"
+
+
+@dataclass
+class BenchmarkContext:
+    """
+    Values shared between setup, timed run and teardown of a benchmark.
+    """
+
+    values: dict[str, Any] = field(default_factory=dict)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of already sorted `samples`, `q` in [0, 100].
+    """
+
+    if not samples:
+        return 0.0
+
+    rank = max(int(round(q / 100 * len(samples) + 0.5)) - 1, 0)
+
+    return samples[min(rank, len(samples) - 1)]
+
+
+@contextlib.contextmanager
+def isolated_workdir() -> Generator[str, Any, Any]:
+    """
+    Run fs commands inside a temporary directory, so benchmarks never touch
+    memory and config files of a real volume.
+    """
+
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix="fs-bench-") as workdir:
+        os.chdir(workdir)
+
+        try:
+            yield workdir
+        finally:
+            os.chdir(cwd)
+
+
+def format_fs(n: int = N_DESCRIPTORS, **mount_kwargs: Any) -> None:
+    try:
+        UmountCommand().exec()
+    except FSNotMounted:
+        pass
+
+    MountCommand(**mount_kwargs).exec()
+    MkfsCommand(n=n).exec()
+
+
+def make_nested_dirs(depth: int, name: str = "d") -> str:
+    """
+    Create `depth` nested directories and return absolute path of the deepest.
+    """
+
+    path = ""
+
+    for i in range(depth):
+        path += f"{PATH_DIVIDER}{name}{i}"
+        MkdirCommand(path=path).exec()
+
+    return path
+
+
+class BaseBenchmark(ABC):
+    name: str = ""
+
+    def __init__(self, **params: Any) -> None:
+        self.params = params
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        """
+        Prepare fs once before all iterations.
+        """
+
+        format_fs()
+
+    def before_each(self, ctx: BenchmarkContext) -> None:
+        """
+        Untimed preparation of every iteration.
+        """
+
+    def after_each(self, ctx: BenchmarkContext) -> None:
+        """
+        Untimed cleanup of every iteration.
+        """
+
+    @abstractmethod
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        raise NotImplementedError("Benchmark must implement its run_once method.")
+
+    def run(self, iterations: int, warmup: int = 0, seed: int = 0) -> BenchmarkResult:
+        random.seed(seed)
+        ctx = BenchmarkContext()
+
+        with isolated_workdir():
+            self.setup(ctx)
+
+            for _ in range(warmup):
+                self.before_each(ctx)
+                self.run_once(ctx)
+                self.after_each(ctx)
+
+            samples = []
+
+            for _ in range(iterations):
+                self.before_each(ctx)
+
+                started = time.perf_counter()
+                self.run_once(ctx)
+                samples.append(time.perf_counter() - started)
+
+                self.after_each(ctx)
+
+            UmountCommand().exec()
+
+        return self._summarize(samples)
+
+    def _summarize(self, samples: list[float]) -> BenchmarkResult:
+        total = sum(samples)
+        samples_us = sorted(s * 1e6 for s in samples)
+
+        return BenchmarkResult(
+            name=self.name,
+            params=self.params,
+            iterations=len(samples),
+            total_s=total,
+            ops_per_sec=len(samples) / total if total else 0.0,
+            mean_us=sum(samples_us) / len(samples_us) if samples_us else 0.0,
+            p50_us=percentile(samples_us, 50),
+            p99_us=percentile(samples_us, 99),
+            min_us=samples_us[0] if samples_us else 0.0,
+            max_us=samples_us[-1] if samples_us else 0.0,
+        )
@@ -0,0 +1,288 @@
+from benchmarks.base import (BaseBenchmark, BenchmarkContext, format_fs,
+                             make_nested_dirs)
+from constants import (ALLOCATION_POLICIES, BLOCK_CONTENT_SIZE_BYTES,
+                       DURABILITY_MODES, N_DESCRIPTORS, PATH_DIVIDER)
+from fs.commands.close import CloseCommand
+from fs.commands.create import CreateCommand
+from fs.commands.cwd import CwdCommand
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.open import OpenCommand
+from fs.commands.read import ReadCommand
+from fs.commands.truncate import TruncateCommand
+from fs.commands.write import WriteCommand
+from fs.driver.state import SystemState
+
+
+def open_file(path: str) -> str:
+    """
+    Open file by absolute `path` and return its fd.
+    """
+
+    OpenCommand(path=path).exec()
+
+    fds = [
+        fd
+        for fd, fd_path in SystemState().get_fd_to_path_mapping().items()
+        if fd_path == path
+    ]
+
+    return fds[-1]
+
+
+def close_file(path: str) -> None:
+    for fd, fd_path in list(SystemState().get_fd_to_path_mapping().items()):
+        if fd_path == path:
+            CloseCommand(fd=fd).exec()
+
+
+class MkfsBenchmark(BaseBenchmark):
+    """
+    Format a mounted volume.
+    """
+
+    name = "mkfs"
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        MkfsCommand(n=N_DESCRIPTORS).exec()
+
+
+class CreateBenchmark(BaseBenchmark):
+    """
+    Create a file in a directory already holding `fanout` entries.
+    """
+
+    name = "create"
+
+    def before_each(self, ctx: BenchmarkContext) -> None:
+        format_fs()
+
+        for i in range(self.params["fanout"]):
+            CreateCommand(path=f"{PATH_DIVIDER}f{i}").exec()
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        CreateCommand(path=f"{PATH_DIVIDER}new").exec()
+
+
+class MkdirBenchmark(BaseBenchmark):
+    """
+    Create a directory in a directory already holding `fanout` entries.
+    """
+
+    name = "mkdir"
+
+    def before_each(self, ctx: BenchmarkContext) -> None:
+        format_fs()
+
+        for i in range(self.params["fanout"]):
+            MkdirCommand(path=f"{PATH_DIVIDER}d{i}").exec()
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        MkdirCommand(path=f"{PATH_DIVIDER}new").exec()
+
+
+class OpenBenchmark(BaseBenchmark):
+    """
+    Open a file placed `depth` directories below root.
+    """
+
+    name = "open"
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        super().setup(ctx)
+
+        directory = make_nested_dirs(self.params["depth"])
+        ctx.values["path"] = f"{directory}{PATH_DIVIDER}f"
+
+        CreateCommand(path=ctx.values["path"]).exec()
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        OpenCommand(path=ctx.values["path"]).exec()
+
+    def after_each(self, ctx: BenchmarkContext) -> None:
+        close_file(ctx.values["path"])
+
+
+class WriteBenchmark(BaseBenchmark):
+    """
+    Write `size` bytes at the beginning of an opened file.
+    """
+
+    name = "write"
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        super().setup(ctx)
+
+        path = f"{PATH_DIVIDER}f"
+        CreateCommand(path=path).exec()
+
+        ctx.values["fd"] = open_file(path)
+        ctx.values["content"] = "x" * self.params["size"]
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        WriteCommand(
+            fd=ctx.values["fd"], offset=0, content=ctx.values["content"]
+        ).exec()
+
+
+class ReadBenchmark(BaseBenchmark):
+    """
+    Read `size` bytes from the beginning of an opened file.
+    """
+
+    name = "read"
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        super().setup(ctx)
+
+        path = f"{PATH_DIVIDER}f"
+        CreateCommand(path=path).exec()
+
+        ctx.values["fd"] = open_file(path)
+        WriteCommand(
+            fd=ctx.values["fd"], offset=0, content="x" * self.params["size"]
+        ).exec()
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        ReadCommand(fd=ctx.values["fd"], offset=0, size=self.params["size"]).exec()
+
+
+class TruncateBenchmark(BaseBenchmark):
+    """
+    Shrink a file of `size` bytes to a half of its size.
+    """
+
+    name = "truncate"
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        super().setup(ctx)
+
+        ctx.values["path"] = f"{PATH_DIVIDER}f"
+        CreateCommand(path=ctx.values["path"]).exec()
+
+        ctx.values["fd"] = open_file(ctx.values["path"])
+
+    def before_each(self, ctx: BenchmarkContext) -> None:
+        WriteCommand(
+            fd=ctx.values["fd"], offset=0, content="x" * self.params["size"]
+        ).exec()
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        TruncateCommand(path=ctx.values["path"], size=self.params["size"] // 2).exec()
+
+
+class LsBenchmark(BaseBenchmark):
+    """
+    List a directory holding `fanout` files.
+    """
+
+    name = "ls"
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        super().setup(ctx)
+
+        for i in range(self.params["fanout"]):
+            CreateCommand(path=f"{PATH_DIVIDER}f{i}").exec()
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        LsCommand().exec()
+
+
+class ResolveBenchmark(BaseBenchmark):
+    """
+    Resolve a path going `depth` directories below root.
+    """
+
+    name = "resolve"
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        super().setup(ctx)
+
+        directory = make_nested_dirs(self.params["depth"])
+        ctx.values["path"] = f"{directory}{PATH_DIVIDER}f"
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        CwdCommand().resolve_path(ctx.values["path"])
+
+
+class DurabilityBenchmark(BaseBenchmark):
+    """
+    Create and write a file on a volume mounted with `durability` mode,
+    including the syncs the mode makes after every command.
+    """
+
+    name = "durability"
+
+    def before_each(self, ctx: BenchmarkContext) -> None:
+        format_fs(durability=self.params["mode"], journal=self.params["journal"])
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        CreateCommand(path=f"{PATH_DIVIDER}new").run()
+
+        fd = open_file(f"{PATH_DIVIDER}new")
+        WriteCommand(fd=fd, offset=0, content="x" * self.params["size"]).run()
+
+
+class AllocationBenchmark(BaseBenchmark):
+    """
+    Read a whole file which grew block by block interleaved with files of
+    other directories, on a volume mounted with `allocation` policy.
+    """
+
+    name = "allocation"
+    n_files = 3
+
+    def setup(self, ctx: BenchmarkContext) -> None:
+        format_fs(allocation=self.params["allocation"])
+
+        fds = []
+
+        for i in range(self.n_files):
+            MkdirCommand(path=f"{PATH_DIVIDER}d{i}").exec()
+            CreateCommand(path=f"{PATH_DIVIDER}d{i}{PATH_DIVIDER}f").exec()
+            fds.append(open_file(f"{PATH_DIVIDER}d{i}{PATH_DIVIDER}f"))
+
+        # Every round grows each file by a block.
+        for blocks in range(1, self.params["blocks"] + 1):
+            for fd in fds:
+                WriteCommand(
+                    fd=fd, offset=0, content="x" * blocks * BLOCK_CONTENT_SIZE_BYTES
+                ).exec()
+
+        ctx.values["fd"] = fds[0]
+        ctx.values["size"] = self.params["blocks"] * BLOCK_CONTENT_SIZE_BYTES
+
+    def run_once(self, ctx: BenchmarkContext) -> None:
+        ReadCommand(fd=ctx.values["fd"], offset=0, size=ctx.values["size"]).exec()
+
+
+def default_suite() -> list[BaseBenchmark]:
+    """
+    Benchmarks scaled by directory fan-out, file size and path depth.
+    """
+
+    fanouts = (0, 4, 8)
+    sizes = (16, 256, 1024)
+    depths = (1, 4, 8)
+
+    return [
+        MkfsBenchmark(),
+        *(CreateBenchmark(fanout=n) for n in fanouts),
+        *(MkdirBenchmark(fanout=n) for n in fanouts),
+        *(LsBenchmark(fanout=max(n, 1)) for n in fanouts),
+        *(WriteBenchmark(size=size) for size in sizes),
+        *(ReadBenchmark(size=size) for size in sizes),
+        *(TruncateBenchmark(size=size) for size in sizes),
+        *(OpenBenchmark(depth=depth) for depth in depths),
+        *(ResolveBenchmark(depth=depth) for depth in depths),
+        *(
+            DurabilityBenchmark(mode=mode, journal=journal, size=256)
+            for mode in DURABILITY_MODES
+            for journal in (False, True)
+        ),
+        *(
+            AllocationBenchmark(allocation=allocation, blocks=8)
+            for allocation in ALLOCATION_POLICIES
+        ),
+    ]
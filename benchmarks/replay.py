@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+import json
+import sys
+import time
+from argparse import ArgumentParser
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any
+
+from tabulate import tabulate
+
+from benchmarks.base import format_fs, isolated_workdir, percentile
+from constants import BLOCK_SIZE_BYTES, MEMORY_PATH
+from fs.driver.trace import OP_NAMES, OP_READ, TraceRecord, read_trace
+
+
+def simulate_lru(records: list[TraceRecord], cache_size: int) -> float:
+    """
+    Hit ratio of block accesses served by LRU cache of `cache_size` blocks.
+    """
+
+    cache: OrderedDict[int, None] = OrderedDict()
+    hits = 0
+
+    for record in records:
+        if record.block_n in cache:
+            hits += 1
+            cache.move_to_end(record.block_n)
+            continue
+
+        cache[record.block_n] = None
+
+        if len(cache) > cache_size:
+            cache.popitem(last=False)
+
+    return hits / len(records) if records else 0.0
+
+
+def summarize(
+    records: list[TraceRecord], cache_sizes: list[int], top: int = 10
+) -> dict[str, Any]:
+    distances = sorted(
+        abs(record.block_n - prev.block_n) for prev, record in zip(records, records[1:])
+    )
+    sequential = sum(
+        record.block_n == prev.block_n + 1 for prev, record in zip(records, records[1:])
+    )
+
+    commands: dict[str, Counter] = defaultdict(Counter)
+
+    for record in records:
+        commands[record.command][OP_NAMES[record.op]] += 1
+        commands[record.command]["bytes"] += record.size
+
+    return {
+        "ops": dict(Counter(OP_NAMES[record.op] for record in records)),
+        "bytes": sum(record.size for record in records),
+        "unique_blocks": len({record.block_n for record in records}),
+        "seek_distance": {
+            "mean": sum(distances) / len(distances) if distances else 0.0,
+            "p50": percentile(distances, 50),
+            "p99": percentile(distances, 99),
+            "max": distances[-1] if distances else 0,
+        },
+        "locality": {
+            "same_block": distances.count(0) / len(distances) if distances else 0.0,
+            "sequential": sequential / len(distances) if distances else 0.0,
+        },
+        "hot_blocks": Counter(record.block_n for record in records).most_common(top),
+        "commands": {name: dict(counter) for name, counter in commands.items()},
+        "lru_hit_ratio": {
+            str(size): simulate_lru(records, size) for size in cache_sizes
+        },
+    }
+
+
+def replay(records: list[TraceRecord]) -> dict[str, Any]:
+    """
+    Re-execute block I/O of the trace against a fresh image.
+    """
+
+    samples = []
+
+    with isolated_workdir():
+        format_fs()
+
+        with open(MEMORY_PATH, "r+b") as m:
+            last_block_n = max((record.block_n for record in records), default=0)
+            m.truncate(max(m.seek(0, 2), (last_block_n + 1) * BLOCK_SIZE_BYTES))
+
+            for record in records:
+                started = time.perf_counter()
+                m.seek(record.block_n * BLOCK_SIZE_BYTES)
+
+                if record.op == OP_READ:
+                    m.read(record.size)
+                else:
+                    m.write(bytes(record.size))
+
+                samples.append(time.perf_counter() - started)
+
+    samples_us = sorted(sample * 1e6 for sample in samples)
+    total = sum(samples)
+
+    return {
+        "elapsed_s": total,
+        "ops_per_sec": len(samples) / total if total else 0.0,
+        "p50_us": percentile(samples_us, 50),
+        "p99_us": percentile(samples_us, 99),
+    }
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    rows = [
+        ["ops", ", ".join(f"{op}={n}" for op, n in summary["ops"].items())],
+        ["bytes", summary["bytes"]],
+        ["unique blocks", summary["unique_blocks"]],
+        *(
+            [f"seek distance {name}", f"{value:.1f}"]
+            for name, value in summary["seek_distance"].items()
+        ),
+        *(
+            [f"{name} access", f"{value:.1%}"]
+            for name, value in summary["locality"].items()
+        ),
+        [
+            "hot blocks",
+            ", ".join(f"{block_n}({n})" for block_n, n in summary["hot_blocks"]),
+        ],
+        *(
+            [f"lru hit ratio, {size} blocks", f"{value:.1%}"]
+            for size, value in summary["lru_hit_ratio"].items()
+        ),
+    ]
+
+    if "replay" in summary:
+        rows += [
+            [f"replay {name}", f"{value:.4g}"]
+            for name, value in summary["replay"].items()
+        ]
+
+    commands = tabulate(
+        [
+            [name, counter.get("read", 0), counter.get("write", 0), counter["bytes"]]
+            for name, counter in summary["commands"].items()
+        ],
+        headers=["command", "reads", "writes", "bytes"],
+    )
+
+    return tabulate(rows, headers=["metric", "value"]) + "\n\n" + commands
+
+
+def parser_factory() -> ArgumentParser:
+    """
+    Create arg parser for trace replay tool.
+    """
+
+    parser = ArgumentParser(
+        description="Replay block I/O trace and summarize access pattern.",
+    )
+
+    parser.add_argument("trace", type=str, help="trace file recorded with `--trace`.")
+    parser.add_argument(
+        "--cache-size",
+        action="store",
+        nargs="+",
+        type=int,
+        default=[4, 16, 64],
+        metavar="n",
+        help="simulate LRU block caches of `n` blocks.",
+    )
+    parser.add_argument(
+        "--no-replay",
+        action="store_true",
+        default=False,
+        help="only analyze the trace, do not re-execute it.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        default=False,
+        help="print JSON summary instead of a table.",
+    )
+
+    return parser
+
+
+def main() -> int:
+    args = parser_factory().parse_args()
+
+    records = list(read_trace(args.trace))
+    summary = summarize(records, args.cache_size)
+
+    if not args.no_replay:
+        summary["replay"] = replay(records)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_summary(summary))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import json
+import platform
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from tabulate import tabulate
+
+from benchmarks.base import BenchmarkResult
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+
+def make_report(results: list[BenchmarkResult], **meta: Any) -> dict[str, Any]:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            **meta,
+        },
+        "results": [{"key": result.key, **asdict(result)} for result in results],
+    }
+
+
+def load_report(path: str) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report: dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[Regression]:
+    """
+    Find benchmarks that lost more than `threshold` (a fraction) of throughput
+    or got their tail latency that much worse compared to `baseline`.
+    """
+
+    baseline_results = {result["key"]: result for result in baseline["results"]}
+    regressions = []
+
+    for result in current["results"]:
+        base = baseline_results.get(result["key"])
+
+        if base is None:
+            continue
+
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                Regression(
+                    result["key"],
+                    "ops_per_sec",
+                    base["ops_per_sec"],
+                    result["ops_per_sec"],
+                )
+            )
+
+        if result["p99_us"] > base["p99_us"] * (1 + threshold):
+            regressions.append(
+                Regression(result["key"], "p99_us", base["p99_us"], result["p99_us"])
+            )
+
+    return regressions
+
+
+def format_results(report: dict[str, Any]) -> str:
+    headers = ["benchmark", "iterations", "ops/sec", "p50, us", "p99, us"]
+    rows = [
+        [
+            result["key"],
+            result["iterations"],
+            f"{result['ops_per_sec']:.1f}",
+            f"{result['p50_us']:.1f}",
+            f"{result['p99_us']:.1f}",
+        ]
+        for result in report["results"]
+    ]
+
+    return tabulate(rows, headers=headers)
+
+
+def format_regressions(regressions: list[Regression]) -> str:
+    headers = ["benchmark", "metric", "baseline", "current", "change"]
+    rows = [
+        [r.key, r.metric, f"{r.baseline:.1f}", f"{r.current:.1f}", f"{r.change:+.1%}"]
+        for r in regressions
+    ]
+
+    return tabulate(rows, headers=headers)
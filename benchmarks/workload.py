@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from tabulate import tabulate
+
+from benchmarks.base import format_fs, isolated_workdir, percentile
+from constants import N_DESCRIPTORS, PATH_DIVIDER
+from fs.driver.state import SystemState
+from fs.exceptions import OutOfBlocks, OutOfDescriptors
+from fs.manager.cli import FsManager
+from fs.manager.profiler import PROFILE_FORMATS, profiled
+
+# Relative weights of operations in every workload mix.
+WORKLOAD_MIXES: dict[str, dict[str, int]] = {
+    "metadata-heavy": {
+        "mkdir": 3,
+        "create": 3,
+        "ls": 3,
+        "fstat": 2,
+        "unlink": 2,
+        "rmdir": 2,
+        "cd": 1,
+    },
+    "small-file": {
+        "create": 2,
+        "open": 1,
+        "write": 4,
+        "read": 4,
+        "close": 1,
+        "unlink": 1,
+    },
+    "large-sequential": {
+        "write": 5,
+        "read": 5,
+        "truncate": 1,
+    },
+    "deep-paths": {
+        "mkdir": 3,
+        "create": 2,
+        "open": 3,
+        "close": 3,
+        "cd": 1,
+    },
+    "hard-links": {
+        "create": 1,
+        "link": 4,
+        "unlink": 4,
+        "fstat": 1,
+    },
+}
+
+# Default size distributions of written data per mix.
+WORKLOAD_SIZES = {
+    "metadata-heavy": "fixed:16",
+    "small-file": "uniform:1:64",
+    "large-sequential": "uniform:512:2048",
+    "deep-paths": "fixed:16",
+    "hard-links": "fixed:16",
+}
+
+# Latency histogram buckets are powers of two microseconds.
+HISTOGRAM_MAX_BUCKET = 24
+
+
+def size_distribution(spec: str, rng: random.Random) -> Callable[[], int]:
+    """
+    Build sizes generator from `fixed:n`, `uniform:a:b` or `exp:mean` spec.
+    """
+
+    kind, *params = spec.split(":")
+    values = [int(param) for param in params]
+
+    if kind == "fixed":
+        return lambda: values[0]
+
+    elif kind == "uniform":
+        return lambda: rng.randint(values[0], values[1])
+
+    elif kind == "exp":
+        return lambda: max(int(rng.expovariate(1 / values[0])), 1)
+
+    raise ValueError(f"Unknown size distribution `{spec}`.")
+
+
+@dataclass
+class WorkerResult:
+    ops: int = 0
+    errors: Counter = field(default_factory=Counter)
+    resets: int = 0
+    elapsed: float = 0.0
+    samples: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+
+
+class WorkloadModel:
+    """
+    Track fs objects created by the workload to pick valid operation args.
+    """
+
+    def __init__(self, rng: random.Random, next_size: Callable[[], int]) -> None:
+        self.rng = rng
+        self.next_size = next_size
+        self.reset()
+
+    def reset(self) -> None:
+        self.files: list[str] = []
+        self.dirs: list[str] = [""]
+        self.children: Counter = Counter()
+        self.fds: dict[str, str] = {}
+        self.cwd = ""
+        self._name_n = 0
+
+    def _new_path(self, directory: str, prefix: str) -> str:
+        self._name_n += 1
+        return f"{directory}{PATH_DIVIDER}{prefix}{self._name_n}"
+
+    @staticmethod
+    def _parent(path: str) -> str:
+        return path.rsplit(PATH_DIVIDER, maxsplit=1)[0]
+
+    def plan(self, op: str) -> tuple[str, dict[str, Any]]:
+        """
+        Pick command and its kwargs for `op`, falling back to a feasible one.
+        """
+
+        rng = self.rng
+
+        if op in ("open", "write", "read", "truncate", "unlink", "link", "close"):
+            if not self.files:
+                op = "create"
+
+        if op == "close" and not self.fds:
+            op = "open"
+
+        if op == "rmdir":
+            empty_dirs = [
+                d for d in self.dirs[1:] if not self.children[d] and d != self.cwd
+            ]
+
+            if not empty_dirs:
+                op = "mkdir"
+
+        if op == "create":
+            path = self._new_path(rng.choice(self.dirs), "f")
+            return op, dict(path=path)
+
+        elif op == "mkdir":
+            # Nest new directories under the deepest one to grow path depth.
+            parent = (
+                max(self.dirs, key=len) if rng.random() < 0.5 else rng.choice(self.dirs)
+            )
+            return op, dict(path=self._new_path(parent, "d"))
+
+        elif op == "rmdir":
+            return op, dict(path=rng.choice(empty_dirs))
+
+        elif op == "open":
+            return op, dict(path=rng.choice(self.files))
+
+        elif op == "close":
+            return op, dict(fd=rng.choice(list(self.fds.values())))
+
+        elif op in ("write", "read"):
+            path = rng.choice(self.files)
+
+            if path not in self.fds:
+                return "open", dict(path=path)
+
+            size = self.next_size()
+
+            if op == "write":
+                return op, dict(fd=self.fds[path], offset=0, content="x" * size)
+
+            return op, dict(fd=self.fds[path], offset=0, size=max(size, 1))
+
+        elif op == "truncate":
+            return op, dict(path=rng.choice(self.files), size=self.next_size() // 2)
+
+        elif op == "unlink":
+            path = rng.choice(self.files)
+
+            if path in self.fds:
+                return "close", dict(fd=self.fds[path])
+
+            return op, dict(path=path)
+
+        elif op == "link":
+            path = rng.choice(self.files)
+            return op, dict(path1=path, path2=self._new_path(self._parent(path), "l"))
+
+        elif op == "fstat":
+            return op, dict(fid=rng.randrange(N_DESCRIPTORS))
+
+        elif op == "cd":
+            # Root can't be reached by an absolute path, stay in place then.
+            return op, dict(path=rng.choice(self.dirs[1:] or ["."]))
+
+        return op, dict()
+
+    def apply(self, op: str, kwargs: dict[str, Any]) -> None:
+        """
+        Update model after successfully executed command.
+        """
+
+        if op in ("create", "link"):
+            path = kwargs.get("path") or kwargs["path2"]
+            self.files.append(path)
+            self.children[self._parent(path)] += 1
+
+        elif op == "mkdir":
+            self.dirs.append(kwargs["path"])
+            self.children[self._parent(kwargs["path"])] += 1
+
+        elif op == "rmdir":
+            self.dirs.remove(kwargs["path"])
+            self.children[self._parent(kwargs["path"])] -= 1
+
+        elif op == "unlink":
+            self.files.remove(kwargs["path"])
+            self.children[self._parent(kwargs["path"])] -= 1
+
+        elif op == "open":
+            fds = SystemState().get_fd_to_path_mapping()
+            self.fds[kwargs["path"]] = next(
+                fd for fd, path in fds.items() if path == kwargs["path"]
+            )
+
+        elif op == "close":
+            self.fds = {path: fd for path, fd in self.fds.items() if fd != kwargs["fd"]}
+
+        elif op == "cd" and kwargs["path"] != ".":
+            self.cwd = kwargs["path"]
+
+
+def run_worker(
+    mix: str,
+    sizes: str,
+    ops_limit: int,
+    duration: float,
+    seed: int,
+    profile: Optional[str] = None,
+    profile_format: str = "pstats",
+) -> WorkerResult:
+    rng = random.Random(seed)
+    random.seed(seed)
+
+    weights = WORKLOAD_MIXES[mix]
+    model = WorkloadModel(rng, size_distribution(sizes, rng))
+    result = WorkerResult()
+
+    with profiled(profile, profile_format), isolated_workdir():
+        format_fs()
+        started = time.perf_counter()
+
+        while result.ops < ops_limit and time.perf_counter() - started < duration:
+            op = rng.choices(list(weights), weights=list(weights.values()))[0]
+            op, kwargs = model.plan(op)
+
+            command = FsManager.commands[op](**kwargs)
+
+            op_started = time.perf_counter()
+
+            try:
+                command.run()
+            except (OutOfBlocks, OutOfDescriptors):
+                # Volume is full, start over with a fresh one.
+                result.resets += 1
+                format_fs()
+                model.reset()
+                continue
+            except Exception as e:
+                result.errors[f"{op}: {type(e).__name__}"] += 1
+                result.resets += 1
+                format_fs()
+                model.reset()
+                continue
+
+            result.samples[op].append(time.perf_counter() - op_started)
+            result.ops += 1
+
+            model.apply(op, kwargs)
+
+        result.elapsed = time.perf_counter() - started
+
+    return result
+
+
+def histogram(samples: list[float]) -> list[int]:
+    """
+    Count latencies into power of two microseconds buckets.
+    """
+
+    buckets = [0] * (HISTOGRAM_MAX_BUCKET + 1)
+
+    for sample in samples:
+        bucket = max(int(math.log2(max(sample * 1e6, 1))), 0)
+        buckets[min(bucket, HISTOGRAM_MAX_BUCKET)] += 1
+
+    return buckets
+
+
+def make_report(results: list[WorkerResult], wall_time: float) -> dict[str, Any]:
+    samples: dict[str, list[float]] = defaultdict(list)
+
+    for result in results:
+        for op, op_samples in result.samples.items():
+            samples[op] += op_samples
+
+    all_samples = sorted(s * 1e6 for op_samples in samples.values() for s in op_samples)
+    ops = sum(result.ops for result in results)
+
+    return {
+        "ops": ops,
+        "errors": sum(sum(result.errors.values()) for result in results),
+        "error_types": dict(sum((result.errors for result in results), Counter())),
+        "resets": sum(result.resets for result in results),
+        "wall_time_s": wall_time,
+        "ops_per_sec": ops / wall_time if wall_time else 0.0,
+        "p50_us": percentile(all_samples, 50),
+        "p99_us": percentile(all_samples, 99),
+        "p999_us": percentile(all_samples, 99.9),
+        "histogram_us": histogram([s / 1e6 for s in all_samples]),
+        "commands": {
+            op: {
+                "count": len(op_samples),
+                "p50_us": percentile(sorted(s * 1e6 for s in op_samples), 50),
+                "p99_us": percentile(sorted(s * 1e6 for s in op_samples), 99),
+            }
+            for op, op_samples in sorted(samples.items())
+        },
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    summary = tabulate(
+        [
+            [
+                name,
+                (
+                    f"{report[name]:.1f}"
+                    if isinstance(report[name], float)
+                    else report[name]
+                ),
+            ]
+            for name in (
+                "ops",
+                "errors",
+                "resets",
+                "wall_time_s",
+                "ops_per_sec",
+                "p50_us",
+                "p99_us",
+                "p999_us",
+            )
+        ],
+        headers=["metric", "value"],
+    )
+    commands = tabulate(
+        [
+            [op, info["count"], f"{info['p50_us']:.1f}", f"{info['p99_us']:.1f}"]
+            for op, info in report["commands"].items()
+        ],
+        headers=["command", "count", "p50, us", "p99, us"],
+    )
+    buckets = tabulate(
+        [
+            [
+                f"{2 ** i}-{2 ** (i + 1)}",
+                count,
+                "#" * math.ceil(60 * count / report["ops"]),
+            ]
+            for i, count in enumerate(report["histogram_us"])
+            if count
+        ],
+        headers=["latency, us", "count", ""],
+    )
+
+    sections = [summary, commands, buckets]
+
+    if report["error_types"]:
+        sections.append(
+            tabulate(list(report["error_types"].items()), headers=["error", "count"])
+        )
+
+    return "\n\n".join(sections)
+
+
+def parser_factory() -> ArgumentParser:
+    """
+    Create arg parser for workload generator.
+    """
+
+    parser = ArgumentParser(
+        description="Drive fs commands with a synthetic workload.",
+    )
+
+    parser.add_argument(
+        "--mix",
+        action="store",
+        choices=tuple(WORKLOAD_MIXES),
+        default="small-file",
+        help="operations mix of the workload.",
+    )
+    parser.add_argument(
+        "--sizes",
+        action="store",
+        type=str,
+        metavar="spec",
+        help="written data sizes: `fixed:n`, `uniform:a:b` or `exp:mean`.",
+    )
+    parser.add_argument(
+        "--ops",
+        action="store",
+        type=int,
+        default=1000,
+        metavar="n",
+        help="stop every worker after `n` operations.",
+    )
+    parser.add_argument(
+        "--duration",
+        action="store",
+        type=float,
+        default=math.inf,
+        metavar="seconds",
+        help="stop every worker after `seconds`.",
+    )
+    parser.add_argument(
+        "--workers",
+        action="store",
+        type=int,
+        default=1,
+        metavar="n",
+        help="run `n` worker processes, each with its own volume.",
+    )
+    parser.add_argument(
+        "--seed",
+        action="store",
+        type=int,
+        default=0,
+        metavar="seed",
+        help="seed for random generators to make runs reproducible.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store",
+        type=str,
+        metavar="out",
+        help="profile workers, save results to `out` (suffixed by worker number).",
+    )
+    parser.add_argument(
+        "--profile-format",
+        action="store",
+        choices=PROFILE_FORMATS,
+        default="pstats",
+        help="format of `--profile` output: pstats or collapsed stacks.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        default=False,
+        help="print JSON report instead of a table.",
+    )
+
+    return parser
+
+
+def main() -> int:
+    args = parser_factory().parse_args()
+    sizes = args.sizes or WORKLOAD_SIZES[args.mix]
+
+    workers_args = [
+        (
+            args.mix,
+            sizes,
+            args.ops,
+            args.duration,
+            args.seed + i,
+            args.profile
+            and (f"{args.profile}.{i}" if args.workers > 1 else args.profile),
+            args.profile_format,
+        )
+        for i in range(args.workers)
+    ]
+
+    started = time.perf_counter()
+
+    if args.workers > 1:
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.starmap(run_worker, workers_args)
+    else:
+        results = [run_worker(*workers_args[0])]
+
+    report = make_report(results, time.perf_counter() - started)
+    report["mix"] = args.mix
+    report["sizes"] = sizes
+    report["workers"] = args.workers
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
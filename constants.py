@@ -1,6 +1,7 @@
 # Block wide.
 N_BLOCKS_MAX = 100
 ROOT_BLOCK_N = 0
+INLINE_BLOCK_N = -1  # Block of a payload kept inline in the descriptor state.
 BLOCK_SIZE_BYTES = 64
 BLOCK_HEADER_SIZE_BYTES = 8
 BLOCK_CONTENT_SIZE_BYTES = BLOCK_SIZE_BYTES - BLOCK_HEADER_SIZE_BYTES
@@ -9,11 +10,16 @@ BLOCK_CONTENT_SIZE_BYTES = BLOCK_SIZE_BYTES - BLOCK_HEADER_SIZE_BYTES
 ROOT_DESCRIPTOR_N = 0
 ROOT_DIRECTORY_PATH = ""
 N_DESCRIPTORS = 10
+N_DESCRIPTORS_MAX = 256  # Directory mapping keeps descriptor id in one byte.
 FD_GENERATION_RANGE = (100, 999)
 
 # Files wide.
-FILENAME_MAXSIZE_BYTES = 10
-DIRECTORY_MAPPING_BYTES = FILENAME_MAXSIZE_BYTES + 1  # +1 for descriptor id.
+# Directory record: record length, name length, type, descriptor id, name.
+DIRECTORY_RECORD_HEADER_BYTES = 4
+FILENAME_MAXSIZE_BYTES = BLOCK_CONTENT_SIZE_BYTES - DIRECTORY_RECORD_HEADER_BYTES
+# Record type codes as in ext2, 0 for links of fixed slots of older volumes.
+DIRECTORY_RECORD_TYPES = {"file": 1, "directory": 2, "symlink": 7}
+DIRECTORY_MAPPING_BYTES = 11  # Fixed slot of older volumes, 10 name bytes and id.
 
 # Symlinks wide.
 MAX_SYMLINK_HOPS = 20
@@ -23,3 +29,40 @@ PATH_DIVIDER = "/"
 DIRECTORY_DEFAULT_LINKS_COUNT = 2
 MEMORY_PATH = "fake_memory.mem"
 CONFIG_PATH = "system_config.json"
+
+# Journal wide.
+JOURNAL_PATH = "fs_journal.log"
+JOURNAL_GROUP_COMMIT_SIZE = 8
+JOURNAL_CHECKPOINT_BYTES = 64 * 1024
+
+# Durability wide.
+DURABILITY_NONE = "none"
+DURABILITY_BATCHED = "batched"
+DURABILITY_STRICT = "strict"
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_BATCHED, DURABILITY_STRICT)
+DURABILITY_FLUSH_INTERVAL = 1.0
+
+# Allocation wide.
+ALLOCATION_FIRST_FIT = "first-fit"
+ALLOCATION_NEXT_FIT = "next-fit"
+ALLOCATION_BEST_FIT = "best-fit"
+ALLOCATION_LOCALITY = "locality"
+ALLOCATION_POLICIES = (
+    ALLOCATION_FIRST_FIT,
+    ALLOCATION_NEXT_FIT,
+    ALLOCATION_BEST_FIT,
+    ALLOCATION_LOCALITY,
+)
+ALLOCATION_GROUP_BLOCKS = 16
+
+# Reclaim wide.
+RECLAIM_BATCH_BLOCKS = 32
+
+# Tree commands wide.
+TREE_WRITE_BATCH_SIZE = 64  # Copied objects written with one image open.
+
+# Ls wide.
+LS_OUTPUT_TABLE = "table"
+LS_OUTPUT_JSONL = "jsonl"
+LS_OUTPUT_TSV = "tsv"
+LS_OUTPUTS = (LS_OUTPUT_TABLE, LS_OUTPUT_JSONL, LS_OUTPUT_TSV)
@@ -0,0 +1,410 @@
+import asyncio
+import contextlib
+import functools
+import os
+import threading
+from collections.abc import AsyncGenerator, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
+
+from constants import (ALLOCATION_FIRST_FIT, DURABILITY_NONE, N_DESCRIPTORS,
+                       PATH_DIVIDER, ROOT_DIRECTORY_PATH)
+from fs.commands.base import BaseFSCommand
+from fs.commands.cd import CdCommand
+from fs.commands.close import CloseCommand
+from fs.commands.cp import CpCommand
+from fs.commands.create import CreateCommand
+from fs.commands.cwd import CwdCommand
+from fs.commands.du import DuCommand
+from fs.commands.find import FindCommand
+from fs.commands.frag import FragCommand
+from fs.commands.fstat import FstatCommand
+from fs.commands.link import LinkCommand
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.open import OpenCommand
+from fs.commands.quota import QuotaCommand
+from fs.commands.read import ReadCommand
+from fs.commands.rename import RenameCommand
+from fs.commands.rm import RmCommand
+from fs.commands.rmdir import RmdirCommand
+from fs.commands.stat import StatCommand
+from fs.commands.symlink import SymlinkCommand
+from fs.commands.truncate import TruncateCommand
+from fs.commands.umount import UmountCommand
+from fs.commands.unlink import UnlinkCommand
+from fs.commands.write import WriteCommand
+from fs.driver.state import SystemState, read_only_state
+from fs.models.result import (DirectoryEntry, FragReport, QuotaEntry,
+                              StatResult, UsageEntry)
+
+AIO_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class ReadWriteLock:
+    """
+    Many readers or a single writer. Waiting writers block new readers, so
+    a stream of reads can't starve mutations.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextlib.contextmanager
+    def read(self) -> Generator[None, Any, Any]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+
+            self._readers += 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def write(self) -> Generator[None, Any, Any]:
+        with self._cond:
+            self._writers_waiting += 1
+
+            while self._writer or self._readers:
+                self._cond.wait()
+
+            self._writers_waiting -= 1
+            self._writer = True
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class AsyncFileSystem:
+    """
+    Asyncio facade over fs commands.
+
+    Commands run on a bounded thread pool, so block I/O never blocks the
+    event loop. Commands which only read run concurrently, mutations run one
+    at a time. Requests touching the same object, by any of its paths or fds
+    of it, are executed in the order they were awaited.
+    """
+
+    def __init__(self, max_workers: int = AIO_MAX_WORKERS) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="fs-io"
+        )
+        self._rw_lock = ReadWriteLock()
+        # Made on first use, within the running loop.
+        self._admission: Optional[asyncio.Lock] = None
+        # Last request admitted on each key, done once it ran.
+        self._tails: dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "AsyncFileSystem":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Wait for running commands and stop the thread pool.
+        """
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+
+    async def mount(
+        self,
+        journal: bool = False,
+        durability: str = DURABILITY_NONE,
+        allocation: str = ALLOCATION_FIRST_FIT,
+        inline: bool = False,
+    ) -> None:
+        await self._run(
+            MountCommand,
+            journal=journal,
+            durability=durability,
+            allocation=allocation,
+            inline=inline,
+        )
+
+    async def umount(self) -> None:
+        await self._run(UmountCommand)
+
+    async def mkfs(self, n: int = N_DESCRIPTORS) -> None:
+        await self._run(MkfsCommand, n=n)
+
+    async def stat(self, fid: int) -> Optional[StatResult]:
+        return await self._run(FstatCommand, shared=True, fid=fid)
+
+    async def stat_many(
+        self, paths: Optional[list[str]] = None, ids: Optional[list[int]] = None
+    ) -> list[Optional[StatResult]]:
+        return await self._run(
+            StatCommand, keys=paths, shared=True, paths=paths, ids=ids
+        )
+
+    async def ls(
+        self,
+        path: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        names_only: bool = False,
+    ) -> Union[list[DirectoryEntry], list[str]]:
+        return await self._run(
+            LsCommand,
+            keys=[path or ""],
+            shared=True,
+            path=path,
+            limit=limit,
+            after=after,
+            names_only=names_only,
+        )
+
+    async def create(self, path: str) -> None:
+        await self._run(CreateCommand, keys=[path], path=path)
+
+    async def open(self, path: str) -> str:
+        return await self._run(OpenCommand, keys=[path], path=path)
+
+    async def close(self, fd: str) -> None:
+        await self._run(CloseCommand, fds=[fd], fd=fd)
+
+    async def read(self, fd: str, offset: int, size: int) -> bytes:
+        return await self._run(
+            ReadCommand,
+            fds=[fd],
+            shared=True,
+            fd=fd,
+            offset=offset,
+            size=size,
+        )
+
+    async def write(self, fd: str, offset: int, content: Union[bytes, str]) -> None:
+        if isinstance(content, bytes):
+            # Blocks store a byte per character.
+            content = content.decode("latin-1")
+
+        await self._run(
+            WriteCommand,
+            fds=[fd],
+            fd=fd,
+            offset=offset,
+            content=content,
+        )
+
+    async def link(self, path1: str, path2: str) -> None:
+        await self._run(LinkCommand, keys=[path1, path2], path1=path1, path2=path2)
+
+    async def rename(self, path1: str, path2: str) -> None:
+        await self._run(RenameCommand, keys=[path1, path2], path1=path1, path2=path2)
+
+    async def unlink(self, path: str) -> None:
+        await self._run(UnlinkCommand, keys=[path], path=path)
+
+    async def truncate(self, path: str, size: int) -> None:
+        await self._run(TruncateCommand, keys=[path], path=path, size=size)
+
+    async def mkdir(self, path: str) -> None:
+        await self._run(MkdirCommand, keys=[path], path=path)
+
+    async def rmdir(self, path: str) -> None:
+        await self._run(RmdirCommand, keys=[path], path=path)
+
+    async def rm(self, path: str) -> int:
+        return await self._run(RmCommand, keys=[path], path=path)
+
+    async def cp(self, path1: str, path2: str) -> int:
+        return await self._run(
+            CpCommand, keys=[path1, path2], path1=path1, path2=path2
+        )
+
+    async def du(self, path: Optional[str] = None) -> list[UsageEntry]:
+        return await self._run(DuCommand, keys=[path or ""], shared=True, path=path)
+
+    async def quota(
+        self,
+        path: str,
+        size: Optional[int] = None,
+        blocks: Optional[int] = None,
+        inodes: Optional[int] = None,
+        clear: bool = False,
+    ) -> Optional[QuotaEntry]:
+        return await self._run(
+            QuotaCommand,
+            keys=[path],
+            path=path,
+            size=size,
+            blocks=blocks,
+            inodes=inodes,
+            clear=clear,
+        )
+
+    async def find(
+        self,
+        path: Optional[str] = None,
+        name: Optional[str] = None,
+        type: Optional[str] = None,
+    ) -> list[DirectoryEntry]:
+        return await self._run(
+            FindCommand,
+            keys=[path or ""],
+            shared=True,
+            path=path,
+            name=name,
+            type=type,
+        )
+
+    async def symlink(self, content: str, path: str) -> None:
+        await self._run(SymlinkCommand, keys=[path], content=content, path=path)
+
+    async def cd(self, path: str) -> None:
+        await self._run(CdCommand, path=path)
+
+    async def cwd(self) -> str:
+        return await self._run(CwdCommand, shared=True)
+
+    async def frag(self) -> FragReport:
+        return await self._run(FragCommand, shared=True)
+
+    def _resolve_keys(self, paths: list[str], fds: list[str]) -> set[str]:
+        """
+        Keys of objects at `paths` and opened as `fds`: full path as given,
+        full path with symlinks followed and descriptor id, so aliases of an
+        object share a key.
+        """
+
+        system_state = SystemState()
+        command = CwdCommand(system_state=system_state)
+        keys = set()
+
+        with self._rw_lock.read(), read_only_state():
+            cwd = system_state.get_cwd()
+            paths = list(paths)
+
+            for fd in fds:
+                path = system_state.get_descriptor_path(fd)
+
+                if path is None:
+                    # Not opened, the command reports it.
+                    keys.add(f"fd{fd}")
+                else:
+                    paths.append(path)
+
+            for path in paths:
+                if not path.startswith(PATH_DIVIDER):
+                    path = f"{cwd}{PATH_DIVIDER}{path}"
+
+                parts: list[str] = []
+
+                for part in path.split(PATH_DIVIDER):
+                    if part == "..":
+                        parts = parts[:-1]
+                    elif part and part != ".":
+                        parts.append(part)
+
+                if parts:
+                    full_path = PATH_DIVIDER + PATH_DIVIDER.join(parts)
+                    resolved_path = command.lookup_path(full_path)
+                else:
+                    full_path = resolved_path = ROOT_DIRECTORY_PATH
+
+                descriptor_id = system_state.get_descriptor_id(resolved_path)
+
+                keys.update((full_path, resolved_path))
+
+                if descriptor_id is not None:
+                    keys.add(f"#{descriptor_id}")
+
+        return keys
+
+    @contextlib.asynccontextmanager
+    async def _ordered(
+        self, paths: list[str], fds: list[str]
+    ) -> AsyncGenerator[None, Any]:
+        """
+        Run the wrapped request once every request awaited before it on the
+        same objects is done.
+
+        Requests are admitted one at a time, each queueing behind the last
+        request on each of its keys, so a request on several objects can't
+        be overtaken on any of them.
+        """
+
+        if not paths and not fds:
+            yield
+            return
+
+        loop = asyncio.get_running_loop()
+
+        if self._admission is None:
+            self._admission = asyncio.Lock()
+
+        async with self._admission:
+            keys = await loop.run_in_executor(
+                self._executor, self._resolve_keys, paths, fds
+            )
+            earlier = {self._tails[key] for key in keys if key in self._tails}
+            done = loop.create_future()
+
+            for key in keys:
+                self._tails[key] = done
+
+        def release(*_: Any) -> None:
+            if all(future.done() for future in earlier) and not done.done():
+                done.set_result(None)
+
+                for key in keys:
+                    if self._tails.get(key) is done:
+                        del self._tails[key]
+
+        try:
+            if earlier:
+                await asyncio.wait(earlier)
+
+            yield
+        finally:
+            # Cancelled while queued, later requests still wait for earlier.
+            for future in earlier:
+                if not future.done():
+                    future.add_done_callback(release)
+
+            release()
+
+    async def _run(
+        self,
+        command_cls: type[BaseFSCommand],
+        keys: Optional[list[str]] = None,
+        fds: Optional[list[str]] = None,
+        shared: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        execute = functools.partial(self._execute, command_cls, shared, kwargs)
+
+        async with self._ordered(keys or [], fds or []):
+            return await loop.run_in_executor(self._executor, execute)
+
+    def _execute(
+        self, command_cls: type[BaseFSCommand], shared: bool, kwargs: dict[str, Any]
+    ) -> Any:
+        command = command_cls(**kwargs)
+
+        if shared:
+            with self._rw_lock.read(), read_only_state():
+                command.run()
+        else:
+            with self._rw_lock.write():
+                command.run()
+
+        return command.result
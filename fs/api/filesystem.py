@@ -0,0 +1,224 @@
+import logging
+from collections.abc import Iterator
+from typing import Any, Optional, Union
+
+from constants import ALLOCATION_FIRST_FIT, DURABILITY_NONE, N_DESCRIPTORS
+from fs.commands.base import BaseFSCommand
+from fs.commands.cd import CdCommand
+from fs.commands.close import CloseCommand
+from fs.commands.cp import CpCommand
+from fs.commands.create import CreateCommand
+from fs.commands.cwd import CwdCommand
+from fs.commands.du import DuCommand
+from fs.commands.find import FindCommand
+from fs.commands.frag import FragCommand
+from fs.commands.fstat import FstatCommand
+from fs.commands.link import LinkCommand
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.open import OpenCommand
+from fs.commands.quota import QuotaCommand
+from fs.commands.read import ReadCommand
+from fs.commands.rename import RenameCommand
+from fs.commands.rm import RmCommand
+from fs.commands.rmdir import RmdirCommand
+from fs.commands.scandir import ScandirCommand
+from fs.commands.stat import StatCommand
+from fs.commands.symlink import SymlinkCommand
+from fs.commands.truncate import TruncateCommand
+from fs.commands.umount import UmountCommand
+from fs.commands.unlink import UnlinkCommand
+from fs.commands.walk import WalkCommand
+from fs.commands.write import WriteCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.state import SystemState
+from fs.driver.stats import IOStats
+from fs.models.result import (DirectoryEntry, FragReport, QuotaEntry,
+                              StatResult, UsageEntry)
+
+
+def quiet_logger() -> logging.Logger:
+    logger = logging.getLogger("fs.api.quiet")
+    logger.disabled = True
+
+    return logger
+
+
+class FileSystem:
+    """
+    In-process fs facade returning structured results instead of log lines.
+
+    Owns a single storage proxy and system state, so state is loaded once
+    and reused by all calls. Commands log only if `logger` is passed.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        self._logger = logger or quiet_logger()
+
+        self._memory_proxy = MemoryStorageProxy(logger=self._logger)
+        self._system_state = SystemState()
+
+        # I/O stats of the last call.
+        self.stats = IOStats()
+
+    def mount(
+        self,
+        journal: bool = False,
+        durability: str = DURABILITY_NONE,
+        allocation: str = ALLOCATION_FIRST_FIT,
+        inline: bool = False,
+    ) -> None:
+        self._run(
+            MountCommand,
+            journal=journal,
+            durability=durability,
+            allocation=allocation,
+            inline=inline,
+        )
+
+    def umount(self) -> None:
+        self._run(UmountCommand)
+
+    def mkfs(self, n: int = N_DESCRIPTORS) -> None:
+        self._run(MkfsCommand, n=n)
+
+    def stat(self, fid: int) -> Optional[StatResult]:
+        return self._run(FstatCommand, fid=fid)
+
+    def stat_many(
+        self, paths: Optional[list[str]] = None, ids: Optional[list[int]] = None
+    ) -> list[Optional[StatResult]]:
+        """
+        Stats of objects at `paths` followed by descriptors `ids`, None for
+        missing ones, taken with one state load and ordered header reads.
+        """
+
+        return self._run(StatCommand, paths=paths, ids=ids)
+
+    def ls(
+        self,
+        path: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        names_only: bool = False,
+    ) -> Union[list[DirectoryEntry], list[str]]:
+        """
+        Entries of a directory, a page of at most `limit` of them following
+        the `after` name. With `names_only` only names, no metadata is read.
+        """
+
+        return self._run(
+            LsCommand, path=path, limit=limit, after=after, names_only=names_only
+        )
+
+    def scandir(self, path: Optional[str] = None) -> Iterator[DirectoryEntry]:
+        """
+        Entries of a directory, built lazily from metadata kept in state.
+        """
+
+        return self._run(ScandirCommand, path=path)
+
+    def walk(
+        self, path: Optional[str] = None, topdown: bool = True
+    ) -> Iterator[tuple[str, list[DirectoryEntry], list[DirectoryEntry]]]:
+        """
+        Lazy `os.walk` over the tree at `path`, subdirectories are entries.
+        """
+
+        return self._run(WalkCommand, path=path, topdown=topdown)
+
+    def create(self, path: str) -> None:
+        self._run(CreateCommand, path=path)
+
+    def open(self, path: str) -> str:
+        return self._run(OpenCommand, path=path)
+
+    def close(self, fd: str) -> None:
+        self._run(CloseCommand, fd=fd)
+
+    def read(self, fd: str, offset: int, size: int) -> bytes:
+        return self._run(ReadCommand, fd=fd, offset=offset, size=size)
+
+    def write(self, fd: str, offset: int, content: Union[bytes, str]) -> None:
+        if isinstance(content, bytes):
+            # Blocks store a byte per character.
+            content = content.decode("latin-1")
+
+        self._run(WriteCommand, fd=fd, offset=offset, content=content)
+
+    def link(self, path1: str, path2: str) -> None:
+        self._run(LinkCommand, path1=path1, path2=path2)
+
+    def rename(self, path1: str, path2: str) -> None:
+        self._run(RenameCommand, path1=path1, path2=path2)
+
+    def unlink(self, path: str) -> None:
+        self._run(UnlinkCommand, path=path)
+
+    def truncate(self, path: str, size: int) -> None:
+        self._run(TruncateCommand, path=path, size=size)
+
+    def mkdir(self, path: str) -> None:
+        self._run(MkdirCommand, path=path)
+
+    def rmdir(self, path: str) -> None:
+        self._run(RmdirCommand, path=path)
+
+    def rm(self, path: str) -> int:
+        return self._run(RmCommand, path=path)
+
+    def cp(self, path1: str, path2: str) -> int:
+        return self._run(CpCommand, path1=path1, path2=path2)
+
+    def du(self, path: Optional[str] = None) -> list[UsageEntry]:
+        return self._run(DuCommand, path=path)
+
+    def quota(
+        self,
+        path: str,
+        size: Optional[int] = None,
+        blocks: Optional[int] = None,
+        inodes: Optional[int] = None,
+        clear: bool = False,
+    ) -> Optional[QuotaEntry]:
+        return self._run(
+            QuotaCommand,
+            path=path,
+            size=size,
+            blocks=blocks,
+            inodes=inodes,
+            clear=clear,
+        )
+
+    def find(
+        self,
+        path: Optional[str] = None,
+        name: Optional[str] = None,
+        type: Optional[str] = None,
+    ) -> list[DirectoryEntry]:
+        return self._run(FindCommand, path=path, name=name, type=type)
+
+    def symlink(self, content: str, path: str) -> None:
+        self._run(SymlinkCommand, content=content, path=path)
+
+    def cd(self, path: str) -> None:
+        self._run(CdCommand, path=path)
+
+    def cwd(self) -> str:
+        return self._run(CwdCommand)
+
+    def frag(self) -> FragReport:
+        return self._run(FragCommand)
+
+    def _run(self, command_cls: type[BaseFSCommand], **kwargs: Any) -> Any:
+        command = command_cls(
+            memory_proxy=self._memory_proxy,
+            system_state=self._system_state,
+            logger=self._logger,
+            **kwargs,
+        )
+        self.stats = command.run()
+
+        return command.result
@@ -1,38 +1,143 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Optional, TypeVar
 
 from constants import MAX_SYMLINK_HOPS, PATH_DIVIDER, ROOT_DIRECTORY_PATH
+from fs.driver.durability import current_flusher
+from fs.driver.journal import current_journal
 from fs.driver.memory import MemoryStorageProxy
+from fs.driver.reclaim import current_reclaimer
 from fs.driver.state import SystemState
+from fs.driver.stats import IOStats, collect_stats
+from fs.driver.trace import current_tracer
+from fs.driver.utils import DescriptorState
 from fs.exceptions import (DirectoryNotExists, FileNotExists,
-                           MaxSymlinkHopsExceeded)
+                           MaxSymlinkHopsExceeded, QuotaExceeded)
 from fs.models.descriptor.base import Descriptor
 from fs.models.descriptor.directory import DirectoryDescriptor
 from fs.models.descriptor.file import FileDescriptor
 from fs.models.descriptor.symlink import SymlinkDescriptor
 from fs.models.path import ResolvedPath
+from fs.models.result import DESCRIPTOR_TYPES
+
+DescriptorT = TypeVar("DescriptorT", bound=Descriptor)
+SYMLINK_TYPE = DESCRIPTOR_TYPES[SymlinkDescriptor]
 
 
 class BaseFSCommand(ABC):
     symlink_hop_cnt = 0
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        memory_proxy: Optional[MemoryStorageProxy] = None,
+        system_state: Optional[SystemState] = None,
+        logger: Optional[logging.Logger] = None,
+        **kwargs: Any,
+    ) -> None:
         self.args = args
         self.kwargs = kwargs
 
-        self._memory_proxy = MemoryStorageProxy()
-        self._system_state = SystemState()
+        # Drivers may be shared between commands to reuse loaded state.
+        self._memory_proxy = memory_proxy or MemoryStorageProxy()
+        self._system_state = system_state or SystemState()
+        self.stats = IOStats()
+        # Value produced by the command, e.g. content read or fd opened.
+        self.result: Any = None
 
-        self._logger = logging.getLogger(__name__)
+        self._logger = logger or logging.getLogger(__name__)
 
     @abstractmethod
     def exec(self) -> None:
         raise NotImplementedError("Command must implement its exec method.")
 
+    @property
+    def name(self) -> str:
+        return type(self).__name__.removesuffix("Command").lower()
+
+    def run(self) -> IOStats:
+        """
+        Execute command, collecting its I/O stats.
+
+        On a journaled volume all changes of the command are committed as
+        one journal record. Changes are synced as the volume durability mode
+        requires.
+        """
+
+        tracer = current_tracer()
+        journal = current_journal()
+
+        if tracer:
+            tracer.set_command(self.name)
+
+        with collect_stats() as stats:
+            if journal:
+                with journal.transaction():
+                    self._exec_and_reclaim()
+            else:
+                self._exec_and_reclaim()
+
+            current_flusher().complete(self._system_state.durability)
+
+        self.stats = stats
+
+        return stats
+
+    def _exec_and_reclaim(self) -> None:
+        self.exec()
+
+        reclaimer = current_reclaimer()
+
+        if reclaimer.per_command:
+            reclaimer.drain()
+
+    def remove_link(self, directory: DirectoryDescriptor, name: str) -> None:
+        """
+        Remove link `name` of `directory`, freeing blocks it leaves empty.
+        """
+
+        blocks_deleted = directory.remove_directory_link(name)
+
+        if blocks_deleted:
+            self._memory_proxy.free_blocks([block.n for block in blocks_deleted])
+
     def save(self, descriptor: Descriptor, path: str) -> None:
-        self._memory_proxy.write(descriptor)
-        self._system_state.write(descriptor, path)
+        self.save_all((descriptor, path))
+
+    def save_all(self, *saves: tuple[Descriptor, str]) -> None:
+        """
+        Save descriptors to their paths once all of them pass quotas.
+
+        Blocks allocated for the descriptors since the state was loaded are
+        freed if a quota would be exceeded.
+        """
+
+        try:
+            for descriptor, path in saves:
+                self._system_state.check_write(descriptor, path)
+        except QuotaExceeded:
+            for descriptor, _ in saves:
+                self._release_new_blocks(descriptor)
+
+            raise
+
+        for descriptor, path in saves:
+            self._memory_proxy.write(descriptor)
+            self._system_state.write(descriptor, path)
+
+    def _release_new_blocks(self, descriptor: Descriptor) -> None:
+        descriptor_state = self._system_state.get_descriptor_state(descriptor.n)
+        blocks = list(descriptor_state.blocks) if descriptor_state.used else []
+        new_blocks = [n for n in descriptor.block_numbers if n not in blocks]
+
+        if not new_blocks:
+            return
+
+        self._memory_proxy.free_blocks(new_blocks)
+
+        if descriptor_state.used:
+            # Blocks were added to the config right when allocated.
+            self._system_state.map_descriptor_to_blocks(descriptor.n, blocks)
 
     def _check_path_parts(
         self,
@@ -61,14 +166,8 @@ class BaseFSCommand(ABC):
         path_descriptor_id = self._system_state.get_descriptor_id(full_path)
 
         if path_descriptor_id is not None:
-            path_descriptor_blocks = self._system_state.get_descriptor_blocks(
-                path_descriptor_id
-            )
-            path_descriptor = self._memory_proxy.get_descriptor(
-                path_descriptor_id, path_descriptor_blocks
-            )
-
-            if isinstance(path_descriptor, SymlinkDescriptor) and resolve_symlink:
+            if resolve_symlink and self._is_symlink(path_descriptor_id):
+                path_descriptor = self.get_descriptor_by_id(path_descriptor_id)
                 symlink_content = path_descriptor.read_content(path_descriptor.size)
                 symlink_path = self.resolve_path(symlink_content).fs_object_path.split(
                     PATH_DIVIDER
@@ -90,6 +189,17 @@ class BaseFSCommand(ABC):
 
         return prev_path + [path_part]
 
+    def _is_symlink(self, descriptor_id: int) -> bool:
+        descriptor_type = self._system_state.get_descriptor_state(descriptor_id).type
+
+        if descriptor_type is None:
+            # Volume made before types were cached, only the header has it.
+            return isinstance(
+                self.get_descriptor_by_id(descriptor_id), SymlinkDescriptor
+            )
+
+        return descriptor_type == SYMLINK_TYPE
+
     def _resolve_absolute_path(
         self,
         path: Optional[str] = None,
@@ -148,16 +258,42 @@ class BaseFSCommand(ABC):
 
         return self._resolve_relative_path(path, to_dir, resolve_symlink)
 
+    def lookup_path(self, path: str) -> str:
+        """
+        Full path of `path` with symlinks followed, resolved by names alone,
+        so no directory on the way is loaded.
+        """
+
+        if not path.startswith(PATH_DIVIDER):
+            path = self._system_state.get_cwd() + PATH_DIVIDER + path
+
+        self.symlink_hop_cnt = 0
+
+        return PATH_DIVIDER.join(self._check_path_parts(path))
+
+    def get_descriptor_by_id(self, descriptor_id: int) -> Descriptor:
+        descriptor_state = self._system_state.get_descriptor_state(descriptor_id)
+
+        return self._with_ref_count(
+            self._memory_proxy.get_descriptor(
+                descriptor_id, descriptor_state.blocks, descriptor_state.inline
+            ),
+            descriptor_state,
+        )
+
     def get_directory_descriptor_by_path(self, path: str) -> DirectoryDescriptor:
         descriptor_id = self._system_state.get_descriptor_id(path)
 
         if descriptor_id is None:
             raise DirectoryNotExists("Can't find directory with such a path.")
 
-        descriptor_blocks = self._system_state.get_descriptor_blocks(descriptor_id)
+        descriptor_state = self._system_state.get_descriptor_state(descriptor_id)
 
-        return self._memory_proxy.get_directory_descriptor(
-            descriptor_id, descriptor_blocks
+        return self._with_ref_count(
+            self._memory_proxy.get_directory_descriptor(
+                descriptor_id, descriptor_state.blocks, descriptor_state.inline
+            ),
+            descriptor_state,
         )
 
     def get_file_descriptor_by_path(self, path: str) -> FileDescriptor:
@@ -166,6 +302,31 @@ class BaseFSCommand(ABC):
         if descriptor_id is None:
             raise FileNotExists("Can't find file with such a path.")
 
-        descriptor_blocks = self._system_state.get_descriptor_blocks(descriptor_id)
+        descriptor_state = self._system_state.get_descriptor_state(descriptor_id)
+
+        return self._with_ref_count(
+            self._memory_proxy.get_file_descriptor(
+                descriptor_id, descriptor_state.blocks, descriptor_state.inline
+            ),
+            descriptor_state,
+        )
+
+    @staticmethod
+    def _with_ref_count(
+        descriptor: DescriptorT, descriptor_state: DescriptorState
+    ) -> DescriptorT:
+        if descriptor_state.ref_count is not None:
+            # Block headers hold the count only on volumes made before.
+            descriptor.refs_count = descriptor_state.ref_count
+
+        return descriptor
+
+    def add_ref_count(self, descriptor: Descriptor, c: int) -> int:
+        """
+        Change links count of descriptor, its blocks are left untouched.
+        """
+
+        descriptor.refs_count += c
+        self._system_state.set_ref_count(descriptor.n, descriptor.refs_count)
 
-        return self._memory_proxy.get_file_descriptor(descriptor_id, descriptor_blocks)
+        return descriptor.refs_count
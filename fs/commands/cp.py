@@ -0,0 +1,123 @@
+from constants import INLINE_BLOCK_N, PATH_DIVIDER, TREE_WRITE_BATCH_SIZE
+from fs.commands.tree import DIRECTORY_TYPE, TreeCommand
+from fs.exceptions import CopyDenied, FileAlreadyExists
+from fs.models.block import Block
+from fs.models.descriptor.base import Descriptor
+from fs.models.descriptor.directory import DirectoryDescriptor
+
+
+class CpCommand(TreeCommand):
+    def exec_tree(self) -> None:
+        path1, path2 = self.kwargs["path1"], self.kwargs["path2"]
+        # Descriptors holding blocks taken by the copy, with blocks to keep.
+        self._taken: list[tuple[Descriptor, list[int]]] = []
+
+        source_path = self.tree_path(path1)
+        resolved_path2 = self.resolve_path(path2)
+        target_path = resolved_path2.fs_object_path
+
+        if self._system_state.check_path_exists(target_path):
+            raise FileAlreadyExists("Can't copy to name of already existing file.")
+
+        if target_path.startswith(source_path + PATH_DIVIDER):
+            raise CopyDenied("Can't copy directory into itself.")
+
+        # Copies of source directories by source path.
+        directories: dict[str, DirectoryDescriptor] = {}
+        # Directories getting links, saved once the whole tree is copied.
+        linked = {
+            resolved_path2.directory.n: (
+                resolved_path2.directory,
+                resolved_path2.directory_path,
+            )
+        }
+        self._taken.append(
+            (resolved_path2.directory, resolved_path2.directory.block_numbers)
+        )
+        copies: list[Descriptor] = []
+        copied = 0
+
+        for node in self.walk_nodes(source_path):
+            if node.path == source_path:
+                parent = resolved_path2.directory
+                name = resolved_path2.fs_object_name
+            else:
+                parent = directories[node.path.rpartition(PATH_DIVIDER)[0]]
+                name = node.entry.name
+
+            new_path = target_path + node.path[len(source_path) :]
+            n = self._system_state.get_new_descriptor_id()
+
+            if node.entry.type == DIRECTORY_TYPE:
+                copy = self._memory_proxy.create_directory(
+                    n=n, name=name, opened=False, parent=parent
+                ).descriptor
+                directories[node.path] = copy
+                linked[n] = (copy, new_path)
+                self._taken.append((copy, []))
+
+            else:
+                descriptor = self.get_descriptor_by_id(node.entry.n)
+                copy = self._copy_descriptor(n, descriptor, parent.n)
+                self._taken.append((copy, []))
+                parent.write_link(name, n, node.entry.type)
+                copies.append(copy)
+
+            self._system_state.write(copy, new_path)
+            copied += 1
+            self._logger.info(f"Copied `{node.path}` to `{new_path}`.")
+
+            if len(copies) >= TREE_WRITE_BATCH_SIZE:
+                self._memory_proxy.write_all(copies)
+                copies.clear()
+
+        self._memory_proxy.write_all(
+            [*copies, *(directory for directory, _ in linked.values())]
+        )
+
+        for directory, path in linked.values():
+            self._system_state.write(directory, path)
+
+        self.result = copied
+
+    def rollback_tree(self) -> None:
+        """
+        Free blocks taken by a failed copy.
+
+        Blocks added to directories were mapped in the config right when
+        allocated, so directories get their blocks from before the copy.
+        """
+
+        freed_blocks = []
+
+        with self._system_state.batched():
+            for descriptor, blocks in self._taken:
+                freed_blocks += [
+                    n for n in descriptor.block_numbers if n not in blocks
+                ]
+                self._system_state.map_descriptor_to_blocks(descriptor.n, blocks)
+
+        if freed_blocks:
+            self._memory_proxy.free_blocks(freed_blocks)
+
+    def _copy_descriptor(
+        self, n: int, descriptor: Descriptor, group: int
+    ) -> Descriptor:
+        if descriptor.inline:
+            block_numbers = [INLINE_BLOCK_N]
+        else:
+            block_numbers = self._memory_proxy.get_available_blocks(
+                len(descriptor.blocks), group=group
+            )
+
+        return type(descriptor)(
+            n=n,
+            size=descriptor.size,
+            refs_count=1,
+            opened=False,
+            blocks=[
+                Block(n=block_n, content=bytearray(block.content))
+                for block_n, block in zip(block_numbers, descriptor.blocks)
+            ],
+            inline=descriptor.inline,
+        )
@@ -19,7 +19,10 @@ class CreateCommand(BaseFSCommand):
             n=n,
             directory_descriptor=resolved_path.directory,
             name=resolved_path.fs_object_name,
+            inline=self._system_state.inline_data,
         )
 
-        self.save(file.descriptor, resolved_path.fs_object_path)
-        self.save(resolved_path.directory, resolved_path.directory_path)
+        self.save_all(
+            (file.descriptor, resolved_path.fs_object_path),
+            (resolved_path.directory, resolved_path.directory_path),
+        )
@@ -4,4 +4,5 @@ from fs.commands.base import BaseFSCommand
 class CwdCommand(BaseFSCommand):
     def exec(self) -> None:
         cwd = self._system_state.get_cwd() or "/"
+        self.result = cwd
         self._logger.info(f"Current working directory: {cwd}")
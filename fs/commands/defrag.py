@@ -0,0 +1,281 @@
+from typing import Optional
+
+from fs.commands.base import BaseFSCommand
+from fs.driver.reclaim import current_reclaimer
+from fs.exceptions import FSNotFormatted
+
+# Descriptor id, index of block in its map and block it moves to.
+BlockMove = tuple[int, int, int]
+
+
+def count_fragments(blocks: list[int]) -> int:
+    """
+    Number of contiguous runs in `blocks`.
+    """
+
+    return sum(
+        i == 0 or block_n != blocks[i - 1] + 1 for i, block_n in enumerate(blocks)
+    )
+
+
+def _free_runs(limit: int, taken: set[int]) -> list[tuple[int, int]]:
+    """
+    (First block, length) of runs of blocks below `limit` not in `taken`.
+    """
+
+    runs = []
+    start = 0
+
+    for block_n in sorted({*(n for n in taken if n < limit), limit}):
+        if block_n > start:
+            runs.append((start, block_n - start))
+
+        start = block_n + 1
+
+    return runs
+
+
+def _place_files(
+    blocks_map: dict[int, list[int]],
+    n_blocks: int,
+    packed_size: int,
+    pinned: set[int],
+) -> tuple[dict[int, list[int]], list[int]]:
+    """
+    Layout of files by `plan_layout`, with files which fit nowhere.
+    """
+
+    layout = {descriptor_id: blocks_map[descriptor_id] for descriptor_id in pinned}
+    fixed = {block_n for blocks in layout.values() for block_n in blocks}
+    # Files left in place unless a larger file needs their blocks, by block.
+    owners: dict[int, int] = {}
+
+    for descriptor_id, blocks in blocks_map.items():
+        if descriptor_id not in pinned and (
+            not blocks or count_fragments(blocks) == 1 and max(blocks) < packed_size
+        ):
+            layout[descriptor_id] = blocks
+            owners.update(dict.fromkeys(blocks, descriptor_id))
+
+    queue = [
+        descriptor_id for descriptor_id in blocks_map if descriptor_id not in layout
+    ]
+    stuck = []
+
+    while queue:
+        queue.sort(key=lambda n: (-len(blocks_map[n]), blocks_map[n]))
+        descriptor_id = queue.pop(0)
+        blocks = blocks_map[descriptor_id]
+        size = len(blocks)
+
+        # Runs over blocks of the file itself, then holes by best fit.
+        starts = [block_n - i for i, block_n in enumerate(blocks)]
+        starts += [
+            start
+            for start, length in sorted(
+                _free_runs(packed_size, {*fixed, *owners}), key=lambda run: run[1]
+            )
+            if length >= size
+        ]
+        best: Optional[tuple[int, int, int, set[int]]] = None
+
+        for start in starts:
+            window = range(start, start + size)
+
+            if start < 0 or start + size > packed_size or fixed.intersection(window):
+                continue
+
+            pushed = {owners[block_n] for block_n in window if block_n in owners}
+
+            if any(len(blocks_map[n]) >= size for n in pushed):
+                continue
+
+            moves = sum(block_n != start + i for i, block_n in enumerate(blocks))
+            moves += sum(len(blocks_map[n]) for n in pushed)
+
+            # Files are pushed out only when it saves moves.
+            if best is None or (moves, len(pushed)) < best[:2]:
+                best = (moves, len(pushed), start, pushed)
+
+        if best is not None:
+            _, _, start, pushed = best
+        else:
+            runs = [
+                run for run in _free_runs(n_blocks, {*fixed, *owners}) if run[1] >= size
+            ]
+
+            if not runs:
+                stuck.append(descriptor_id)
+                continue
+
+            start, pushed = min(runs, key=lambda run: run[1])[0], set()
+
+        for n in pushed:
+            del layout[n]
+
+            for block_n in blocks_map[n]:
+                del owners[block_n]
+
+            queue.append(n)
+
+        layout[descriptor_id] = list(range(start, start + size))
+        fixed.update(layout[descriptor_id])
+
+    return layout, stuck
+
+
+def plan_layout(
+    blocks_map: dict[int, list[int]], n_blocks: int
+) -> dict[int, list[int]]:
+    """
+    New blocks of every file, each file in one contiguous run.
+
+    Files already contiguous within the packed size at the start of the image
+    stay in place. Others, largest first, take the run there needing the
+    fewest block moves, over blocks of their own, pushing smaller files out
+    of the way, or in a hole. Failing that they take the best fitting free
+    run past it, and files fitting nowhere stay as they are.
+    """
+
+    packed_size = sum(map(len, blocks_map.values()))
+    pinned: set[int] = set()
+
+    while True:
+        layout, stuck = _place_files(blocks_map, n_blocks, packed_size, pinned)
+
+        if not stuck:
+            return layout
+
+        # Blocks of files left in place can't be targets of others.
+        pinned.update(stuck)
+
+
+class DefragCommand(BaseFSCommand):
+    def exec(self) -> None:
+        shrink = self.kwargs.get("shrink", False)
+
+        if not self._system_state.check_system_formatted():
+            raise FSNotFormatted("Can't perform actions on not formatted fs.")
+
+        # Queued blocks are unreferenced, so they are packed over or freed here.
+        current_reclaimer().discard()
+
+        blocks_map = self._system_state.get_blocks_map()
+        n_blocks = self._memory_proxy.get_n_blocks()
+        used_blocks = self._memory_proxy.get_used_blocks()
+
+        new_blocks_map = plan_layout(blocks_map, n_blocks)
+        current_map = {
+            descriptor_id: list(blocks) for descriptor_id, blocks in blocks_map.items()
+        }
+        pending: list[BlockMove] = [
+            (descriptor_id, i, new_block_n)
+            for descriptor_id, new_blocks in new_blocks_map.items()
+            for i, new_block_n in enumerate(new_blocks)
+            if blocks_map[descriptor_id][i] != new_block_n
+        ]
+        written: set[int] = set()
+        moved = 0
+
+        while pending:
+            pending, step = self._next_step(pending, current_map, n_blocks)
+
+            if not step:
+                self._logger.warning(
+                    f"No free block to move through, [{len(pending)}] blocks "
+                    f"left in place."
+                )
+                break
+
+            self._move(step, current_map)
+            written.update(new_block_n for _, _, new_block_n in step)
+            moved += len(step)
+
+        live_blocks = {block_n for blocks in current_map.values() for block_n in blocks}
+        # Blocks used on disk but not referenced by any file are leaked too.
+        freed_blocks = sorted({*used_blocks, *written} - live_blocks)
+        cut = max(live_blocks, default=0) + 1
+
+        if shrink:
+            # Volume keeps its size, free blocks past the image read as zeros.
+            self._system_state.set_n_blocks(n_blocks)
+            self._memory_proxy.free_blocks(
+                [block_n for block_n in freed_blocks if block_n < cut]
+            )
+            self._memory_proxy.resize(cut)
+        else:
+            self._memory_proxy.free_blocks(freed_blocks)
+
+        fragments = sum(map(count_fragments, blocks_map.values()))
+        new_fragments = sum(map(count_fragments, current_map.values()))
+        self.result = moved
+
+        self._logger.info(
+            f"Successfully defragmented: moved [{moved}] blocks, "
+            f"fragments [{fragments}] -> [{new_fragments}], "
+            f"freed [{len(freed_blocks)}] blocks."
+        )
+
+        if shrink:
+            self._logger.info(
+                f"Cut image from [{n_blocks}] to [{cut}] blocks, "
+                f"volume keeps [{n_blocks}] blocks."
+            )
+
+    @staticmethod
+    def _next_step(
+        pending: list[BlockMove], current_map: dict[int, list[int]], n_blocks: int
+    ) -> tuple[list[BlockMove], list[BlockMove]]:
+        """
+        Split pending moves into the ones to make now and the rest.
+
+        Only blocks no file references are written, so a crash before the
+        block maps are replaced leaves every file readable. A cycle of moves
+        is broken by moving one block through a free block.
+        """
+
+        live_blocks = {block_n for blocks in current_map.values() for block_n in blocks}
+        step = [move for move in pending if move[2] not in live_blocks]
+
+        if step:
+            return [move for move in pending if move[2] in live_blocks], step
+
+        targets = {new_block_n for _, _, new_block_n in pending}
+        spare = next(
+            (
+                block_n
+                for block_n in range(n_blocks - 1, -1, -1)
+                if block_n not in live_blocks and block_n not in targets
+            ),
+            None,
+        )
+
+        if spare is None:
+            return pending, []
+
+        descriptor_id, i, _ = pending[0]
+
+        return pending, [(descriptor_id, i, spare)]
+
+    def _move(self, step: list[BlockMove], current_map: dict[int, list[int]]) -> None:
+        """
+        Copy blocks of a step, then point block maps at the copies with a
+        single state write.
+        """
+
+        self._memory_proxy.move_blocks(
+            {
+                current_map[descriptor_id][i]: new_block_n
+                for descriptor_id, i, new_block_n in step
+            }
+        )
+
+        for descriptor_id, i, new_block_n in step:
+            current_map[descriptor_id][i] = new_block_n
+
+        self._system_state.remap_blocks(
+            {
+                descriptor_id: list(current_map[descriptor_id])
+                for descriptor_id in {move[0] for move in step}
+            }
+        )
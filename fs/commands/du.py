@@ -0,0 +1,106 @@
+from typing import Optional
+
+from constants import PATH_DIVIDER
+from fs.commands.tree import DIRECTORY_TYPE, TreeCommand
+from fs.models.result import UsageEntry
+
+
+class DuCommand(TreeCommand):
+    """
+    Totals of every directory at and below a path.
+
+    Directories keep their totals in the state, so only directories are
+    visited. Trees holding directories of volumes made before totals were
+    kept are walked and summed object by object.
+    """
+
+    read_only = True
+
+    def exec_tree(self) -> None:
+        root_path = self.tree_path(self.kwargs.get("path"))
+        entries = self.kept_usage(root_path)
+
+        if entries is None:
+            entries = self.walked_usage(root_path)
+        else:
+            for entry in entries:
+                self._log_entry(entry)
+
+        self.result = entries
+
+    def kept_usage(self, root_path: str) -> Optional[list[UsageEntry]]:
+        root = self._tree_root(root_path)
+
+        if root.type != DIRECTORY_TYPE:
+            return None
+
+        entries: list[UsageEntry] = []
+
+        if not self._kept_usage(root_path, root.n, entries):
+            return None
+
+        return entries
+
+    def _kept_usage(
+        self, path: str, descriptor_id: int, entries: list[UsageEntry]
+    ) -> bool:
+        names = self._system_state.get_directory_names(descriptor_id)
+
+        for name, child_id in sorted(names.items()):
+            child_type = self._system_state.get_descriptor_state(child_id).type
+
+            if child_type == DIRECTORY_TYPE and not self._kept_usage(
+                f"{path}{PATH_DIVIDER}{name}", child_id, entries
+            ):
+                return False
+
+        usage = self._system_state.get_usage(descriptor_id)
+
+        if usage is None:
+            return False
+
+        entries.append(
+            UsageEntry(path or PATH_DIVIDER, usage.size, usage.blocks, usage.inodes)
+        )
+
+        return True
+
+    def walked_usage(self, root_path: str) -> list[UsageEntry]:
+        # Totals of directories whose children are being walked.
+        usage: dict[str, UsageEntry] = {}
+        counted: set[int] = set()
+        entries = []
+
+        for node in self.walk_nodes(root_path, topdown=False):
+            entry = usage.pop(node.path, None) or UsageEntry(node.path, 0, 0, 0)
+            n = node.entry.n
+
+            if n not in counted:
+                counted.add(n)
+
+                entry.size += node.entry.size
+                entry.blocks += len(self._system_state.get_descriptor_state(n).blocks)
+                entry.inodes += 1
+
+            if node.path != root_path:
+                parent_path = node.path.rpartition(PATH_DIVIDER)[0]
+                parent_entry = usage.setdefault(
+                    parent_path, UsageEntry(parent_path, 0, 0, 0)
+                )
+
+                parent_entry.size += entry.size
+                parent_entry.blocks += entry.blocks
+                parent_entry.inodes += entry.inodes
+
+            if node.entry.type == DIRECTORY_TYPE or node.path == root_path:
+                # Root is reported as "/", as find does.
+                entry.path = entry.path or PATH_DIVIDER
+                entries.append(entry)
+                self._log_entry(entry)
+
+        return entries
+
+    def _log_entry(self, entry: UsageEntry) -> None:
+        self._logger.info(
+            f"{entry.size}\t{entry.blocks}\t{entry.inodes}\t{entry.path}"
+        )
@@ -0,0 +1,53 @@
+from collections.abc import Iterator
+from dataclasses import replace
+from fnmatch import fnmatchcase
+
+from constants import PATH_DIVIDER, ROOT_DIRECTORY_PATH
+from fs.commands.tree import TreeCommand
+from fs.models.path import TreeNode
+
+
+class FindCommand(TreeCommand):
+    read_only = True
+
+    def exec_tree(self) -> None:
+        root_path = self.tree_path(self.kwargs.get("path"))
+        name = self.kwargs.get("name")
+        descriptor_type = self.kwargs.get("type")
+
+        entries = []
+        nodes = (
+            self.walk_nodes(root_path)
+            if name is None
+            else self.find_nodes(root_path, name)
+        )
+
+        for node in nodes:
+            if descriptor_type is not None and node.entry.type != descriptor_type:
+                continue
+
+            entry = replace(node.entry, name=node.path or PATH_DIVIDER)
+            entries.append(entry)
+            self._logger.info(entry.name)
+
+        self.result = entries
+
+    def find_nodes(self, root_path: str, pattern: str) -> Iterator[TreeNode]:
+        """
+        Objects at and below `root_path` named like shell `pattern`, in walk
+        order. Names are looked up in the name index, the tree isn't walked.
+        """
+
+        root = self._tree_root(root_path)
+        prefix = root_path + PATH_DIVIDER
+
+        if root_path == ROOT_DIRECTORY_PATH and fnmatchcase(root.name, pattern):
+            # Volume root has no name, so isn't indexed.
+            yield TreeNode(root_path, root)
+
+        for path, descriptor_id in self._system_state.find_names(pattern):
+            if path == root_path or path.startswith(prefix):
+                yield TreeNode(
+                    path,
+                    self.get_entry(path.rpartition(PATH_DIVIDER)[2], descriptor_id),
+                )
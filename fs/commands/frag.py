@@ -0,0 +1,66 @@
+import logging
+
+from tabulate import tabulate
+
+from fs.commands.base import BaseFSCommand
+from fs.commands.defrag import count_fragments
+from fs.driver.sparse import coalesce_blocks
+from fs.exceptions import FSNotFormatted
+from fs.models.result import FragReport
+
+
+def extents_histogram(extents: list[tuple[int, int]]) -> dict[str, int]:
+    """
+    Count extents by length in power of two ranges: `1`, `2-3`, `4-7`, ...
+    """
+
+    histogram: dict[str, int] = {}
+
+    for _, count in sorted(extents, key=lambda extent: extent[1]):
+        low = 1 << (count.bit_length() - 1)
+        label = str(low) if low == 1 else f"{low}-{2 * low - 1}"
+
+        histogram[label] = histogram.get(label, 0) + 1
+
+    return histogram
+
+
+class FragCommand(BaseFSCommand):
+    def exec(self) -> None:
+        if not self._system_state.check_system_formatted():
+            raise FSNotFormatted("Can't perform actions on not formatted fs.")
+
+        n_blocks = self._memory_proxy.get_n_blocks()
+        used_blocks = set(self._memory_proxy.get_used_blocks())
+        free_extents = coalesce_blocks(
+            block_n for block_n in range(n_blocks) if block_n not in used_blocks
+        )
+
+        blocks_map = self._system_state.get_blocks_map()
+        extents = sum(map(count_fragments, blocks_map.values()))
+
+        self.result = FragReport(
+            allocation=self._system_state.allocation,
+            n_blocks=n_blocks,
+            used_blocks=len(used_blocks),
+            free_blocks=n_blocks - len(used_blocks),
+            free_extents=len(free_extents),
+            largest_free_extent=max((count for _, count in free_extents), default=0),
+            free_extents_histogram=extents_histogram(free_extents),
+            files=len(blocks_map),
+            avg_extents_per_file=extents / len(blocks_map) if blocks_map else 0.0,
+        )
+
+        if self._logger.isEnabledFor(logging.INFO):
+            report = self.result
+            self._logger.info(
+                f"Allocation policy [{report.allocation}], "
+                f"used [{report.used_blocks}] of [{report.n_blocks}] blocks, "
+                f"[{report.files}] files with "
+                f"[{report.avg_extents_per_file:.2f}] extents on average, "
+                f"largest free extent [{report.largest_free_extent}] blocks.\n"
+                + tabulate(
+                    report.free_extents_histogram.items(),
+                    headers=["free extent blocks", "count"],
+                )
+            )
@@ -1,4 +1,7 @@
+import logging
+
 from fs.commands.base import BaseFSCommand
+from fs.models.result import StatResult
 
 
 class FstatCommand(BaseFSCommand):
@@ -6,10 +9,12 @@ class FstatCommand(BaseFSCommand):
         fid = self.kwargs["fid"]
 
         if self._system_state.check_for_descriptor(fid):
-            descriptor_blocks = self._system_state.get_descriptor_blocks(fid)
-            descriptor = self._memory_proxy.get_descriptor(fid, descriptor_blocks)
+            descriptor = self.get_descriptor_by_id(fid)
+
+            self.result = StatResult.from_descriptor(descriptor)
 
-            self._logger.info(descriptor)
+            if self._logger.isEnabledFor(logging.INFO):
+                self._logger.info(descriptor)
 
         else:
             self._logger.info(f"There is no such a descriptor: [{fid}].")
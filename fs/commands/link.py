@@ -17,7 +17,7 @@ class LinkCommand(BaseFSCommand):
             self._logger.info(f"Can't create symlink for non existing file `{path1}`.")
 
         else:
-            self._memory_proxy.add_ref_count(file_descriptor, 1)
+            self.add_ref_count(file_descriptor, 1)
             self._system_state.map_path_to_descriptor(
                 resolved_path2.fs_object_path, file_descriptor.n
             )
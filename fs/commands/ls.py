@@ -1,15 +1,35 @@
+import json
+import logging
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from dataclasses import astuple
+from itertools import islice
+from typing import Optional, Union
+
 from tabulate import tabulate
 
-from constants import PATH_DIVIDER
-from fs.commands.base import BaseFSCommand
-from fs.exceptions import FSNotFormatted
-from fs.models.descriptor.base import Descriptor
-from fs.models.descriptor.directory import DirectoryDescriptor
-from fs.models.descriptor.file import FileDescriptor
-from fs.models.descriptor.symlink import SymlinkDescriptor
+from constants import (LS_OUTPUT_JSONL, LS_OUTPUT_TABLE, PATH_DIVIDER,
+                       ROOT_DIRECTORY_PATH)
+from fs.commands.tree import DIRECTORY_TYPE, TreeCommand
+from fs.exceptions import DirectoryNotExists, FSNotFormatted
+from fs.models.result import DirectoryEntry
+
+
+class LsCommand(TreeCommand):
+    """
+    Entries of a directory: "." and ".." first, then names in order.
+
+    Entries come from the namespace and metadata kept in state, directory
+    blocks are never read. The table is rendered once all entries are
+    built, JSON lines and TSV outputs log every entry right when it is
+    built, so a listing starts immediately whatever the directory size.
+    With `names_only` no descriptor metadata is looked up at all.
 
+    A page starts after the `after` name and holds at most `limit` entries.
+    In streaming outputs result is the name of the last entry logged, to be
+    passed as `after` for the next page.
+    """
 
-class LsCommand(BaseFSCommand):
     output_headers: list[str] = [
         "name",
         "descriptor",
@@ -17,64 +37,111 @@ class LsCommand(BaseFSCommand):
         "refs_count",
         "size",
     ]
-    descriptor_types: dict[Descriptor, str] = {
-        DirectoryDescriptor: "directory",
-        FileDescriptor: "file",
-        SymlinkDescriptor: "symlink",
-    }
+    read_only = True
 
-    def exec(self) -> None:
+    def exec_tree(self) -> None:
         if not self._system_state.check_system_formatted():
             raise FSNotFormatted("Can't perform actions on not formatted fs.")
 
-        resolved_path = self.resolve_path(to_dir=True)
-
-        directory_links = resolved_path.directory.read_directory_links()
-        output_info = []
-
-        for fs_object_name, descriptor_id in directory_links.items():
-            descriptor_blocks = self._system_state.get_descriptor_blocks(descriptor_id)
-            descriptor = self._memory_proxy.get_descriptor(
-                descriptor_id, descriptor_blocks
-            )
-
-            descriptor_type = self.descriptor_types[type(descriptor)]
-
-            output_info.append(
-                [
-                    fs_object_name,
-                    descriptor.n,
-                    descriptor_type,
-                    descriptor.refs_count,
-                    descriptor.size,
-                ]
-            )
-
-            # Add also links to fs object.
-            links_resolved_path = self.resolve_path(fs_object_name)
-
-            filtered_links = [
-                self.resolve_path(link).fs_object_name
-                for link, descriptor in self._system_state.get_path_to_descriptor_mapping().items()
-                if (
-                    link.replace(links_resolved_path.directory_path, "", 1)
-                    and link
-                    != resolved_path.directory_path + PATH_DIVIDER + fs_object_name
-                    and descriptor == descriptor_id
-                    and links_resolved_path.fs_object_path != link
-                    and resolved_path.directory_path != link
-                )
-            ]
-
-            for link in filtered_links:
-                output_info.append(
-                    [
-                        link,
-                        descriptor.n,
-                        descriptor_type,
-                        descriptor.refs_count,
-                        descriptor.size,
-                    ]
-                )
-
-        self._logger.info("\n" + tabulate(output_info, headers=self.output_headers))
+        path = self.ls_path(self.kwargs.get("path"))
+        output = self.kwargs.get("output") or LS_OUTPUT_TABLE
+        names_only = self.kwargs.get("names_only", False)
+
+        names = islice(
+            self.list_names(path, self.kwargs.get("after")), self.kwargs.get("limit")
+        )
+        rows: Iterator[Union[str, DirectoryEntry]] = (
+            (name for name, _ in names)
+            if names_only
+            else (self.get_entry(name, descriptor_id) for name, descriptor_id in names)
+        )
+
+        if output == LS_OUTPUT_TABLE:
+            self.result = list(rows)
+
+            if self._logger.isEnabledFor(logging.INFO):
+                self._log_table(self.result, names_only)
+        else:
+            self.result = self._log_rows(rows, output)
+
+    def ls_path(self, path: Optional[str]) -> str:
+        """
+        Full path of directory to list, symlinks are followed.
+        """
+
+        if path in (None, ROOT_DIRECTORY_PATH, "."):
+            return self._system_state.get_cwd()
+
+        if path == "..":
+            return self._system_state.get_cwd().rpartition(PATH_DIVIDER)[0]
+
+        return self.lookup_path(path)
+
+    def list_names(
+        self, path: str, after: Optional[str] = None
+    ) -> Iterator[tuple[str, int]]:
+        """
+        Names of directory entries with their descriptor ids, following the
+        `after` name if passed.
+        """
+
+        descriptor_id = self._system_state.get_descriptor_id(path)
+
+        if (
+            descriptor_id is None
+            or self.get_entry(path, descriptor_id).type != DIRECTORY_TYPE
+        ):
+            raise DirectoryNotExists("Can't find directory with such a path.")
+
+        parent_id = self._system_state.get_descriptor_id(
+            path.rpartition(PATH_DIVIDER)[0]
+        )
+        # Root is its own parent.
+        links = [(".", descriptor_id), ("..", parent_id)]
+
+        directory_names = self._system_state.get_directory_names(descriptor_id)
+        names = sorted(directory_names)
+
+        if after in (".", ".."):
+            links = links[[name for name, _ in links].index(after) + 1 :]
+        elif after is not None:
+            # Cursor may name an entry removed since the previous page.
+            links = []
+            names = names[bisect_right(names, after) :]
+
+        yield from links
+
+        for name in names:
+            yield name, directory_names[name]
+
+    def _log_table(
+        self, rows: list[Union[str, DirectoryEntry]], names_only: bool
+    ) -> None:
+        if names_only:
+            output_info, headers = [(name,) for name in rows], self.output_headers[:1]
+        else:
+            output_info, headers = [
+                astuple(entry) for entry in rows
+            ], self.output_headers
+
+        self._logger.info("\n" + tabulate(output_info, headers=headers))
+
+    def _log_rows(
+        self, rows: Iterable[Union[str, DirectoryEntry]], output: str
+    ) -> Optional[str]:
+        last_name = None
+
+        for row in rows:
+            if isinstance(row, str):
+                last_name = row
+                fields = {self.output_headers[0]: row}
+            else:
+                last_name = row.name
+                fields = dict(zip(self.output_headers, astuple(row)))
+
+            if output == LS_OUTPUT_JSONL:
+                self._logger.info(json.dumps(fields))
+            else:
+                self._logger.info("\t".join(str(value) for value in fields.values()))
+
+        return last_name
@@ -21,7 +21,9 @@ class MkdirCommand(BaseFSCommand):
             parent=resolved_path.directory,
         )
 
-        self.save(new_directory.descriptor, resolved_path.fs_object_path)
-        self.save(resolved_path.directory, resolved_path.directory_path)
+        self.save_all(
+            (new_directory.descriptor, resolved_path.fs_object_path),
+            (resolved_path.directory, resolved_path.directory_path),
+        )
 
         self._logger.info(f"Successfully created directory [{path}].")
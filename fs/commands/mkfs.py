@@ -1,5 +1,7 @@
 from constants import N_BLOCKS_MAX, ROOT_DESCRIPTOR_N, ROOT_DIRECTORY_PATH
 from fs.commands.base import BaseFSCommand
+from fs.driver.allocation import current_allocation_policy
+from fs.driver.reclaim import current_reclaimer
 from fs.exceptions import FSNotMounted
 
 
@@ -25,6 +27,9 @@ class MkfsCommand(BaseFSCommand):
         self._memory_proxy.clear()
         self.save(root.descriptor, ROOT_DIRECTORY_PATH)
 
-        self._memory_proxy.write_empty_blocks(N_BLOCKS_MAX, start_from=1)
+        self._memory_proxy.resize(N_BLOCKS_MAX)
+        self._system_state.set_n_blocks(N_BLOCKS_MAX)
+        current_allocation_policy().reset()
+        current_reclaimer().discard()
 
         self._logger.info("Successfully formatted.")
@@ -1,7 +1,23 @@
+from constants import ALLOCATION_FIRST_FIT, DURABILITY_NONE
 from fs.commands.base import BaseFSCommand
+from fs.driver.allocation import set_allocation_policy
+from fs.driver.journal import create_journal
 
 
 class MountCommand(BaseFSCommand):
     def exec(self) -> None:
         self._memory_proxy.create_memory_file()
+
+        if self.kwargs.get("journal"):
+            create_journal()
+
         self._system_state.set_mounted(True)
+        self._system_state.set_durability(
+            self.kwargs.get("durability", DURABILITY_NONE)
+        )
+
+        allocation = self.kwargs.get("allocation", ALLOCATION_FIRST_FIT)
+        self._system_state.set_allocation(allocation)
+        set_allocation_policy(allocation)
+
+        self._system_state.set_inline_data(self.kwargs.get("inline", False))
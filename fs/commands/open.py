@@ -9,7 +9,8 @@ class OpenCommand(BaseFSCommand):
 
         file_descriptor = self.get_file_descriptor_by_path(resolved_path.fs_object_path)
         file_descriptor.opened = True
-        self.save(file_descriptor, path)
+        self.save(file_descriptor, resolved_path.fs_object_path)
 
         fd = self._system_state.map_filepath_to_fd(resolved_path.fs_object_path)
+        self.result = fd
         self._logger.info(f"Successfully opened file [{path}] with fd [{fd}].")
@@ -0,0 +1,65 @@
+from constants import PATH_DIVIDER
+from fs.commands.base import BaseFSCommand
+from fs.driver.utils import QuotaState
+from fs.exceptions import DirectoryNotExists
+from fs.models.descriptor.directory import DirectoryDescriptor
+from fs.models.result import DESCRIPTOR_TYPES, QuotaEntry
+
+
+class QuotaCommand(BaseFSCommand):
+    """
+    Totals of a directory and their limits.
+
+    Passing any of `size`, `blocks` or `inodes` replaces the limits, `clear`
+    removes them. Totals are kept in the state, nothing below the directory
+    is visited.
+    """
+
+    def exec(self) -> None:
+        path = self.lookup_path(self.kwargs["path"])
+        descriptor_id = self._system_state.get_descriptor_id(path)
+
+        if (
+            descriptor_id is None
+            or self._system_state.get_descriptor_state(descriptor_id).type
+            != DESCRIPTOR_TYPES[DirectoryDescriptor]
+        ):
+            raise DirectoryNotExists("Can't find directory with such a path.")
+
+        usage = self._system_state.get_usage(descriptor_id)
+
+        if usage is None:
+            self._logger.info(f"Totals of [{path}] are not kept, it is too old.")
+            return
+
+        limits = {
+            name: self.kwargs.get(name)
+            for name in ("size", "blocks", "inodes")
+            if self.kwargs.get(name) is not None
+        }
+
+        if self.kwargs.get("clear"):
+            self._system_state.set_quota(descriptor_id, None)
+        elif limits:
+            self._system_state.set_quota(descriptor_id, QuotaState(**limits))
+
+        quota = self._system_state.get_quota(descriptor_id) or QuotaState()
+
+        self.result = QuotaEntry(
+            path=path,
+            size=usage.size,
+            blocks=usage.blocks,
+            inodes=usage.inodes,
+            max_size=quota.size,
+            max_blocks=quota.blocks,
+            max_inodes=quota.inodes,
+        )
+        columns = [
+            f"{used}/{'-' if limit is None else limit}"
+            for used, limit in (
+                (usage.size, quota.size),
+                (usage.blocks, quota.blocks),
+                (usage.inodes, quota.inodes),
+            )
+        ]
+        self._logger.info("\t".join(columns + [path or PATH_DIVIDER]))
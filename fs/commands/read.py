@@ -1,3 +1,5 @@
+import logging
+
 from fs.commands.base import BaseFSCommand
 from fs.exceptions import FileDescriptorNotExists
 
@@ -14,7 +16,8 @@ class ReadCommand(BaseFSCommand):
             )
 
         file_descriptor = self.get_file_descriptor_by_path(path)
-        content = file_descriptor.read_content(size, offset)
+        self.result = file_descriptor.read_bytes(size, offset)
 
-        self._logger.info(f"Successfully read from fd [{fd}]:")
-        self._logger.info(content)
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(f"Successfully read from fd [{fd}]:")
+            self._logger.info(file_descriptor.read_content(size, offset))
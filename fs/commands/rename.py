@@ -0,0 +1,59 @@
+from constants import PATH_DIVIDER, ROOT_DIRECTORY_PATH
+from fs.commands.base import BaseFSCommand
+from fs.exceptions import FileAlreadyExists, FileNotExists, RenameDenied
+from fs.models.descriptor.directory import DirectoryDescriptor
+from fs.models.result import DESCRIPTOR_TYPES
+
+
+class RenameCommand(BaseFSCommand):
+    def exec(self) -> None:
+        path1, path2 = self.kwargs["path1"], self.kwargs["path2"]
+
+        resolved_path1 = self.resolve_path(path1, resolve_symlink=False)
+        resolved_path2 = self.resolve_path(path2)
+
+        source_path = resolved_path1.fs_object_path
+        target_path = resolved_path2.fs_object_path
+
+        descriptor_id = self._system_state.get_descriptor_id(source_path)
+
+        if descriptor_id is None:
+            raise FileNotExists("Can't rename not existing file.")
+
+        if source_path == ROOT_DIRECTORY_PATH:
+            raise RenameDenied("Can't rename root directory.")
+
+        if self._system_state.check_path_exists(target_path):
+            raise FileAlreadyExists("Can't rename to name of already existing file.")
+
+        descriptor = self.get_descriptor_by_id(descriptor_id)
+        directory = isinstance(descriptor, DirectoryDescriptor)
+
+        if directory and target_path.startswith(source_path + PATH_DIVIDER):
+            raise RenameDenied("Can't move directory into itself.")
+
+        source_directory = resolved_path1.directory
+        target_directory = resolved_path2.directory
+
+        if target_directory.n == source_directory.n:
+            target_directory = source_directory
+
+        self.remove_link(source_directory, resolved_path1.fs_object_name)
+        target_directory.write_link(
+            resolved_path2.fs_object_name,
+            descriptor_id,
+            DESCRIPTOR_TYPES[type(descriptor)],
+        )
+
+        self._system_state.move(source_path, target_path)
+
+        self.save(source_directory, resolved_path1.directory_path)
+
+        if target_directory is not source_directory:
+            self.save(target_directory, resolved_path2.directory_path)
+
+            if directory:
+                descriptor.update_directory_link("..", target_directory.n)
+                self.save(descriptor, target_path)
+
+        self._logger.info(f"Successfully renamed `{path1}` to `{path2}`.")
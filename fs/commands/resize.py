@@ -0,0 +1,33 @@
+from fs.commands.base import BaseFSCommand
+from fs.exceptions import FSNotFormatted, ResizeDenied
+
+
+class ResizeCommand(BaseFSCommand):
+    def exec(self) -> None:
+        blocks, descriptors = self.kwargs["blocks"], self.kwargs.get("descriptors")
+
+        if not self._system_state.check_system_formatted():
+            raise FSNotFormatted("Can't perform actions on not formatted fs.")
+
+        n_blocks = self._memory_proxy.get_n_blocks()
+
+        if blocks < n_blocks:
+            raise ResizeDenied(f"Can't shrink volume of [{n_blocks}] blocks.")
+
+        if descriptors is not None:
+            n_descriptors = self._system_state.get_n_descriptors()
+
+            if descriptors < n_descriptors:
+                raise ResizeDenied(
+                    f"Can't shrink descriptor table of [{n_descriptors}] descriptors."
+                )
+
+            self._system_state.grow_descriptors(descriptors)
+
+        # New blocks are sparse and read as free.
+        self._memory_proxy.resize(blocks)
+        self._system_state.set_n_blocks(blocks)
+
+        self._logger.info(
+            f"Successfully resized volume from [{n_blocks}] to [{blocks}] blocks."
+        )
@@ -0,0 +1,46 @@
+from constants import PATH_DIVIDER, ROOT_DIRECTORY_PATH
+from fs.commands.tree import DIRECTORY_TYPE, TreeCommand
+from fs.exceptions import RemoveDenied
+
+
+class RmCommand(TreeCommand):
+    def exec_tree(self) -> None:
+        path = self.kwargs["path"]
+
+        resolved_path = self.resolve_path(path, resolve_symlink=False)
+        root_path = resolved_path.fs_object_path
+
+        if root_path == ROOT_DIRECTORY_PATH:
+            raise RemoveDenied("Can't remove root directory.")
+
+        freed_blocks = []
+        removed = 0
+
+        for node in self.walk_nodes(root_path, topdown=False):
+            n = node.entry.n
+
+            if node.entry.type == DIRECTORY_TYPE or node.entry.refs_count <= 1:
+                freed_blocks += self._system_state.get_descriptor_state(n).blocks
+                self._system_state.unmap_descriptor_from_blocks(n)
+
+            else:
+                # Other names still link it.
+                self._system_state.set_ref_count(n, node.entry.refs_count - 1)
+
+            self._system_state.unmap_path_from_descriptor(node.path)
+
+            removed += 1
+            self._logger.info(f"Removed `{node.path}`.")
+
+        self.remove_link(resolved_path.directory, resolved_path.fs_object_name)
+        resolved_path.directory.update_size()
+        self.save(resolved_path.directory, resolved_path.directory_path)
+
+        cwd = self._system_state.get_cwd()
+
+        if cwd == root_path or cwd.startswith(root_path + PATH_DIVIDER):
+            self._system_state.set_cwd(resolved_path.directory_path)
+
+        self._memory_proxy.free_blocks(freed_blocks)
+
+        self.result = removed
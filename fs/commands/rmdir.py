@@ -17,12 +17,10 @@ class RmdirCommand(BaseFSCommand):
         if len(directory.read_directory_links()) != DIRECTORY_DEFAULT_LINKS_COUNT:
             raise DirectoryNotEmpty("Can't delete non-empty directory")
 
-        directory.clear()
-        self._memory_proxy.write(directory)
-        self._memory_proxy.add_ref_count(directory, -1)
+        self._memory_proxy.free_blocks([block.n for block in directory.blocks])
         self._system_state.remove(directory, resolved_path.fs_object_path)
 
-        resolved_path.directory.remove_directory_link(resolved_path.fs_object_name)
+        self.remove_link(resolved_path.directory, resolved_path.fs_object_name)
         resolved_path.directory.update_size()
         self.save(resolved_path.directory, resolved_path.directory_path)
 
@@ -0,0 +1,22 @@
+from fs.commands.tree import DIRECTORY_TYPE, TreeCommand
+from fs.exceptions import DirectoryNotExists
+
+
+class ScandirCommand(TreeCommand):
+    """
+    Result is a lazy iterator of directory entries, consumed by the caller.
+    """
+
+    read_only = True
+
+    def exec_tree(self) -> None:
+        path = self.tree_path(self.kwargs.get("path"))
+        descriptor_id = self._system_state.get_descriptor_id(path)
+
+        if (
+            descriptor_id is None
+            or self.get_entry(path, descriptor_id).type != DIRECTORY_TYPE
+        ):
+            raise DirectoryNotExists("Can't find directory with such a path.")
+
+        self.result = self.scandir(descriptor_id)
@@ -0,0 +1,97 @@
+import json
+from dataclasses import asdict
+from typing import Optional, Union
+
+from fs.commands.base import BaseFSCommand
+from fs.driver.state import read_only_state
+from fs.driver.utils import DescriptorState
+from fs.models.raw import BlockHeader
+from fs.models.result import StatResult
+
+
+class StatCommand(BaseFSCommand):
+    """
+    Stat of many objects, by `paths` and descriptor `ids`, against a state
+    loaded once.
+
+    Type, size, links count and blocks are cached in the state, only the
+    first block header of every descriptor is read for its opened flag.
+    Headers are read in block order with one image open. Result is a list
+    aligned with paths followed by ids, None for a missing object.
+    """
+
+    def exec(self) -> None:
+        with read_only_state():
+            self.exec_stat()
+
+    def exec_stat(self) -> None:
+        targets: list[tuple[Union[str, int], Optional[int]]] = [
+            (path, self._path_descriptor_id(path))
+            for path in self.kwargs.get("paths") or []
+        ]
+        targets += [
+            (descriptor_id, self._used_descriptor_id(descriptor_id))
+            for descriptor_id in self.kwargs.get("ids") or []
+        ]
+
+        states = {
+            descriptor_id: self._system_state.get_descriptor_state(descriptor_id)
+            for _, descriptor_id in targets
+            if descriptor_id is not None
+        }
+        headers = self._memory_proxy.read_headers(
+            [
+                descriptor_state.blocks[0]
+                for descriptor_state in states.values()
+                if descriptor_state.blocks and descriptor_state.inline is None
+            ]
+        )
+
+        results = []
+
+        for target, descriptor_id in targets:
+            if descriptor_id is None:
+                result = None
+                self._logger.info(json.dumps(dict(target=target, result=None)))
+            else:
+                result = self._stat(states[descriptor_id], headers)
+                self._logger.info(json.dumps(dict(target=target, **asdict(result))))
+
+            results.append(result)
+
+        self.result = results
+
+    def _path_descriptor_id(self, path: str) -> Optional[int]:
+        return self._system_state.get_descriptor_id(self.lookup_path(path))
+
+    def _used_descriptor_id(self, descriptor_id: int) -> Optional[int]:
+        if (
+            0 <= descriptor_id < self._system_state.get_n_descriptors()
+            and self._system_state.check_for_descriptor(descriptor_id)
+        ):
+            return descriptor_id
+
+        return None
+
+    def _stat(
+        self, descriptor_state: DescriptorState, headers: dict[int, BlockHeader]
+    ) -> StatResult:
+        if descriptor_state.type is None or descriptor_state.ref_count is None:
+            # Volume made before metadata was cached, headers have it.
+            return StatResult.from_descriptor(
+                self.get_descriptor_by_id(descriptor_state.n)
+            )
+
+        if descriptor_state.inline is not None:
+            opened = descriptor_state.inline.opened
+        else:
+            opened = headers[descriptor_state.blocks[0]].opened
+
+        return StatResult(
+            n=descriptor_state.n,
+            type=descriptor_state.type,
+            refs_count=descriptor_state.ref_count,
+            size=descriptor_state.size,
+            opened=opened,
+            blocks=list(descriptor_state.blocks),
+        )
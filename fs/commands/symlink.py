@@ -20,7 +20,10 @@ class SymlinkCommand(BaseFSCommand):
             directory_descriptor=resolved_path.directory,
             name=resolved_path.fs_object_name,
             content=content,
+            inline=self._system_state.inline_data,
         )
 
-        self.save(symlink.descriptor, resolved_path.fs_object_path)
-        self.save(resolved_path.directory, resolved_path.directory_path)
+        self.save_all(
+            (symlink.descriptor, resolved_path.fs_object_path),
+            (resolved_path.directory, resolved_path.directory_path),
+        )
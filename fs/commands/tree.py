@@ -0,0 +1,157 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import Optional
+
+from constants import PATH_DIVIDER, ROOT_DIRECTORY_PATH
+from fs.commands.base import BaseFSCommand
+from fs.driver.state import read_only_state
+from fs.exceptions import FileNotExists
+from fs.models.descriptor.directory import DirectoryDescriptor
+from fs.models.path import TreeNode
+from fs.models.result import DESCRIPTOR_TYPES, DirectoryEntry
+
+DIRECTORY_TYPE = DESCRIPTOR_TYPES[DirectoryDescriptor]
+
+
+class TreeCommand(BaseFSCommand, ABC):
+    """
+    Base of commands working on a whole tree below a path.
+
+    Every state access of the command is written to the config once, when
+    the command is done, or never if it only reads or fails.
+    """
+
+    read_only: bool = False
+
+    def exec(self) -> None:
+        if self.read_only:
+            with read_only_state():
+                self.exec_tree()
+            return
+
+        try:
+            with self._system_state.batched():
+                self.exec_tree()
+        except Exception:
+            self.rollback_tree()
+            raise
+
+    @abstractmethod
+    def exec_tree(self) -> None:
+        raise NotImplementedError("Command must implement its exec_tree method.")
+
+    def rollback_tree(self) -> None:
+        """
+        Undo changes a failed `exec_tree` made outside of its dropped state,
+        e.g. blocks allocated in the image.
+        """
+
+    def tree_path(self, path: Optional[str]) -> str:
+        """
+        Full path of `path` without following a symlink it names, cwd if None.
+        """
+
+        if path is None:
+            return self._system_state.get_cwd()
+
+        if path in (ROOT_DIRECTORY_PATH, PATH_DIVIDER):
+            return ROOT_DIRECTORY_PATH
+
+        return self.resolve_path(path, resolve_symlink=False).fs_object_path
+
+    def get_entry(self, name: str, descriptor_id: int) -> DirectoryEntry:
+        """
+        Entry of a descriptor from metadata cached in the state, no block read.
+        """
+
+        descriptor_state = self._system_state.get_descriptor_state(descriptor_id)
+
+        if descriptor_state.type is None:
+            # Volume made before metadata was cached, headers have it.
+            return DirectoryEntry.from_descriptor(
+                name, self.get_descriptor_by_id(descriptor_id)
+            )
+
+        return DirectoryEntry(
+            name=name,
+            n=descriptor_id,
+            type=descriptor_state.type,
+            refs_count=descriptor_state.ref_count,
+            size=descriptor_state.size,
+        )
+
+    def scandir(self, descriptor_id: int) -> Iterator[DirectoryEntry]:
+        """
+        Entries of a directory in name order, built one at a time.
+        """
+
+        names = self._system_state.get_directory_names(descriptor_id)
+
+        for name, child_id in sorted(names.items()):
+            yield self.get_entry(name, child_id)
+
+    def walk(
+        self, path: str, topdown: bool = True
+    ) -> Iterator[tuple[str, list[DirectoryEntry], list[DirectoryEntry]]]:
+        """
+        Directory path, its subdirectories and other entries for every
+        directory at and below `path`, like `os.walk`.
+
+        Subdirectories are walked by descriptor id, no path is looked up
+        from root. With `topdown`, a directory is yielded before its
+        subdirectories and removing them from the list prunes the walk.
+        """
+
+        yield from self._walk(path, self._tree_root(path).n, topdown)
+
+    def _walk(
+        self, path: str, descriptor_id: int, topdown: bool
+    ) -> Iterator[tuple[str, list[DirectoryEntry], list[DirectoryEntry]]]:
+        directories, others = [], []
+
+        for entry in self.scandir(descriptor_id):
+            if entry.type == DIRECTORY_TYPE:
+                directories.append(entry)
+            else:
+                others.append(entry)
+
+        if topdown:
+            yield path, directories, others
+
+        for entry in directories:
+            yield from self._walk(f"{path}{PATH_DIVIDER}{entry.name}", entry.n, topdown)
+
+        if not topdown:
+            yield path, directories, others
+
+    def walk_nodes(self, path: str, topdown: bool = True) -> Iterator[TreeNode]:
+        """
+        Every object at and below `path`, symlinks are not followed.
+
+        Directories come before their children, or after them unless
+        `topdown`. Entries are built right before being yielded, so they
+        reflect changes made to the objects visited before.
+        """
+
+        yield from self._walk_nodes(TreeNode(path, self._tree_root(path)), topdown)
+
+    def _walk_nodes(self, node: TreeNode, topdown: bool) -> Iterator[TreeNode]:
+        if topdown:
+            yield node
+
+        if node.entry.type == DIRECTORY_TYPE:
+            for entry in self.scandir(node.entry.n):
+                yield from self._walk_nodes(
+                    TreeNode(f"{node.path}{PATH_DIVIDER}{entry.name}", entry), topdown
+                )
+
+        if not topdown:
+            yield node
+
+    def _tree_root(self, path: str) -> DirectoryEntry:
+        descriptor_id = self._system_state.get_descriptor_id(path)
+
+        if descriptor_id is None:
+            raise FileNotExists("Can't find object with such a path.")
+
+        return self.get_entry(path.rpartition(PATH_DIVIDER)[2], descriptor_id)
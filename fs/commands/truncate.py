@@ -13,8 +13,7 @@ class TruncateCommand(BaseFSCommand):
         blocks_deleted = file_descriptor.truncate(size)
 
         # Delete unused blocks.
-        for block in blocks_deleted:
-            self._memory_proxy.write_empty_blocks(block.n + 1, start_from=block.n)
+        self._memory_proxy.free_blocks([block.n for block in blocks_deleted])
 
         file_descriptor.update_size()
 
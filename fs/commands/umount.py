@@ -1,8 +1,15 @@
 from fs.commands.base import BaseFSCommand
+from fs.driver.durability import current_flusher
+from fs.driver.journal import discard_journal
+from fs.driver.reclaim import current_reclaimer
 
 
 class UmountCommand(BaseFSCommand):
     def exec(self) -> None:
+        current_flusher().stop()
+        discard_journal()
+        current_reclaimer().discard()
+
         self._memory_proxy.delete_memory_file()
         self._system_state.clear_config_file()
         self._system_state.set_mounted(False)
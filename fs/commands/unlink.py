@@ -1,4 +1,5 @@
 from fs.commands.base import BaseFSCommand
+from fs.driver.reclaim import current_reclaimer
 from fs.exceptions import FileNotExists
 
 
@@ -16,12 +17,16 @@ class UnlinkCommand(BaseFSCommand):
             self._logger.info(f"Can't delete symlink for non existing file `{path}`.")
 
         else:
-            total_refs_count = self._memory_proxy.add_ref_count(file_descriptor, -1)
+            refs_count = self.add_ref_count(file_descriptor, -1)
 
-            if not total_refs_count:
-                resolved_path.directory.remove_directory_link(path)
+            if not refs_count:
+                self.remove_link(
+                    resolved_path.directory, resolved_path.fs_object_name
+                )
 
-                self._memory_proxy.write(resolved_path.directory)
+                self.save(resolved_path.directory, resolved_path.directory_path)
+                # Blocks stay used until the reclaimer releases them in a batch.
+                current_reclaimer().free(file_descriptor.block_numbers)
                 self._system_state.remove(file_descriptor, resolved_path.fs_object_path)
 
             else:
@@ -0,0 +1,18 @@
+from fs.commands.tree import TreeCommand
+
+
+class WalkCommand(TreeCommand):
+    """
+    Result is a lazy `os.walk` like iterator, consumed by the caller.
+    """
+
+    read_only = True
+
+    def exec_tree(self) -> None:
+        path = self.tree_path(self.kwargs.get("path"))
+        topdown = self.kwargs.get("topdown", True)
+
+        # Fails early on a missing path, not on the first iteration.
+        self._tree_root(path)
+
+        self.result = self.walk(path, topdown=topdown)
@@ -1,3 +1,5 @@
+import logging
+
 from fs.commands.base import BaseFSCommand
 from fs.exceptions import FileDescriptorNotExists
 
@@ -22,6 +24,8 @@ class WriteCommand(BaseFSCommand):
         file_descriptor.update_size()
 
         self.save(file_descriptor, path)
-        self._logger.info(
-            f"Successfully written `{content}` to [{path}] with fd [{fd}]."
-        )
+
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(
+                f"Successfully written `{content}` to [{path}] with fd [{fd}]."
+            )
@@ -0,0 +1,212 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from constants import (ALLOCATION_BEST_FIT, ALLOCATION_FIRST_FIT,
+                       ALLOCATION_GROUP_BLOCKS, ALLOCATION_LOCALITY,
+                       ALLOCATION_NEXT_FIT, MEMORY_PATH)
+from fs.driver.sparse import coalesce_blocks
+from fs.driver.state import SystemState
+
+
+@dataclass
+class AllocationHint:
+    """
+    Where a new block would preferably go.
+
+    `goal` is a block right after the ones the object already owns, so
+    taking it keeps the object contiguous. `group` is a key of the directory
+    owning the object, policies may keep objects of one directory together.
+    """
+
+    goal: Optional[int] = None
+    group: Optional[int] = None
+
+
+class FreeMap:
+    """
+    Lazily probed free state of image blocks, each block is probed once.
+    """
+
+    def __init__(self, n_blocks: int, probe: Callable[[int], bool]) -> None:
+        self.n_blocks = n_blocks
+        self._probe = probe
+        self._free: dict[int, bool] = {}
+
+    def is_free(self, block_n: int) -> bool:
+        if block_n not in self._free:
+            self._free[block_n] = self._probe(block_n)
+
+        return self._free[block_n]
+
+    def take(self, block_n: int) -> None:
+        self._free[block_n] = False
+
+    def scan(self, start: int = 0) -> Iterator[int]:
+        """
+        Free blocks from `start` to the end, then from the image start.
+        """
+
+        if not self.n_blocks:
+            return
+
+        start %= self.n_blocks
+
+        for i in range(self.n_blocks):
+            block_n = (start + i) % self.n_blocks
+
+            if self.is_free(block_n):
+                yield block_n
+
+    def extents(self) -> list[tuple[int, int]]:
+        """
+        Runs of free blocks as (first block, blocks count).
+        """
+
+        return coalesce_blocks(
+            block_n for block_n in range(self.n_blocks) if self.is_free(block_n)
+        )
+
+
+class AllocationPolicy(ABC):
+    name: str = ""
+
+    def reset(self) -> None:
+        """
+        Forget placement state of a formatted image.
+        """
+
+    @abstractmethod
+    def allocate(self, free_map: FreeMap, hint: AllocationHint) -> Optional[int]:
+        raise NotImplementedError("Policy must implement its allocate method.")
+
+
+class FirstFitPolicy(AllocationPolicy):
+    """
+    Lowest free block.
+    """
+
+    name = ALLOCATION_FIRST_FIT
+
+    def allocate(self, free_map: FreeMap, hint: AllocationHint) -> Optional[int]:
+        return next(free_map.scan(), None)
+
+
+class NextFitPolicy(AllocationPolicy):
+    """
+    First free block after the previously allocated one, wrapping around.
+
+    The cursor lives in memory. A process starts it after the last used
+    block of the image, where the previous allocations most likely ended.
+    """
+
+    name = ALLOCATION_NEXT_FIT
+
+    def __init__(self) -> None:
+        self.cursor: Optional[int] = None
+
+    def reset(self) -> None:
+        self.cursor = None
+
+    def allocate(self, free_map: FreeMap, hint: AllocationHint) -> Optional[int]:
+        if self.cursor is None:
+            self.cursor = next(
+                (
+                    block_n + 1
+                    for block_n in reversed(range(free_map.n_blocks))
+                    if not free_map.is_free(block_n)
+                ),
+                0,
+            )
+
+        block_n = next(free_map.scan(self.cursor), None)
+
+        if block_n is not None:
+            self.cursor = block_n + 1
+
+        return block_n
+
+
+class BestFitPolicy(AllocationPolicy):
+    """
+    Goal block if free, else start of the smallest free extent.
+
+    Small holes get filled first, so large extents stay whole for objects
+    which grow sequentially.
+    """
+
+    name = ALLOCATION_BEST_FIT
+
+    def allocate(self, free_map: FreeMap, hint: AllocationHint) -> Optional[int]:
+        if (
+            hint.goal is not None
+            and hint.goal < free_map.n_blocks
+            and free_map.is_free(hint.goal)
+        ):
+            return hint.goal
+
+        extents = free_map.extents()
+
+        if not extents:
+            return None
+
+        return min(extents, key=lambda extent: (extent[1], extent[0]))[0]
+
+
+class LocalityPolicy(AllocationPolicy):
+    """
+    Image is split into groups of `ALLOCATION_GROUP_BLOCKS` blocks and every
+    directory is assigned one, so objects of a directory are placed together.
+
+    Objects grow from their goal block, new objects start at the group of
+    their directory. Full groups spill over into the following ones.
+    """
+
+    name = ALLOCATION_LOCALITY
+
+    def allocate(self, free_map: FreeMap, hint: AllocationHint) -> Optional[int]:
+        if hint.goal is not None:
+            start = hint.goal
+        elif hint.group is not None:
+            n_groups = max(free_map.n_blocks // ALLOCATION_GROUP_BLOCKS, 1)
+            start = hint.group % n_groups * ALLOCATION_GROUP_BLOCKS
+        else:
+            start = 0
+
+        return next(free_map.scan(start), None)
+
+
+POLICIES: dict[str, type[AllocationPolicy]] = {
+    policy.name: policy
+    for policy in (FirstFitPolicy, NextFitPolicy, BestFitPolicy, LocalityPolicy)
+}
+
+_policy: Optional[AllocationPolicy] = None
+_policy_path: Optional[Path] = None
+
+
+def current_allocation_policy() -> AllocationPolicy:
+    """
+    Allocation policy of the volume in working directory.
+    """
+
+    global _policy, _policy_path
+
+    path = Path(MEMORY_PATH).absolute()
+
+    if _policy is None or _policy_path != path:
+        _policy = POLICIES[SystemState().allocation]()
+        _policy_path = path
+
+    return _policy
+
+
+def set_allocation_policy(name: str) -> AllocationPolicy:
+    global _policy, _policy_path
+
+    _policy = POLICIES[name]()
+    _policy_path = Path(MEMORY_PATH).absolute()
+
+    return _policy
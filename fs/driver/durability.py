@@ -0,0 +1,104 @@
+import atexit
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from constants import (DURABILITY_BATCHED, DURABILITY_FLUSH_INTERVAL,
+                       DURABILITY_STRICT)
+from fs.driver.journal import flush_journal
+from fs.driver.stats import current_stats
+
+
+class Flusher:
+    """
+    Fsync volume files written since the last sync.
+
+    Drivers only mark written files dirty, the volume durability mode decides
+    when they are synced: never, periodically from a background thread or
+    after every command.
+    """
+
+    def __init__(self) -> None:
+        self._dirty: set[Path] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._exit_hook = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def mark_dirty(self, path: Path) -> None:
+        self._dirty.add(path.absolute())
+
+    def sync(self) -> None:
+        with self._lock:
+            flush_journal()
+
+            dirty, self._dirty = self._dirty, set()
+            stats = current_stats()
+
+            for path in sorted(dirty):
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    # Unmounted since written.
+                    continue
+
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+                stats.fsyncs += 1
+
+    def start(self, interval: float = DURABILITY_FLUSH_INTERVAL) -> None:
+        if self.running:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="fs-flusher", daemon=True
+        )
+        self._thread.start()
+
+        if not self._exit_hook:
+            atexit.register(self.stop)
+            self._exit_hook = True
+
+    def stop(self) -> None:
+        """
+        Stop background flusher, syncing everything it has not synced yet.
+        """
+
+        if not self.running:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        self.sync()
+
+    def complete(self, durability: str) -> None:
+        """
+        Apply volume durability mode once a command is completed.
+        """
+
+        if durability == DURABILITY_STRICT:
+            self.sync()
+        elif durability == DURABILITY_BATCHED:
+            self.start()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.sync()
+
+
+_flusher = Flusher()
+
+
+def current_flusher() -> Flusher:
+    return _flusher
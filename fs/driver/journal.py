@@ -0,0 +1,421 @@
+import atexit
+import contextlib
+import copy
+import json
+import os
+import struct
+import threading
+import zlib
+from collections.abc import Generator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from constants import (BLOCK_SIZE_BYTES, CONFIG_PATH, JOURNAL_CHECKPOINT_BYTES,
+                       JOURNAL_GROUP_COMMIT_SIZE, JOURNAL_PATH, MEMORY_PATH)
+from fs.driver.sparse import coalesce_blocks, punch_hole
+from fs.driver.stats import current_stats
+
+JOURNAL_RECORD_MAGIC = b"FSJR"
+
+# Record header: magic, payload length, payload crc32.
+JOURNAL_RECORD_HEADER = struct.Struct("<4sII")
+# Payload header: image base limit, image size, blocks count, state length.
+JOURNAL_PAYLOAD_HEADER = struct.Struct("<qqII")
+JOURNAL_BLOCK_N = struct.Struct("<I")
+
+
+@dataclass
+class JournalRecord:
+    """
+    Changes of one or more commands: full images of changed blocks, image
+    resizes and a snapshot of system state.
+
+    Image bytes starting from `base_limit` were cut off, so blocks there
+    read as zeros unless rewritten.
+    """
+
+    blocks: dict[int, bytes] = field(default_factory=dict)
+    base_limit: Optional[int] = None
+    size: Optional[int] = None
+    state: Optional[dict[str, Any]] = None
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.blocks
+            or self.base_limit is not None
+            or self.size is not None
+            or self.state is not None
+        )
+
+    def read_block(self, block_n: int) -> Optional[bytes]:
+        if block_n in self.blocks:
+            return self.blocks[block_n]
+
+        if (
+            self.base_limit is not None
+            and block_n * BLOCK_SIZE_BYTES >= self.base_limit
+        ):
+            return bytes(BLOCK_SIZE_BYTES)
+
+        return None
+
+    def resize(self, size: int) -> None:
+        self.blocks = {
+            block_n: data
+            for block_n, data in self.blocks.items()
+            if block_n * BLOCK_SIZE_BYTES < size
+        }
+        self.base_limit = (
+            size if self.base_limit is None else min(self.base_limit, size)
+        )
+        self.size = size
+
+    def merge(self, other: "JournalRecord") -> None:
+        if other.base_limit is not None:
+            self.resize(other.base_limit)
+
+        if other.size is not None:
+            self.size = other.size
+
+        self.blocks.update(other.blocks)
+
+        if other.state is not None:
+            self.state = other.state
+
+    def encode(self) -> bytes:
+        state = json.dumps(self.state).encode() if self.state is not None else b""
+
+        payload = bytearray(
+            JOURNAL_PAYLOAD_HEADER.pack(
+                -1 if self.base_limit is None else self.base_limit,
+                -1 if self.size is None else self.size,
+                len(self.blocks),
+                len(state),
+            )
+        )
+
+        for block_n, data in self.blocks.items():
+            payload += JOURNAL_BLOCK_N.pack(block_n) + data
+
+        payload += state
+
+        return (
+            JOURNAL_RECORD_HEADER.pack(
+                JOURNAL_RECORD_MAGIC, len(payload), zlib.crc32(payload)
+            )
+            + payload
+        )
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "JournalRecord":
+        base_limit, size, n_blocks, state_len = JOURNAL_PAYLOAD_HEADER.unpack_from(
+            payload
+        )
+        offset = JOURNAL_PAYLOAD_HEADER.size
+        blocks = {}
+
+        for _ in range(n_blocks):
+            (block_n,) = JOURNAL_BLOCK_N.unpack_from(payload, offset)
+            offset += JOURNAL_BLOCK_N.size
+
+            blocks[block_n] = payload[offset : offset + BLOCK_SIZE_BYTES]
+            offset += BLOCK_SIZE_BYTES
+
+        state = payload[offset : offset + state_len]
+
+        return cls(
+            blocks=blocks,
+            base_limit=None if base_limit < 0 else base_limit,
+            size=None if size < 0 else size,
+            state=json.loads(state) if state else None,
+        )
+
+
+class Journal:
+    """
+    Write-ahead metadata journal.
+
+    Every command's block and state changes are committed as one record.
+    Records are buffered and flushed in groups with a single fsync. Flushed
+    changes stay in memory and are checkpointed into the image and the config
+    lazily, once the journal grows big enough. On start the journal is
+    replayed into memory, so replay costs only a read of the journal.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.discarded = False
+
+        self._memory_path = Path(MEMORY_PATH).absolute()
+        self._config_path = Path(CONFIG_PATH).absolute()
+
+        self._committed = JournalRecord()
+        self._txn: Optional[JournalRecord] = None
+        self._pending: list[bytes] = []
+        self._size = 0
+        # Background flusher may flush while a command commits.
+        self._lock = threading.RLock()
+
+        self.replay()
+
+    def replay(self) -> None:
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        offset = 0
+
+        while offset + JOURNAL_RECORD_HEADER.size <= len(data):
+            magic, length, crc = JOURNAL_RECORD_HEADER.unpack_from(data, offset)
+            payload_offset = offset + JOURNAL_RECORD_HEADER.size
+            payload = data[payload_offset : payload_offset + length]
+
+            if (
+                magic != JOURNAL_RECORD_MAGIC
+                or len(payload) != length
+                or zlib.crc32(payload) != crc
+            ):
+                break
+
+            self._committed.merge(JournalRecord.decode(payload))
+            offset = payload_offset + length
+
+        if offset != len(data):
+            # Torn record of an interrupted flush, it was never acknowledged.
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+        self._size = offset
+
+    @contextlib.contextmanager
+    def transaction(self) -> Generator[JournalRecord, Any, Any]:
+        if self._txn is not None:
+            # Nested transactions are parts of the outer one.
+            yield self._txn
+            return
+
+        self._txn = JournalRecord()
+
+        try:
+            yield self._txn
+        except BaseException:
+            self._txn = None
+            raise
+        else:
+            self.commit()
+
+    def _layers(self) -> list[JournalRecord]:
+        if self._txn is not None:
+            return [self._txn, self._committed]
+
+        return [self._committed]
+
+    def read_block(self, block_n: int) -> Optional[bytes]:
+        """
+        Latest journaled image of block, None if the image holds it.
+        """
+
+        for layer in self._layers():
+            data = layer.read_block(block_n)
+
+            if data is not None:
+                return data
+
+        return None
+
+    def write_block(self, block_n: int, data: bytes) -> None:
+        with self.transaction() as txn:
+            txn.blocks[block_n] = data
+
+    def resize(self, size: int) -> None:
+        with self.transaction() as txn:
+            txn.resize(size)
+
+    def read_state(self) -> Optional[dict[str, Any]]:
+        for layer in self._layers():
+            if layer.state is not None:
+                return copy.deepcopy(layer.state)
+
+        return None
+
+    def read_size(self) -> Optional[int]:
+        """
+        Latest journaled image size, None if the image has it.
+        """
+
+        for layer in self._layers():
+            if layer.size is not None:
+                return layer.size
+
+        return None
+
+    def write_state(self, state: dict[str, Any]) -> None:
+        with self.transaction() as txn:
+            txn.state = state
+
+    def commit(self) -> None:
+        txn, self._txn = self._txn, None
+
+        if not txn or self.discarded:
+            return
+
+        with self._lock:
+            self._pending.append(txn.encode())
+            self._committed.merge(txn)
+
+            if len(self._pending) >= JOURNAL_GROUP_COMMIT_SIZE:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Write all pending records with a single fsync.
+        """
+
+        with self._lock:
+            if not self._pending or self.discarded:
+                return
+
+            data = b"".join(self._pending)
+
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            stats = current_stats()
+            stats.journal_writes += len(self._pending)
+            stats.journal_bytes += len(data)
+            stats.journal_fsyncs += 1
+
+            self._pending.clear()
+            self._size += len(data)
+
+            if self._size >= JOURNAL_CHECKPOINT_BYTES:
+                self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        Apply flushed changes to the image and the config, empty the journal.
+        """
+
+        with self._lock:
+            self.flush()
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        changes = self._committed
+        stats = current_stats()
+
+        with open(self._memory_path, "r+b") as m:
+            if changes.base_limit is not None:
+                m.truncate(changes.base_limit)
+
+            if changes.size is not None:
+                m.truncate(changes.size)
+
+            zero_blocks = [
+                block_n for block_n, data in changes.blocks.items() if not any(data)
+            ]
+
+            for block_n, count in coalesce_blocks(zero_blocks):
+                offset, length = block_n * BLOCK_SIZE_BYTES, count * BLOCK_SIZE_BYTES
+
+                if punch_hole(m, offset, length):
+                    stats.holes_punched += 1
+                else:
+                    m.seek(offset)
+                    m.write(bytes(length))
+
+                    stats.block_writes += 1
+                    stats.bytes_written += length
+
+            for block_n in sorted(changes.blocks.keys() - set(zero_blocks)):
+                m.seek(block_n * BLOCK_SIZE_BYTES)
+                m.write(changes.blocks[block_n])
+
+                stats.block_writes += 1
+                stats.bytes_written += BLOCK_SIZE_BYTES
+
+            m.flush()
+            os.fsync(m.fileno())
+
+        if changes.state is not None:
+            raw_config = json.dumps(changes.state, indent=2)
+
+            with open(self._config_path, "w") as f:
+                f.write(raw_config)
+                f.flush()
+                os.fsync(f.fileno())
+
+            stats.config_writes += 1
+            stats.config_bytes_written += len(raw_config)
+
+        with open(self.path, "r+b") as f:
+            f.truncate(0)
+            os.fsync(f.fileno())
+
+        stats.checkpoints += 1
+
+        self._committed = JournalRecord()
+        self._size = 0
+
+    def discard(self) -> None:
+        with self._lock:
+            self.discarded = True
+            self._pending.clear()
+            self._txn = None
+
+        self.path.unlink(missing_ok=True)
+
+
+_journal: Optional[Journal] = None
+
+
+def current_journal() -> Optional[Journal]:
+    """
+    Journal of the volume in working directory, None if it isn't journaled.
+    """
+
+    global _journal
+
+    path = Path(JOURNAL_PATH).absolute()
+
+    if _journal is not None and _journal.path == path:
+        return _journal
+
+    if not path.exists():
+        return None
+
+    if _journal is not None:
+        _journal.flush()
+
+    _journal = Journal(path)
+    atexit.register(_journal.flush)
+
+    return _journal
+
+
+def create_journal() -> Journal:
+    Path(JOURNAL_PATH).touch()
+
+    return current_journal()
+
+
+def flush_journal() -> None:
+    """
+    Flush pending records of the opened journal, if any.
+    """
+
+    if _journal is not None:
+        _journal.flush()
+
+
+def discard_journal() -> None:
+    global _journal
+
+    journal = current_journal()
+
+    if journal is not None:
+        journal.discard()
+
+    _journal = None
@@ -1,12 +1,24 @@
 import contextlib
 import logging
+import os
+import time
 from pathlib import Path
 from typing import Any, BinaryIO, Generator, Optional
 
 from constants import (BLOCK_CONTENT_SIZE_BYTES, BLOCK_HEADER_SIZE_BYTES,
-                       BLOCK_SIZE_BYTES, MEMORY_PATH, N_BLOCKS_MAX,
+                       BLOCK_SIZE_BYTES, INLINE_BLOCK_N, MEMORY_PATH,
                        ROOT_BLOCK_N)
-from fs.driver.utils import form_header_bytes, form_header_from_bytes
+from fs.driver.allocation import (AllocationHint, FreeMap,
+                                  current_allocation_policy)
+from fs.driver.durability import current_flusher
+from fs.driver.journal import Journal, current_journal
+from fs.driver.reclaim import current_reclaimer
+from fs.driver.sparse import coalesce_blocks, punch_hole
+from fs.driver.state import SystemState
+from fs.driver.stats import current_stats
+from fs.driver.trace import OP_READ, OP_WRITE, current_tracer
+from fs.driver.utils import (InlineState, form_header_bytes,
+                             form_header_from_bytes)
 from fs.exceptions import (BlockWriteDenied, FSAlreadyMounted, FSNotMounted,
                            OutOfBlocks, WrongDescriptorClass)
 from fs.models.block import Block
@@ -15,34 +27,138 @@ from fs.models.descriptor.directory import Directory, DirectoryDescriptor
 from fs.models.descriptor.file import File, FileDescriptor
 from fs.models.descriptor.symlink import Symlink, SymlinkDescriptor
 from fs.models.raw import BlockContent, BlockHeader
+from fs.models.result import DESCRIPTOR_TYPES
 
 
 class MemoryStorageProxy:
-    def __init__(self) -> None:
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
         self._memory_path = Path(MEMORY_PATH)
         self._memory: Optional[BinaryIO] = None
+        self._journal: Optional[Journal] = None
 
-        self._logger = logging.getLogger(__name__)
+        self._logger = logger or logging.getLogger(__name__)
 
     @property
     @contextlib.contextmanager
     def memory(self) -> Generator[BinaryIO, Any, Any]:
+        stats = current_stats()
+        started = time.perf_counter()
+
         self._memory = open(self._memory_path, "r+b")
+        self._journal = current_journal()
+        stats.memory_opens += 1
 
         try:
             yield self._memory
         finally:
             self._memory.close()
+            stats.memory_time += time.perf_counter() - started
+
+    def _read_bytes(self, size: int) -> bytes:
+        tracer = current_tracer()
+
+        if tracer:
+            tracer.record(OP_READ, self._memory.tell() // BLOCK_SIZE_BYTES, size)
+
+        data = self._memory.read(size)
+
+        stats = current_stats()
+        stats.block_reads += 1
+        stats.bytes_read += len(data)
+
+        return data
+
+    def _write_bytes(self, data: bytes) -> None:
+        tracer = current_tracer()
+
+        if tracer:
+            tracer.record(OP_WRITE, self._memory.tell() // BLOCK_SIZE_BYTES, len(data))
+
+        self._memory.write(data)
+        current_flusher().mark_dirty(self._memory_path)
+
+        stats = current_stats()
+        stats.block_writes += 1
+        stats.bytes_written += len(data)
+
+    def _read_block_bytes(self, block_n: int, size: int = BLOCK_SIZE_BYTES) -> bytes:
+        if self._journal:
+            block_bytes = self._journal.read_block(block_n)
+
+            if block_bytes is not None:
+                return block_bytes[:size]
+
+        self._memory.seek(block_n * BLOCK_SIZE_BYTES)
+        block_bytes = self._read_bytes(size)
+
+        # Blocks past the end of a growing image read as zeros, so free.
+        return block_bytes + bytes(size - len(block_bytes))
+
+    def _write_block_bytes(self, block_n: int, data: bytes) -> None:
+        if self._journal:
+            # Journal keeps full block images, so patch the latest one.
+            block_bytes = bytearray(data)
+
+            if len(data) < BLOCK_SIZE_BYTES:
+                block_bytes = bytearray(self._read_block_bytes(block_n))
+                block_bytes += bytes(BLOCK_SIZE_BYTES - len(block_bytes))
+                block_bytes[: len(data)] = data
+
+            self._journal.write_block(block_n, bytes(block_bytes))
+            return
+
+        self._memory.seek(block_n * BLOCK_SIZE_BYTES)
+        self._write_bytes(data)
 
     def clear(self) -> None:
         with self.memory as m:
-            m.truncate(0)
+            if self._journal:
+                self._journal.resize(0)
+            else:
+                m.truncate(0)
+                current_flusher().mark_dirty(self._memory_path)
+
+    def resize(self, n: int) -> None:
+        """
+        Size image to `n` blocks without writing them.
+
+        Added blocks are sparse zeros, so their all-zero headers mark them
+        free.
+        """
+
+        with self.memory as m:
+            if self._journal:
+                self._journal.resize(n * BLOCK_SIZE_BYTES)
+            else:
+                m.truncate(n * BLOCK_SIZE_BYTES)
+                current_flusher().mark_dirty(self._memory_path)
+
+    def get_n_blocks(self) -> int:
+        """
+        Volume size in blocks as kept in the state, blocks past the end of
+        the image read as free zeros.
+        """
+
+        n_blocks = SystemState().get_n_blocks()
+
+        if n_blocks is not None:
+            return n_blocks
+
+        # Volume made before its size was kept.
+        with self.memory as m:
+            size = self._journal.read_size() if self._journal else None
+
+            if size is None:
+                size = m.seek(0, os.SEEK_END)
+
+        return size // BLOCK_SIZE_BYTES
 
     def create_memory_file(self) -> None:
         if self._memory_path.exists():
             raise FSAlreadyMounted("Can't mount new FS till current is unmounted.")
 
         with open(self._memory_path, "wb"):
+            current_flusher().mark_dirty(self._memory_path)
             self._logger.info(f"FS successfully mounted at `{MEMORY_PATH}`.")
 
     def delete_memory_file(self) -> None:
@@ -53,103 +169,228 @@ class MemoryStorageProxy:
         self._logger.info(f"FS successfully unmounted.")
 
     def write(self, descriptor: Descriptor) -> None:
-        directory = isinstance(descriptor, DirectoryDescriptor)
-        symlink = isinstance(descriptor, SymlinkDescriptor)
-
-        with self.memory as m:
-            for block in descriptor.blocks:
-                m.seek(block.n * BLOCK_SIZE_BYTES)
-
-                self.write_block(
-                    BlockContent(
-                        header=BlockHeader(
-                            used=True,
-                            directory=directory,
-                            symlink=symlink,
-                            ref_count=1,
-                            size=sum(map(bool, block.content)),
-                            opened=descriptor.opened,
+        self.write_all([descriptor])
+
+    def write_all(self, descriptors: list[Descriptor]) -> None:
+        """
+        Write blocks of all descriptors with a single image open.
+        """
+
+        # Payload of inline descriptors is saved with the descriptor state.
+        descriptors = [
+            descriptor for descriptor in descriptors if not descriptor.inline
+        ]
+
+        if not descriptors:
+            return
+
+        with self.memory:
+            for descriptor in descriptors:
+                directory = isinstance(descriptor, DirectoryDescriptor)
+                symlink = isinstance(descriptor, SymlinkDescriptor)
+
+                for block in descriptor.blocks:
+                    self.write_block(
+                        block.n,
+                        BlockContent(
+                            header=BlockHeader(
+                                used=True,
+                                directory=directory,
+                                symlink=symlink,
+                                ref_count=1,
+                                size=sum(map(bool, block.content)),
+                                opened=descriptor.opened,
+                            ),
+                            content=block.content,
                         ),
-                        content=block.content,
                     )
-                )
 
-    def write_empty_blocks(self, n: int, start_from: int = 0) -> None:
+    def get_used_blocks(self) -> list[int]:
+        used_blocks = []
+        n_blocks = self.get_n_blocks()
+
+        with self.memory:
+            for block_n in range(n_blocks):
+                header_bytes = self._read_block_bytes(block_n, BLOCK_HEADER_SIZE_BYTES)
+
+                if form_header_from_bytes(header_bytes).used:
+                    used_blocks.append(block_n)
+
+        return used_blocks
+
+    def move_blocks(self, moves: dict[int, int]) -> None:
+        """
+        Copy blocks to new positions, `moves` maps source to target.
+
+        All sources are read before writing, so targets may overlap them.
+        """
+
+        with self.memory:
+            blocks = {
+                source: self._read_block_bytes(source) for source in sorted(moves)
+            }
+
+            for source, target in sorted(moves.items(), key=lambda move: move[1]):
+                self._write_block_bytes(target, blocks[source])
+
+    def free_blocks(self, blocks: list[int]) -> None:
+        """
+        Release blocks, so they read as zeros and are free.
+
+        Runs of adjacent blocks are punched out of the image as holes where
+        the host filesystem supports it and zero-written otherwise.
+        """
+
+        stats = current_stats()
+
         with self.memory as m:
-            for i in range(start_from, n):
-                m.seek(i * BLOCK_SIZE_BYTES)
-
-                self.write_block(
-                    BlockContent(
-                        header=BlockHeader(
-                            used=False,
-                            directory=False,
-                            ref_count=0,
-                            size=0,
-                            opened=False,
-                            symlink=False,
-                        ),
-                    )
-                )
+            for block_n, count in coalesce_blocks(blocks):
+                offset, length = block_n * BLOCK_SIZE_BYTES, count * BLOCK_SIZE_BYTES
+
+                if self._journal:
+                    # Journal checkpoint punches zeroed runs itself.
+                    for i in range(block_n, block_n + count):
+                        self._journal.write_block(i, bytes(BLOCK_SIZE_BYTES))
+
+                elif punch_hole(m, offset, length):
+                    current_flusher().mark_dirty(self._memory_path)
+                    stats.holes_punched += 1
+
+                else:
+                    m.seek(offset)
+                    self._write_bytes(bytes(length))
 
-    def write_block(self, block: BlockContent) -> None:
+    def write_block(self, block_n: int, block: BlockContent) -> None:
         header_bytes = form_header_bytes(block.header)
 
         if not self._memory:
             raise BlockWriteDenied("Something went wrong writing a block to memory.")
 
-        self._memory.write(header_bytes + block.content)
+        self._write_block_bytes(block_n, header_bytes + block.content)
 
-    def add_ref_count(self, descriptor: Descriptor, c: int) -> int:
-        total_ref_count = 0
+    def _is_block_free(self, block_n: int) -> bool:
+        header_bytes = self._read_block_bytes(block_n, BLOCK_HEADER_SIZE_BYTES)
 
-        with self.memory as m:
-            for block in descriptor.blocks:
-                m.seek(block.n * BLOCK_SIZE_BYTES)
+        return not form_header_from_bytes(header_bytes).used
+
+    def get_available_block_n(
+        self, goal: Optional[int] = None, group: Optional[int] = None
+    ) -> int:
+        """
+        Pick a free block by volume allocation policy and mark it used.
+        """
+
+        return self.get_available_blocks(1, goal=goal, group=group)[0]
+
+    def get_available_blocks(
+        self, count: int, goal: Optional[int] = None, group: Optional[int] = None
+    ) -> list[int]:
+        """
+        Pick `count` free blocks for one object with a single image open.
+
+        Every block after the first is aimed right after the previous one.
+        """
 
-                header_bytes = m.read(BLOCK_HEADER_SIZE_BYTES)
-                header = form_header_from_bytes(header_bytes)
-                header.ref_count += c
+        hint = AllocationHint(goal=goal, group=group)
+        blocks = self._allocate_blocks(count, hint)
 
-                total_ref_count += header.ref_count
+        if len(blocks) < count and current_reclaimer().drain():
+            # Blocks of deleted files were only queued for release.
+            blocks += self._allocate_blocks(
+                count - len(blocks),
+                AllocationHint(goal=blocks[-1] + 1 if blocks else goal, group=group),
+            )
 
-                if not header.ref_count:
-                    # Then deleting a block.
-                    header.used = False
+        if len(blocks) < count:
+            if blocks:
+                self.free_blocks(blocks)
 
-                m.seek(block.n * BLOCK_SIZE_BYTES)
-                m.write(form_header_bytes(header))
+            raise OutOfBlocks("System run out of available blocks")
 
-        return total_ref_count
+        return blocks
 
-    def get_available_block_n(self) -> int:
-        for block_n in range(N_BLOCKS_MAX):
-            block_header, _ = self.read_block(block_n)
+    def _allocate_blocks(self, count: int, hint: AllocationHint) -> list[int]:
+        policy = current_allocation_policy()
+        n_blocks = self.get_n_blocks()
+        blocks: list[int] = []
 
-            if not block_header.used:
+        with self.memory:
+            free_map = FreeMap(n_blocks, self._is_block_free)
+
+            while len(blocks) < count:
+                block_n = policy.allocate(free_map, hint)
+
+                if block_n is None:
+                    break
+
+                header_bytes = self._read_block_bytes(
+                    block_n, BLOCK_HEADER_SIZE_BYTES
+                )
+                block_header = form_header_from_bytes(header_bytes)
                 block_header.used = True
 
-                with self.memory as m:
-                    # Prevent collision when demand multiple new blocks.
-                    m.seek(block_n * BLOCK_SIZE_BYTES)
-                    m.write(form_header_bytes(block_header))
+                # Prevent collision when demand multiple new blocks.
+                self._write_block_bytes(block_n, form_header_bytes(block_header))
 
-                return block_n
+                free_map.take(block_n)
+                blocks.append(block_n)
+                hint = AllocationHint(goal=block_n + 1, group=hint.group)
 
-        raise OutOfBlocks("System run out of available blocks")
+        return blocks
 
     def read_block(self, block_n: int) -> tuple[BlockHeader, Block]:
-        with self.memory as m:
-            m.seek(block_n * BLOCK_SIZE_BYTES)
+        with self.memory:
+            block_bytes = self._read_block_bytes(block_n)
 
-            header_bytes = m.read(BLOCK_HEADER_SIZE_BYTES)
-            content_bytes = m.read(BLOCK_CONTENT_SIZE_BYTES)
+        header_bytes = block_bytes[:BLOCK_HEADER_SIZE_BYTES]
+        content_bytes = block_bytes[BLOCK_HEADER_SIZE_BYTES:]
 
         header = form_header_from_bytes(header_bytes)
 
         return header, Block(n=block_n, content=bytearray(content_bytes))
 
-    def get_descriptor(self, n: int, blocks: list[int]) -> Descriptor:
+    def read_headers(self, blocks: list[int]) -> dict[int, BlockHeader]:
+        """
+        Headers of blocks by block number, read in block order with one
+        image open.
+        """
+
+        headers = {}
+
+        if not blocks:
+            return headers
+
+        with self.memory:
+            for block_n in sorted(set(blocks)):
+                headers[block_n] = form_header_from_bytes(
+                    self._read_block_bytes(block_n, BLOCK_HEADER_SIZE_BYTES)
+                )
+
+        return headers
+
+    def get_inline_descriptor(self, n: int, inline: InlineState) -> Descriptor:
+        content = bytearray(inline.content.encode("latin-1"))
+        content += bytes(BLOCK_CONTENT_SIZE_BYTES - len(content))
+
+        descriptor_cls = SymlinkDescriptor if inline.symlink else FileDescriptor
+
+        return descriptor_cls(
+            n=n,
+            size=sum(map(bool, content)),
+            opened=inline.opened,
+            # Links count is kept by the descriptor state.
+            refs_count=1,
+            blocks=[Block(n=INLINE_BLOCK_N, content=content)],
+            inline=True,
+        )
+
+    def get_descriptor(
+        self, n: int, blocks: list[int], inline: Optional[InlineState] = None
+    ) -> Descriptor:
+        if inline is not None:
+            # Nothing to read, payload is in the descriptor state.
+            return self.get_inline_descriptor(n, inline)
+
         descriptor_blocks = [self.read_block(block_n) for block_n in blocks]
 
         blocks_headers = [block[0] for block in descriptor_blocks]
@@ -174,16 +415,18 @@ class MemoryStorageProxy:
 
         return FileDescriptor(**descriptor_params)
 
-    def get_directory_descriptor(self, n: int, blocks: list[int]) -> DirectoryDescriptor:
-        descriptor = self.get_descriptor(n, blocks)
+    def get_directory_descriptor(self, n: int, blocks: list[int],
+                                 inline: Optional[InlineState] = None) -> DirectoryDescriptor:
+        descriptor = self.get_descriptor(n, blocks, inline)
 
         if not isinstance(descriptor, DirectoryDescriptor):
             raise WrongDescriptorClass("Get wrong descriptor class.")
 
         return descriptor
 
-    def get_file_descriptor(self, n: int, blocks: list[int]) -> FileDescriptor:
-        descriptor = self.get_descriptor(n, blocks)
+    def get_file_descriptor(self, n: int, blocks: list[int],
+                            inline: Optional[InlineState] = None) -> FileDescriptor:
+        descriptor = self.get_descriptor(n, blocks, inline)
 
         if not isinstance(descriptor, FileDescriptor):
             raise WrongDescriptorClass("Get wrong descriptor class.")
@@ -193,7 +436,7 @@ class MemoryStorageProxy:
     def create_directory(self, n: int, name: str, parent: DirectoryDescriptor,
                          opened: bool = False, root: bool = False) -> Directory:
 
-        block_n = ROOT_BLOCK_N if root else self.get_available_block_n()
+        block_n = ROOT_BLOCK_N if root else self.get_available_block_n(group=n)
 
         descriptor = DirectoryDescriptor(
             n=n,
@@ -202,21 +445,32 @@ class MemoryStorageProxy:
             opened=opened,
             blocks=[Block(n=block_n)],
         )
-        descriptor.write_link(name=".", descriptor_id=n)
-        descriptor.write_link(name="..", descriptor_id=n if root else parent.n)
+        directory_type = DESCRIPTOR_TYPES[DirectoryDescriptor]
+
+        descriptor.write_link(name=".", descriptor_id=n, descriptor_type=directory_type)
+        descriptor.write_link(
+            name="..",
+            descriptor_id=n if root else parent.n,
+            descriptor_type=directory_type,
+        )
 
         descriptor.size += 3
 
         if not root:
-            parent.write_link(name, n)
+            parent.write_link(name, n, directory_type)
             parent.size += len(name)
 
         self._logger.info(f"Created directory descriptor [{n}].")
 
         return Directory(name, descriptor, parent)
 
-    def create_file(self, n: int, name: str, directory_descriptor: DirectoryDescriptor) -> File:
-        block_n = self.get_available_block_n()
+    def create_file(self, n: int, name: str, directory_descriptor: DirectoryDescriptor,
+                    inline: bool = False) -> File:
+        block_n = (
+            INLINE_BLOCK_N
+            if inline
+            else self.get_available_block_n(group=directory_descriptor.n)
+        )
 
         descriptor = FileDescriptor(
             n=n,
@@ -224,15 +478,23 @@ class MemoryStorageProxy:
             refs_count=1,
             opened=False,
             blocks=[Block(n=block_n)],
+            inline=inline,
+        )
+        directory_descriptor.write_link(
+            name, n, DESCRIPTOR_TYPES[FileDescriptor]
         )
-        directory_descriptor.write_link(name, n)
 
         self._logger.info(f"Created file descriptor [{n}].")
 
         return File(descriptor=descriptor, name=name, directory=directory_descriptor)
 
-    def create_symlink(self, n: int, name: str, directory_descriptor: DirectoryDescriptor, content: str) -> Symlink:
-        block_n = self.get_available_block_n()
+    def create_symlink(self, n: int, name: str, directory_descriptor: DirectoryDescriptor, content: str,
+                       inline: bool = False) -> Symlink:
+        block_n = (
+            INLINE_BLOCK_N
+            if inline
+            else self.get_available_block_n(group=directory_descriptor.n)
+        )
 
         descriptor = SymlinkDescriptor(
             n=n,
@@ -240,10 +502,13 @@ class MemoryStorageProxy:
             refs_count=1,
             opened=False,
             blocks=[Block(n=block_n)],
+            inline=inline,
         )
 
         descriptor.write_content(content)
-        directory_descriptor.write_link(name, n)
+        directory_descriptor.write_link(
+            name, n, DESCRIPTOR_TYPES[SymlinkDescriptor]
+        )
 
         self._logger.info(f"Created symlink descriptor [{n}].")
 
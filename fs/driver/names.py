@@ -0,0 +1,67 @@
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+from fnmatch import fnmatchcase
+
+# Name, parent directory id and descriptor id of a directory entry.
+NameEntry = tuple[str, int, int]
+
+GLOB_SPECIAL_CHARS = "*?["
+
+
+def build_name_index(namespace: dict[int, dict[str, int]]) -> list[NameEntry]:
+    """
+    Entries of all directories, sorted by name.
+    """
+
+    return sorted(
+        (name, parent_id, descriptor_id)
+        for parent_id, names in namespace.items()
+        for name, descriptor_id in names.items()
+    )
+
+
+def add_name(index: list[NameEntry], entry: NameEntry) -> None:
+    insort(index, entry)
+
+
+def remove_name(index: list[NameEntry], entry: NameEntry) -> None:
+    i = bisect_left(index, entry)
+
+    if i < len(index) and index[i] == entry:
+        del index[i]
+
+
+def find_prefix(index: list[NameEntry], prefix: str) -> Iterator[NameEntry]:
+    """
+    Entries whose name starts with `prefix`, found by binary search.
+    """
+
+    for i in range(bisect_left(index, (prefix,)), len(index)):
+        if not index[i][0].startswith(prefix):
+            return
+
+        yield index[i]
+
+
+def find_glob(index: list[NameEntry], pattern: str) -> Iterator[NameEntry]:
+    """
+    Entries whose name matches shell `pattern`.
+
+    Only names sharing the literal start of the pattern are matched, so a
+    pattern without wildcards is an exact lookup and one with a leading
+    wildcard checks every name.
+    """
+
+    literal = pattern
+
+    for i, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            literal = pattern[:i]
+            break
+
+    for entry in find_prefix(index, literal):
+        if literal == pattern and entry[0] != pattern:
+            return
+
+        if fnmatchcase(entry[0], pattern):
+            yield entry
@@ -0,0 +1,88 @@
+import atexit
+import threading
+from pathlib import Path
+from typing import Optional
+
+from constants import MEMORY_PATH, RECLAIM_BATCH_BLOCKS
+
+
+class Reclaimer:
+    """
+    Deferred release of blocks of deleted files.
+
+    Blocks are queued and released together, once `RECLAIM_BATCH_BLOCKS` of
+    them are pending, when the volume runs out of free blocks, before
+    defragmenting and at exit. Queued blocks stay marked used, so they are
+    never handed out before being released.
+
+    With `per_command` set, as in the one-shot CLI, blocks left queued are
+    released by the command itself, so they are synced and counted with it.
+    Otherwise blocks queued by a process which died are leaked until
+    `--defrag` frees them.
+    """
+
+    def __init__(self) -> None:
+        self._pending: list[int] = []
+        self._path: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._exit_hook = False
+        self.per_command = False
+
+    @property
+    def pending(self) -> list[int]:
+        return list(self._pending)
+
+    def free(self, blocks: list[int]) -> None:
+        if not blocks:
+            return
+
+        path = Path(MEMORY_PATH).absolute()
+
+        with self._lock:
+            if self._path != path:
+                # Queue of another volume, its image is gone or out of reach.
+                self._pending = []
+                self._path = path
+
+            self._pending.extend(blocks)
+            full = len(self._pending) >= RECLAIM_BATCH_BLOCKS
+
+        if not self._exit_hook:
+            atexit.register(self.drain)
+            self._exit_hook = True
+
+        if full:
+            self.drain()
+
+    def drain(self) -> int:
+        """
+        Release all queued blocks with one image pass, return their count.
+        """
+
+        from fs.driver.memory import MemoryStorageProxy
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+            if self._path != Path(MEMORY_PATH).absolute():
+                return 0
+
+        if pending:
+            MemoryStorageProxy().free_blocks(pending)
+
+        return len(pending)
+
+    def discard(self) -> None:
+        """
+        Forget queued blocks of a volume being formatted or unmounted.
+        """
+
+        with self._lock:
+            self._pending = []
+
+
+_reclaimer = Reclaimer()
+
+
+def current_reclaimer() -> Reclaimer:
+    return _reclaimer
@@ -0,0 +1,62 @@
+import ctypes
+import ctypes.util
+import sys
+from collections.abc import Iterable
+from typing import Any, BinaryIO, Optional
+
+# From linux/falloc.h.
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+
+
+def _load_fallocate() -> Optional[Any]:
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fallocate = libc.fallocate
+    except (OSError, AttributeError):
+        return None
+
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    fallocate.restype = ctypes.c_int
+
+    return fallocate
+
+
+_fallocate = _load_fallocate()
+
+
+def coalesce_blocks(blocks: Iterable[int]) -> list[tuple[int, int]]:
+    """
+    Merge block numbers into sorted (first block, blocks count) runs.
+    """
+
+    runs: list[tuple[int, int]] = []
+
+    for block_n in sorted(set(blocks)):
+        if runs and runs[-1][0] + runs[-1][1] == block_n:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((block_n, 1))
+
+    return runs
+
+
+def punch_hole(f: BinaryIO, offset: int, length: int) -> bool:
+    """
+    Deallocate `length` bytes of `f` at `offset`, keeping file size.
+
+    The range reads as zeros afterwards. Returns False if the platform or
+    the host filesystem doesn't support hole punching, leaving `f` intact.
+    """
+
+    if _fallocate is None:
+        return False
+
+    f.flush()
+
+    return not _fallocate(
+        f.fileno(), FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, offset, length
+    )
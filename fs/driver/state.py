@@ -1,21 +1,56 @@
 import contextlib
 import json
 import random
+import threading
+import time
 from collections.abc import Generator
-from dataclasses import asdict
+from dataclasses import asdict, fields, replace
 from pathlib import Path
 from typing import Any, Optional
 
-from constants import CONFIG_PATH, FD_GENERATION_RANGE
-from fs.driver.utils import DescriptorState, State
-from fs.exceptions import OutOfDescriptors
+from constants import (CONFIG_PATH, FD_GENERATION_RANGE, PATH_DIVIDER,
+                       ROOT_DESCRIPTOR_N, ROOT_DIRECTORY_PATH)
+from fs.driver.durability import current_flusher
+from fs.driver.journal import current_journal
+from fs.driver.names import add_name, build_name_index, find_glob, remove_name
+from fs.driver.stats import current_stats
+from fs.driver.utils import (DescriptorState, InlineState, QuotaState, State,
+                             UsageState)
+from fs.exceptions import DirectoryNotExists, OutOfDescriptors, QuotaExceeded
 from fs.models.descriptor.base import Descriptor
+from fs.models.descriptor.directory import DirectoryDescriptor
+from fs.models.descriptor.symlink import SymlinkDescriptor
+from fs.models.result import DESCRIPTOR_TYPES
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def read_only_state() -> Generator[None, Any, Any]:
+    """
+    Skip config writes of state accesses in the wrapped code, in this thread.
+
+    Lets commands which don't change state run concurrently without
+    rewriting the config under each other.
+    """
+
+    read_only = getattr(_local, "read_only", False)
+    _local.read_only = True
+
+    try:
+        yield
+    finally:
+        _local.read_only = read_only
 
 
 class SystemState:
     def __init__(self) -> None:
         self._config_path = Path(CONFIG_PATH)
         self._state: Optional[State] = None
+        self._batched = False
+        self._dirty = False
+        # Parent id and name of directories, derived from the namespace.
+        self._parents: Optional[dict[int, tuple[int, str]]] = None
 
     @property
     @contextlib.contextmanager
@@ -28,45 +63,334 @@ class SystemState:
         finally:
             self._write_state()
 
+    @property
+    def view(self) -> State:
+        """
+        Loaded state for lookups, reading it writes nothing.
+        """
+
+        if not self._state:
+            self._state = self._read_state()
+
+        return self._state
+
+    @contextlib.contextmanager
+    def batched(self) -> Generator[None, Any, Any]:
+        """
+        Write state once, after all accesses in the wrapped code.
+
+        Changes are dropped if the wrapped code raises, the state is read
+        again on the next access.
+        """
+
+        if self._batched:
+            yield
+            return
+
+        self._batched = True
+
+        try:
+            yield
+        except BaseException:
+            self._state = None
+            self._parents = None
+            raise
+        finally:
+            self._batched = False
+            dirty, self._dirty = self._dirty, False
+
+        if dirty:
+            self._write_state()
+
+    @property
+    def durability(self) -> str:
+        # Read only, so the config is not rewritten after every command.
+        if not self._state:
+            self._state = self._read_state()
+
+        return self._state.durability
+
+    @property
+    def allocation(self) -> str:
+        if not self._state:
+            self._state = self._read_state()
+
+        return self._state.allocation
+
+    @property
+    def inline_data(self) -> bool:
+        if not self._state:
+            self._state = self._read_state()
+
+        return self._state.inline_data
+
+    @staticmethod
+    def _state_from_dict(raw_data: dict[str, Any]) -> State:
+        for data in raw_data["descriptors"]:
+            if data.get("inline") is not None:
+                inline = data["inline"]
+
+                if "ref_count" in inline:
+                    # Links count moved from inline payload to descriptor.
+                    data.setdefault("ref_count", inline.pop("ref_count"))
+
+                data["inline"] = InlineState(**inline)
+
+            if data.get("usage") is not None:
+                data["usage"] = UsageState(**data["usage"])
+
+            if data.get("quota") is not None:
+                data["quota"] = QuotaState(**data["quota"])
+
+        raw_data["descriptors"] = [
+            DescriptorState(**data) for data in raw_data["descriptors"]
+        ]
+        # Json keys are strings.
+        raw_data["namespace"] = {
+            int(parent_id): names
+            for parent_id, names in raw_data.get("namespace", {}).items()
+        }
+
+        paths = raw_data.pop("path_to_descriptor", None)
+        name_index = raw_data.pop("name_index", None)
+        state = State(**raw_data)
+
+        if paths:
+            # Config of a volume made before names were keyed by parent.
+            for path in sorted(paths, key=lambda path: path.count(PATH_DIVIDER)):
+                parent_path, _, name = path.rpartition(PATH_DIVIDER)
+
+                if path != ROOT_DIRECTORY_PATH and parent_path in paths:
+                    names = state.namespace.setdefault(paths[parent_path], {})
+                    names[name] = paths[path]
+
+        if name_index is None:
+            # Config of a volume made before names were indexed.
+            state.name_index = build_name_index(state.namespace)
+        else:
+            state.name_index = [tuple(entry) for entry in name_index]
+
+        return state
+
+    def _add_name(self, s: State, parent_id: int, name: str, n: int) -> None:
+        names = s.namespace.setdefault(parent_id, {})
+        old_n = names.get(name)
+
+        if old_n == n:
+            return
+
+        if old_n is not None:
+            remove_name(s.name_index, (name, parent_id, old_n))
+
+        names[name] = n
+        add_name(s.name_index, (name, parent_id, n))
+        self._parents = None
+
+    def _remove_name(self, s: State, parent_id: int, name: str) -> int:
+        n = s.namespace[parent_id].pop(name)
+
+        remove_name(s.name_index, (name, parent_id, n))
+        self._parents = None
+
+        return n
+
+    @staticmethod
+    def _lookup(s: State, path: str) -> Optional[int]:
+        """
+        Descriptor id of `path`, walking names from root in O(path depth).
+        """
+
+        if path == ROOT_DIRECTORY_PATH:
+            if s.descriptors and s.descriptors[ROOT_DESCRIPTOR_N].used:
+                return ROOT_DESCRIPTOR_N
+
+            return None
+
+        parent_path, _, name = path.rpartition(PATH_DIVIDER)
+        parent_id = SystemState._lookup(s, parent_path)
+
+        if parent_id is None:
+            return None
+
+        return s.namespace.get(parent_id, {}).get(name)
+
+    @staticmethod
+    def _lookup_parent(s: State, path: str) -> tuple[int, str]:
+        parent_path, _, name = path.rpartition(PATH_DIVIDER)
+        parent_id = SystemState._lookup(s, parent_path)
+
+        if parent_id is None:
+            raise DirectoryNotExists("Can't find directory with such a path.")
+
+        return parent_id, name
+
     def _read_state(self) -> State:
+        journal = current_journal()
+
+        if journal:
+            raw_data = journal.read_state()
+
+            if raw_data is not None:
+                return self._state_from_dict(raw_data)
+
         if self._config_path.exists():
+            stats = current_stats()
+            started = time.perf_counter()
+
             with open(self._config_path) as f:
-                raw_data = json.load(f)
-                raw_data["descriptors"] = [
-                    DescriptorState(**data) for data in raw_data["descriptors"]
-                ]
+                raw_config = f.read()
 
-                return State(**raw_data)
+            state = self._state_from_dict(json.loads(raw_config))
+
+            stats.config_reads += 1
+            stats.config_bytes_read += len(raw_config)
+            stats.config_time += time.perf_counter() - started
+
+            return state
 
         return State()
 
     def _write_state(self) -> None:
+        if getattr(_local, "read_only", False):
+            return
+
+        if self._batched:
+            self._dirty = True
+            return
+
+        journal = current_journal()
+
+        if journal:
+            journal.write_state(asdict(self._state))
+            return
+
+        stats = current_stats()
+        started = time.perf_counter()
+
+        raw_config = json.dumps(asdict(self._state), indent=2)
+
         with open(self._config_path, "w") as f:
-            json.dump(asdict(self._state), f, indent=2)
+            f.write(raw_config)
+
+        current_flusher().mark_dirty(self._config_path)
+
+        stats.config_writes += 1
+        stats.config_bytes_written += len(raw_config)
+        stats.config_time += time.perf_counter() - started
 
     def init_descriptors(self, n: int) -> None:
         with self.state as s:
             s.descriptors = [DescriptorState(i) for i in range(n)]
+            s.namespace = {}
+            s.name_index = []
+            self._parents = None
+
+    def grow_descriptors(self, n: int) -> None:
+        with self.state as s:
+            s.descriptors += [
+                DescriptorState(i) for i in range(len(s.descriptors), n)
+            ]
+
+    def get_n_blocks(self) -> Optional[int]:
+        return self.view.n_blocks
+
+    def set_n_blocks(self, n: int) -> None:
+        with self.state as s:
+            s.n_blocks = n
+
+    def get_n_descriptors(self) -> int:
+        with self.state as s:
+            return len(s.descriptors)
 
     def clear_config_file(self) -> None:
         with self.state:
             self._state = State()
+            self._parents = None
 
     def set_mounted(self, mounted: bool) -> None:
         with self.state as s:
             s.mounted = mounted
 
+    def set_durability(self, durability: str) -> None:
+        with self.state as s:
+            s.durability = durability
+
+    def set_allocation(self, allocation: str) -> None:
+        with self.state as s:
+            s.allocation = allocation
+
+    def set_inline_data(self, inline_data: bool) -> None:
+        with self.state as s:
+            s.inline_data = inline_data
+
     def check_mounted(self) -> bool:
         with self.state as s:
             return s.mounted
 
     def check_path_exists(self, path: str) -> bool:
-        with self.state as s:
-            return path in s.path_to_descriptor
+        return self._lookup(self.view, path) is not None
 
     def get_path_to_descriptor_mapping(self) -> dict[str, int]:
+        """
+        Full paths of all names, derived from the namespace.
+        """
+
         with self.state as s:
-            return s.path_to_descriptor
+            root_id = self._lookup(s, ROOT_DIRECTORY_PATH)
+
+            if root_id is None:
+                return {}
+
+            paths = {ROOT_DIRECTORY_PATH: root_id}
+            stack = [(ROOT_DIRECTORY_PATH, root_id)]
+
+            while stack:
+                path, descriptor_id = stack.pop()
+
+                for name, child_id in s.namespace.get(descriptor_id, {}).items():
+                    child_path = f"{path}{PATH_DIVIDER}{name}"
+                    paths[child_path] = child_id
+                    stack.append((child_path, child_id))
+
+            return paths
+
+    def get_directory_names(self, descriptor_id: int) -> dict[str, int]:
+        return dict(self.view.namespace.get(descriptor_id, {}))
+
+    def find_names(self, pattern: str) -> list[tuple[str, int]]:
+        """
+        Full paths and descriptor ids of all names matching shell `pattern`,
+        in walk order.
+
+        Names are looked up in the sorted name index, so the cost follows
+        the number of names sharing the literal start of the pattern.
+        """
+
+        s = self.view
+        found = [
+            (self._directory_path(s, parent_id) + PATH_DIVIDER + name, n)
+            for name, parent_id, n in find_glob(s.name_index, pattern)
+        ]
+
+        return sorted(found, key=lambda item: item[0].split(PATH_DIVIDER))
+
+    def _directory_path(self, s: State, descriptor_id: int) -> str:
+        if self._parents is None:
+            # Only directories own names, so only they are keys.
+            self._parents = {
+                n: (parent_id, name)
+                for parent_id, names in s.namespace.items()
+                for name, n in names.items()
+                if n in s.namespace
+            }
+
+        parts = []
+
+        while descriptor_id in self._parents:
+            descriptor_id, name = self._parents[descriptor_id]
+            parts.append(name)
+
+        return "".join(PATH_DIVIDER + name for name in reversed(parts))
 
     def get_fd_to_path_mapping(self) -> dict[str, str]:
         with self.state as s:
@@ -77,33 +401,294 @@ class SystemState:
             s.descriptors[descriptor_id].blocks.append(block_n)
 
     def remove(self, descriptor: Descriptor, path: str) -> None:
-        self.unmap_path_from_descriptor(path)
         self.unmap_descriptor_from_blocks(descriptor.n)
+        self.unmap_path_from_descriptor(path)
         self.set_descriptor_unused(descriptor.n)
 
+    def check_write(self, descriptor: Descriptor, path: str) -> None:
+        """
+        Raise if saving `descriptor` would exceed a quota.
+        """
+
+        self._check_quotas(self.view, *self._write_charge(descriptor, path))
+
     def write(self, descriptor: Descriptor, path: str) -> None:
+        s = self.view
+        descriptor_state = s.descriptors[descriptor.n]
+        created = not descriptor_state.used
+        charged_id, delta = self._write_charge(descriptor, path)
+
+        self._check_quotas(s, charged_id, delta)
         self.map_path_to_descriptor(path, descriptor.n)
-        self.map_descriptor_to_blocks(
-            descriptor.n, [block.n for block in descriptor.blocks]
-        )
-        self.set_descriptor_used(descriptor.n)
+
+        with self.state as s:
+            self._charge(s, charged_id, delta)
+
+            if created:
+                descriptor_state.parent = charged_id
+                descriptor_state.usage = (
+                    replace(delta)
+                    if isinstance(descriptor, DirectoryDescriptor)
+                    else None
+                )
+
+            descriptor_state.blocks = descriptor.block_numbers
+            descriptor_state.inline = self._inline_state(descriptor)
+            descriptor_state.ref_count = descriptor.refs_count
+            descriptor_state.type = DESCRIPTOR_TYPES[type(descriptor)]
+            descriptor_state.size = descriptor.stored_size
+            descriptor_state.used = True
 
     def map_descriptor_to_blocks(self, descriptor_id: int, blocks: list[int]) -> None:
         with self.state as s:
             s.descriptors[descriptor_id].blocks = blocks
 
+    @staticmethod
+    def _inline_state(descriptor: Descriptor) -> Optional[InlineState]:
+        if not descriptor.inline:
+            return None
+
+        content = bytes(descriptor.blocks[0].content).rstrip(b"\x00")
+
+        return InlineState(
+            content=content.decode("latin-1"),
+            symlink=isinstance(descriptor, SymlinkDescriptor),
+            opened=descriptor.opened,
+        )
+
+    def set_ref_count(self, descriptor_id: int, ref_count: int) -> None:
+        with self.state as s:
+            s.descriptors[descriptor_id].ref_count = ref_count
+
     def map_path_to_descriptor(self, path: str, descriptor_id: int) -> None:
+        if path == ROOT_DIRECTORY_PATH:
+            # Root has no name, it is found by its id.
+            return
+
+        with self.state as s:
+            parent_id, name = self._lookup_parent(s, path)
+            self._add_name(s, parent_id, name, descriptor_id)
+
+    def move(self, path: str, new_path: str) -> None:
+        """
+        Rename `path` to `new_path`, keeping names below it.
+
+        Only the two parent entries change, whatever the size of a moved
+        directory. Its totals move from the old parent chain to the new one.
+        Opened fds and cwd below the moved path follow it.
+        """
+
+        prefix = path + PATH_DIVIDER
+
+        def moved(p: str) -> str:
+            if p == path or p.startswith(prefix):
+                return new_path + p[len(path) :]
+
+            return p
+
+        s = self.view
+        parent_id, name = self._lookup_parent(s, path)
+        new_parent_id, new_name = self._lookup_parent(s, new_path)
+
+        descriptor_state = s.descriptors[s.namespace[parent_id][name]]
+        recharged = descriptor_state.parent == parent_id and parent_id != new_parent_id
+
+        if recharged:
+            usage = self._total_usage(descriptor_state)
+            self._charge(s, parent_id, self._usage_delta(UsageState(), usage))
+
+            try:
+                self._check_quotas(s, new_parent_id, usage)
+            except QuotaExceeded:
+                self._charge(s, parent_id, usage)
+                raise
+
         with self.state as s:
-            s.path_to_descriptor[path] = descriptor_id
+            descriptor_id = self._remove_name(s, parent_id, name)
+            self._add_name(s, new_parent_id, new_name, descriptor_id)
+
+            if recharged:
+                self._charge(s, new_parent_id, usage)
+                descriptor_state.parent = new_parent_id
+
+            s.fd_to_path = {fd: moved(p) for fd, p in s.fd_to_path.items()}
+            s.cwd = moved(s.cwd)
 
     def unmap_descriptor_from_blocks(self, descriptor_id: int) -> None:
         with self.state as s:
+            descriptor_state = s.descriptors[descriptor_id]
+
+            if descriptor_state.used and self._is_charged(descriptor_state):
+                self._charge(
+                    s,
+                    descriptor_state.parent,
+                    self._usage_delta(
+                        UsageState(), self._total_usage(descriptor_state)
+                    ),
+                )
+
+            descriptor_state.parent = None
+            descriptor_state.usage = None
+            descriptor_state.quota = None
             s.descriptors[descriptor_id].blocks = []
+            s.descriptors[descriptor_id].inline = None
+            s.descriptors[descriptor_id].ref_count = None
+            s.descriptors[descriptor_id].type = None
+            s.descriptors[descriptor_id].size = None
             s.descriptors[descriptor_id].used = False
 
+            for name in list(s.namespace.get(descriptor_id, {})):
+                self._remove_name(s, descriptor_id, name)
+
+            s.namespace.pop(descriptor_id, None)
+
     def unmap_path_from_descriptor(self, path: str) -> None:
         with self.state as s:
-            s.path_to_descriptor.pop(path)
+            parent_id, name = self._lookup_parent(s, path)
+            descriptor_id = self._remove_name(s, parent_id, name)
+            descriptor_state = s.descriptors[descriptor_id]
+
+            if (
+                descriptor_state.used
+                and descriptor_state.parent == parent_id
+                and descriptor_id not in s.namespace[parent_id].values()
+            ):
+                # Other names still link it, so one of their directories
+                # counts it instead.
+                new_parent_id = next(
+                    (
+                        directory_id
+                        for directory_id, names in s.namespace.items()
+                        if descriptor_id in names.values()
+                    ),
+                    None,
+                )
+
+                if new_parent_id is not None:
+                    usage = self._own_usage(descriptor_state)
+                    self._charge(s, parent_id, self._usage_delta(UsageState(), usage))
+                    self._charge(s, new_parent_id, usage)
+                    descriptor_state.parent = new_parent_id
+
+    def _write_charge(
+        self, descriptor: Descriptor, path: str
+    ) -> tuple[Optional[int], UsageState]:
+        """
+        Directory counting `descriptor` and change of its totals on save.
+        """
+
+        s = self.view
+        descriptor_state = s.descriptors[descriptor.n]
+        usage = UsageState(
+            size=descriptor.stored_size, blocks=len(descriptor.block_numbers), inodes=1
+        )
+
+        if not descriptor_state.used:
+            # New object is counted by the directory holding its name.
+            if path == ROOT_DIRECTORY_PATH:
+                return None, usage
+
+            return self._lookup_parent(s, path)[0], usage
+
+        if self._is_charged(descriptor_state):
+            return descriptor.n, self._usage_delta(
+                usage, self._own_usage(descriptor_state)
+            )
+
+        # Object of an older volume, not counted by any directory.
+        return None, UsageState()
+
+    @staticmethod
+    def _is_charged(descriptor_state: DescriptorState) -> bool:
+        return descriptor_state.parent is not None or descriptor_state.usage is not None
+
+    @staticmethod
+    def _own_usage(descriptor_state: DescriptorState) -> UsageState:
+        return UsageState(
+            size=descriptor_state.size or 0,
+            blocks=len(descriptor_state.blocks),
+            inodes=1,
+        )
+
+    def _total_usage(self, descriptor_state: DescriptorState) -> UsageState:
+        if descriptor_state.usage is not None:
+            return replace(descriptor_state.usage)
+
+        return self._own_usage(descriptor_state)
+
+    @staticmethod
+    def _usage_delta(usage: UsageState, old_usage: UsageState) -> UsageState:
+        return UsageState(
+            **{
+                f.name: getattr(usage, f.name) - getattr(old_usage, f.name)
+                for f in fields(UsageState)
+            }
+        )
+
+    @staticmethod
+    def _usage_chain(s: State, descriptor_id: Optional[int]) -> list[DescriptorState]:
+        """
+        Directories with totals from `descriptor_id` up to root.
+        """
+
+        chain = []
+
+        while descriptor_id is not None:
+            descriptor_state = s.descriptors[descriptor_id]
+
+            if descriptor_state.usage is not None:
+                chain.append(descriptor_state)
+
+            descriptor_id = descriptor_state.parent
+
+        return chain
+
+    def _check_quotas(
+        self, s: State, descriptor_id: Optional[int], delta: UsageState
+    ) -> None:
+        for descriptor_state in self._usage_chain(s, descriptor_id):
+            if descriptor_state.quota is None:
+                continue
+
+            for f in fields(UsageState):
+                growth = getattr(delta, f.name)
+                limit = getattr(descriptor_state.quota, f.name)
+
+                if (
+                    growth > 0
+                    and limit is not None
+                    and getattr(descriptor_state.usage, f.name) + growth > limit
+                ):
+                    raise QuotaExceeded(
+                        f"Directory [{descriptor_state.n}] can't use more than "
+                        f"{limit} {f.name}."
+                    )
+
+    def _charge(
+        self, s: State, descriptor_id: Optional[int], delta: UsageState
+    ) -> None:
+        for descriptor_state in self._usage_chain(s, descriptor_id):
+            for f in fields(UsageState):
+                value = getattr(descriptor_state.usage, f.name) + getattr(delta, f.name)
+                setattr(descriptor_state.usage, f.name, value)
+
+    def get_usage(self, descriptor_id: int) -> Optional[UsageState]:
+        """
+        Totals of a directory, None if not kept for it.
+        """
+
+        usage = self.view.descriptors[descriptor_id].usage
+
+        return None if usage is None else replace(usage)
+
+    def get_quota(self, descriptor_id: int) -> Optional[QuotaState]:
+        quota = self.view.descriptors[descriptor_id].quota
+
+        return None if quota is None else replace(quota)
+
+    def set_quota(self, descriptor_id: int, quota: Optional[QuotaState]) -> None:
+        with self.state as s:
+            s.descriptors[descriptor_id].quota = quota
 
     def _set_descriptor_use(self, n: int, used: bool) -> None:
         with self.state as s:
@@ -136,9 +721,32 @@ class SystemState:
         with self.state as s:
             return s.descriptors[descriptor_id].blocks
 
-    def get_descriptor_id(self, path: str) -> Optional[int]:
+    def get_descriptor_state(self, descriptor_id: int) -> DescriptorState:
+        return self.view.descriptors[descriptor_id]
+
+    def get_blocks_map(self) -> dict[int, list[int]]:
+        """
+        Blocks of every used descriptor.
+        """
+
         with self.state as s:
-            return s.path_to_descriptor.get(path)
+            return {
+                descriptor.n: list(descriptor.blocks)
+                for descriptor in s.descriptors
+                if descriptor.used
+            }
+
+    def remap_blocks(self, blocks_map: dict[int, list[int]]) -> None:
+        """
+        Replace blocks of several descriptors with a single state write.
+        """
+
+        with self.state as s:
+            for descriptor_id, blocks in blocks_map.items():
+                s.descriptors[descriptor_id].blocks = blocks
+
+    def get_descriptor_id(self, path: str) -> Optional[int]:
+        return self._lookup(self.view, path)
 
     def get_descriptor_path(self, fd: str) -> Optional[str]:
         with self.state as s:
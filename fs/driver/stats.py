@@ -0,0 +1,85 @@
+import contextlib
+import json
+import threading
+import time
+from collections.abc import Generator
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+from tabulate import tabulate
+
+
+@dataclass
+class IOStats:
+    block_reads: int = 0
+    block_writes: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    memory_opens: int = 0
+    memory_time: float = 0.0
+    config_reads: int = 0
+    config_writes: int = 0
+    config_bytes_read: int = 0
+    config_bytes_written: int = 0
+    config_time: float = 0.0
+    journal_writes: int = 0
+    journal_bytes: int = 0
+    journal_fsyncs: int = 0
+    checkpoints: int = 0
+    fsyncs: int = 0
+    holes_punched: int = 0
+    elapsed: float = 0.0
+
+    def merge(self, other: "IOStats") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+# Commands may run in several threads, each collects its own stats.
+_local = threading.local()
+
+
+def current_stats() -> IOStats:
+    """
+    Stats of the innermost running collection, drivers report I/O here.
+    """
+
+    if not hasattr(_local, "stats"):
+        _local.stats = IOStats()
+
+    return _local.stats
+
+
+@contextlib.contextmanager
+def collect_stats() -> Generator[IOStats, Any, Any]:
+    """
+    Collect I/O stats of the wrapped code into a fresh `IOStats`.
+
+    Nested collections are merged into the outer one on exit.
+    """
+
+    outer_stats = current_stats()
+    stats = _local.stats = IOStats()
+    started = time.perf_counter()
+
+    try:
+        yield stats
+    finally:
+        stats.elapsed = time.perf_counter() - started
+
+        _local.stats = outer_stats
+        outer_stats.merge(stats)
+
+
+def format_stats(command_name: str, stats: IOStats, output_format: str) -> str:
+    if output_format == "json":
+        return json.dumps({"command": command_name, **asdict(stats)})
+
+    rows = [
+        [name, f"{value * 1e3:.3f} ms" if isinstance(value, float) else value]
+        for name, value in asdict(stats).items()
+    ]
+
+    return f"Stats of `{command_name}`:\n" + tabulate(
+        rows, headers=["counter", "value"]
+    )
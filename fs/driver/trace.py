@@ -0,0 +1,155 @@
+import contextlib
+import struct
+import threading
+import time
+from collections.abc import Generator, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+TRACE_MAGIC = b"FSTRACE2"
+TRACE_FLUSH_BYTES = 64 * 1024
+
+# Record: timestamp, op, block number, bytes, command id.
+TRACE_RECORD = struct.Struct("<dBIIH")
+# Records of traces made before byte counts were widened.
+TRACE_RECORDS = {TRACE_MAGIC: TRACE_RECORD, b"FSTRACE1": struct.Struct("<dBIHH")}
+
+OP_COMMAND = 0  # Defines command name for id, name bytes follow the record.
+OP_READ = 1
+OP_WRITE = 2
+
+OP_NAMES = {OP_READ: "read", OP_WRITE: "write"}
+
+
+@dataclass
+class TraceRecord:
+    timestamp: float
+    op: int
+    block_n: int
+    size: int
+    command: str
+
+
+class TraceRecorder:
+    """
+    Append compact binary records of block I/O to a trace file.
+
+    Commands may run in several threads, each labels records by its own
+    command.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._buffer = bytearray()
+        self._command_ids: dict[str, int] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        if not self._path.exists() or not self._path.stat().st_size:
+            self._buffer += TRACE_MAGIC
+        else:
+            with open(self._path, "rb") as f:
+                if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+                    raise ValueError(
+                        f"Can't append to `{path}`, it is not a trace of this "
+                        f"version."
+                    )
+
+    def set_command(self, name: str) -> None:
+        with self._lock:
+            if name not in self._command_ids:
+                self._command_ids[name] = len(self._command_ids)
+
+                name_bytes = name.encode()
+                self._buffer += TRACE_RECORD.pack(
+                    time.time(),
+                    OP_COMMAND,
+                    self._command_ids[name],
+                    len(name_bytes),
+                    0,
+                )
+                self._buffer += name_bytes
+
+        self._local.command_id = self._command_ids[name]
+
+    def record(self, op: int, block_n: int, size: int) -> None:
+        command_id = getattr(self._local, "command_id", 0)
+
+        with self._lock:
+            self._buffer += TRACE_RECORD.pack(
+                time.time(), op, block_n, size, command_id
+            )
+            full = len(self._buffer) >= TRACE_FLUSH_BYTES
+
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            with open(self._path, "ab") as f:
+                f.write(self._buffer)
+
+            self._buffer.clear()
+
+
+_tracer: Optional[TraceRecorder] = None
+
+
+def current_tracer() -> Optional[TraceRecorder]:
+    return _tracer
+
+
+@contextlib.contextmanager
+def traced(path: Optional[str]) -> Generator[Optional[TraceRecorder], Any, Any]:
+    """
+    Record block I/O of the wrapped code to trace file at `path`.
+
+    Does nothing if `path` is not set.
+    """
+
+    global _tracer
+
+    if not path:
+        yield None
+        return
+
+    _tracer = TraceRecorder(path)
+
+    try:
+        yield _tracer
+    finally:
+        _tracer.flush()
+        _tracer = None
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    trace_record = TRACE_RECORDS.get(data[: len(TRACE_MAGIC)])
+
+    if trace_record is None:
+        raise ValueError(f"`{path}` is not a block I/O trace.")
+
+    commands: dict[int, str] = {}
+    offset = len(TRACE_MAGIC)
+
+    while offset < len(data):
+        timestamp, op, block_n, size, command_id = trace_record.unpack_from(
+            data, offset
+        )
+        offset += trace_record.size
+
+        if op == OP_COMMAND:
+            commands[block_n] = data[offset : offset + size].decode()
+            offset += size
+            continue
+
+        yield TraceRecord(
+            timestamp=timestamp,
+            op=op,
+            block_n=block_n,
+            size=size,
+            command=commands.get(command_id, ""),
+        )
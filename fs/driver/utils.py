@@ -1,24 +1,81 @@
 from dataclasses import dataclass, field
+from typing import Optional
 
-from constants import BLOCK_HEADER_SIZE_BYTES, ROOT_DIRECTORY_PATH
+from constants import (ALLOCATION_FIRST_FIT, BLOCK_HEADER_SIZE_BYTES,
+                       DURABILITY_NONE, ROOT_DIRECTORY_PATH)
 from fs.models.raw import BlockHeader
 from fs.models.utils import BlockHeaderBytes
 
 
+@dataclass
+class InlineState:
+    """
+    Payload and header of a file or symlink small enough to own no blocks.
+    """
+
+    # Payload bytes as latin-1, trailing zeros cut off.
+    content: str = ""
+    symlink: bool = False
+    opened: bool = False
+
+
+@dataclass
+class UsageState:
+    """
+    Totals of a directory and everything below it.
+    """
+
+    size: int = 0
+    blocks: int = 0
+    inodes: int = 0
+
+
+@dataclass
+class QuotaState:
+    """
+    Limits of directory totals, None for no limit.
+    """
+
+    size: Optional[int] = None
+    blocks: Optional[int] = None
+    inodes: Optional[int] = None
+
+
 @dataclass
 class DescriptorState:
     n: int
     used: bool = False
     blocks: list[int] = field(default_factory=list)
+    inline: Optional[InlineState] = None
+    # Hard links count, None on volumes which kept it in block headers.
+    ref_count: Optional[int] = None
+    # Cached type name and stored size, None on volumes made before.
+    type: Optional[str] = None
+    size: Optional[int] = None
+    # Directory whose totals include the object, None for root and for
+    # objects of volumes made before totals were kept.
+    parent: Optional[int] = None
+    # Totals and their limits, directories only.
+    usage: Optional[UsageState] = None
+    quota: Optional[QuotaState] = None
 
 
 @dataclass
 class State:
     descriptors: list[DescriptorState] = field(default_factory=list)
-    path_to_descriptor: dict[str, int] = field(default_factory=dict)
+    # Names of directory entries by directory descriptor id.
+    namespace: dict[int, dict[str, int]] = field(default_factory=dict)
+    # Same entries as (name, parent id, descriptor id), sorted for searches.
+    name_index: list[tuple[str, int, int]] = field(default_factory=list)
     fd_to_path: dict[str, str] = field(default_factory=dict)
     cwd: str = ROOT_DIRECTORY_PATH
     mounted: bool = False
+    durability: str = DURABILITY_NONE
+    allocation: str = ALLOCATION_FIRST_FIT
+    inline_data: bool = False
+    # Volume size in blocks, the image may be shorter. Taken from the image
+    # size if None.
+    n_blocks: Optional[int] = None
 
 
 def form_header_bytes(header: BlockHeader) -> bytearray:
@@ -102,9 +102,57 @@ class BlockWriteDenied(Exception):
     pass
 
 
+class ResizeDenied(Exception):
+    """
+    Can't shrink volume or descriptor table.
+    """
+
+    pass
+
+
 class MaxSymlinkHopsExceeded(Exception):
     """
     Maximum recursion for symlinks exceeded.
     """
 
     pass
+
+
+class RenameDenied(Exception):
+    """
+    Can't move directory into itself or rename root.
+    """
+
+    pass
+
+
+class RemoveDenied(Exception):
+    """
+    Can't remove root directory.
+    """
+
+    pass
+
+
+class CopyDenied(Exception):
+    """
+    Can't copy directory into itself.
+    """
+
+    pass
+
+
+class QuotaExceeded(Exception):
+    """
+    Change would make a directory use more than its quota allows.
+    """
+
+    pass
+
+
+class FileNameTooLong(Exception):
+    """
+    Name doesn't fit a directory record.
+    """
+
+    pass
@@ -1,10 +1,17 @@
-from typing import Type
+import logging
+import sys
+from typing import Any, Optional, Type
 
 from fs.commands.base import BaseFSCommand
 from fs.commands.cd import CdCommand
 from fs.commands.close import CloseCommand
+from fs.commands.cp import CpCommand
 from fs.commands.create import CreateCommand
 from fs.commands.cwd import CwdCommand
+from fs.commands.defrag import DefragCommand
+from fs.commands.du import DuCommand
+from fs.commands.find import FindCommand
+from fs.commands.frag import FragCommand
 from fs.commands.fstat import FstatCommand
 from fs.commands.link import LinkCommand
 from fs.commands.ls import LsCommand
@@ -12,17 +19,27 @@ from fs.commands.mkdir import MkdirCommand
 from fs.commands.mkfs import MkfsCommand
 from fs.commands.mount import MountCommand
 from fs.commands.open import OpenCommand
+from fs.commands.quota import QuotaCommand
 from fs.commands.read import ReadCommand
+from fs.commands.rename import RenameCommand
+from fs.commands.resize import ResizeCommand
+from fs.commands.rm import RmCommand
 from fs.commands.rmdir import RmdirCommand
+from fs.commands.stat import StatCommand
 from fs.commands.symlink import SymlinkCommand
 from fs.commands.truncate import TruncateCommand
 from fs.commands.umount import UmountCommand
 from fs.commands.unlink import UnlinkCommand
 from fs.commands.write import WriteCommand
+from fs.driver.reclaim import current_reclaimer
+from fs.driver.stats import format_stats
+from fs.driver.trace import traced
 from fs.manager.parser import parser_factory
-from fs.manager.validate import (validate_mkfs, validate_path, validate_read,
-                                 validate_symlink, validate_truncate,
-                                 validate_write)
+from fs.manager.profiler import profiled
+from fs.manager.validate import (validate_ids, validate_limit, validate_mkfs,
+                                 validate_path, validate_quota, validate_read,
+                                 validate_resize, validate_symlink,
+                                 validate_truncate, validate_write)
 
 
 class FsManager:
@@ -35,6 +52,7 @@ class FsManager:
         "mount": MountCommand,
         "umount": UmountCommand,
         "fstat": FstatCommand,
+        "stat": StatCommand,
         "create": CreateCommand,
         "ls": LsCommand,
         "open": OpenCommand,
@@ -42,82 +60,187 @@ class FsManager:
         "read": ReadCommand,
         "write": WriteCommand,
         "link": LinkCommand,
+        "rename": RenameCommand,
         "unlink": UnlinkCommand,
         "truncate": TruncateCommand,
         "mkdir": MkdirCommand,
         "rmdir": RmdirCommand,
+        "rm": RmCommand,
+        "cp": CpCommand,
+        "du": DuCommand,
+        "find": FindCommand,
+        "quota": QuotaCommand,
         "cd": CdCommand,
         "symlink": SymlinkCommand,
         "cwd": CwdCommand,
+        "resize": ResizeCommand,
+        "defrag": DefragCommand,
+        "frag": FragCommand,
     }
 
     def __init__(self) -> None:
         self.parser = parser_factory()
         self.args = self.parser.parse_args()
 
+        self._logger = logging.getLogger(__name__)
+
     def handle_input(self) -> None:
         """
         Branching logic by input action.
         """
 
+        command_name, command_kwargs = self.parse_command()
+
+        if command_name is None:
+            return
+
+        command = self.commands[command_name](**command_kwargs)
+        # Nothing is left queued for the exit hook, outside of the command.
+        current_reclaimer().per_command = True
+
+        with profiled(self.args.profile, self.args.profile_format), traced(
+            self.args.trace
+        ):
+            command.run()
+
+        if self.args.stats:
+            self._logger.info(
+                format_stats(command_name, command.stats, self.args.stats)
+            )
+
+    def parse_command(self) -> tuple[Optional[str], dict[str, Any]]:
+        """
+        Pick command name and its kwargs by input action.
+        """
+
         if self.args.mkfs > -1:
             n = validate_mkfs(self.args.mkfs, self.parser.error)
-            self.commands["mkfs"](n=n).exec()
+            return "mkfs", dict(n=n)
 
         elif self.args.mount:
-            self.commands["mount"]().exec()
+            return "mount", dict(
+                journal=self.args.journal,
+                durability=self.args.durability,
+                allocation=self.args.allocation,
+                inline=self.args.inline,
+            )
 
         elif self.args.umount:
-            self.commands["umount"]().exec()
+            return "umount", dict()
 
         elif self.args.fstat > -1:
-            self.commands["fstat"](fid=self.args.fstat).exec()
+            return "fstat", dict(fid=self.args.fstat)
 
-        elif self.args.ls:
-            self.commands["ls"]().exec()
+        elif self.args.stat is not None:
+            targets = self.args.stat or [
+                line.strip() for line in sys.stdin if line.strip()
+            ]
+
+            if self.args.ids:
+                return "stat", dict(ids=validate_ids(targets, self.parser.error))
+
+            return "stat", dict(paths=targets)
+
+        elif self.args.ls is not None:
+            limit = validate_limit(self.args.limit, self.parser.error)
+            return "ls", dict(
+                path=self.args.ls or None,
+                output=self.args.output,
+                limit=limit,
+                after=self.args.after,
+                names_only=self.args.names_only,
+            )
 
         elif self.args.create:
             filepath = validate_path(self.args.create, self.parser.error)
-            self.commands["create"](path=filepath).exec()
+            return "create", dict(path=filepath)
 
         elif self.args.open:
             filepath = validate_path(self.args.open, self.parser.error)
-            self.commands["open"](path=filepath).exec()
+            return "open", dict(path=filepath)
 
         elif self.args.close:
-            self.commands["close"](fd=self.args.close).exec()
+            return "close", dict(fd=self.args.close)
 
         elif self.args.read:
             fd, offset, size = validate_read(self.args.read, self.parser.error)
-            self.commands["read"](fd=fd, offset=offset, size=size).exec()
+            return "read", dict(fd=fd, offset=offset, size=size)
 
         elif self.args.write:
             fd, offset, content = validate_write(self.args.write, self.parser.error)
-            self.commands["write"](fd=fd, offset=offset, content=content).exec()
+            return "write", dict(fd=fd, offset=offset, content=content)
 
         elif self.args.link:
             path1, path2 = self.args.link
-            self.commands["link"](path1=path1, path2=path2).exec()
+            return "link", dict(path1=path1, path2=path2)
+
+        elif self.args.rename:
+            path1, path2 = self.args.rename
+            path2 = validate_path(path2, self.parser.error)
+            return "rename", dict(path1=path1, path2=path2)
 
         elif self.args.unlink:
-            self.commands["unlink"](path=self.args.unlink).exec()
+            return "unlink", dict(path=self.args.unlink)
 
         elif self.args.truncate:
             path, size = validate_truncate(self.args.truncate, self.parser.error)
-            self.commands["truncate"](path=path, size=size).exec()
+            return "truncate", dict(path=path, size=size)
 
         elif self.args.mkdir:
-            self.commands["mkdir"](path=self.args.mkdir).exec()
+            return "mkdir", dict(path=self.args.mkdir)
 
         elif self.args.rmdir:
-            self.commands["rmdir"](path=self.args.rmdir).exec()
+            return "rmdir", dict(path=self.args.rmdir)
+
+        elif self.args.rm:
+            return "rm", dict(path=self.args.rm)
+
+        elif self.args.cp:
+            path1, path2 = self.args.cp
+            path2 = validate_path(path2, self.parser.error)
+            return "cp", dict(path1=path1, path2=path2)
+
+        elif self.args.du is not None:
+            return "du", dict(path=self.args.du or None)
+
+        elif self.args.find is not None:
+            return "find", dict(
+                path=self.args.find or None, name=self.args.name, type=self.args.type
+            )
+
+        elif self.args.quota:
+            size, blocks, inodes = validate_quota(
+                (self.args.max_size, self.args.max_blocks, self.args.max_inodes),
+                self.parser.error,
+            )
+            return "quota", dict(
+                path=self.args.quota,
+                size=size,
+                blocks=blocks,
+                inodes=inodes,
+                clear=self.args.clear_quota,
+            )
 
         elif self.args.cd:
-            self.commands["cd"](path=self.args.cd).exec()
+            return "cd", dict(path=self.args.cd)
 
         elif self.args.symlink:
             content, path = validate_symlink(self.args.symlink, self.parser.error)
-            self.commands["symlink"](content=content, path=path).exec()
+            return "symlink", dict(content=content, path=path)
 
         elif self.args.cwd:
-            self.commands["cwd"]().exec()
+            return "cwd", dict()
+
+        elif self.args.resize is not None:
+            blocks, descriptors = validate_resize(
+                self.args.resize, self.args.descriptors, self.parser.error
+            )
+            return "resize", dict(blocks=blocks, descriptors=descriptors)
+
+        elif self.args.defrag:
+            return "defrag", dict(shrink=self.args.shrink)
+
+        elif self.args.frag:
+            return "frag", dict()
+
+        return None, dict()
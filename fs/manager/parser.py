@@ -1,6 +1,10 @@
 from argparse import ArgumentParser
 
-from constants import ROOT_DIRECTORY_PATH
+from constants import (ALLOCATION_FIRST_FIT, ALLOCATION_POLICIES,
+                       DURABILITY_MODES, DURABILITY_NONE, LS_OUTPUT_TABLE,
+                       LS_OUTPUTS, ROOT_DIRECTORY_PATH)
+from fs.manager.profiler import PROFILE_FORMATS
+from fs.models.result import DESCRIPTOR_TYPES
 
 
 def parser_factory() -> ArgumentParser:
@@ -26,6 +30,36 @@ def parser_factory() -> ArgumentParser:
     parser.add_argument(
         "--umount", action="store_true", default=False, help="unmount FS from storage."
     )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        default=False,
+        help="with `--mount`, journal metadata changes before applying them.",
+    )
+    parser.add_argument(
+        "--durability",
+        action="store",
+        choices=DURABILITY_MODES,
+        default=DURABILITY_NONE,
+        help="with `--mount`, when changes are synced to storage: never, "
+        "in batches from a background flusher or after every command.",
+    )
+    parser.add_argument(
+        "--allocation",
+        action="store",
+        choices=ALLOCATION_POLICIES,
+        default=ALLOCATION_FIRST_FIT,
+        help="with `--mount`, how free blocks are picked: lowest free, next "
+        "after the last allocated, smallest fitting free extent or near "
+        "blocks of the same directory.",
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        default=False,
+        help="with `--mount`, keep payloads of files and symlinks fitting a "
+        "block in descriptors, without allocating blocks.",
+    )
     parser.add_argument(
         "--fstat",
         action="store",
@@ -35,7 +69,57 @@ def parser_factory() -> ArgumentParser:
         help="print info about descriptor with `id`.",
     )
     parser.add_argument(
-        "--ls", action="store_true", default=False, help="list directory content."
+        "--stat",
+        action="store",
+        nargs="*",
+        type=str,
+        metavar="target",
+        help="print info about objects at paths `target`, one per line of "
+        "stdin if none passed.",
+    )
+    parser.add_argument(
+        "--ids",
+        action="store_true",
+        default=False,
+        help="with `--stat`, targets are descriptor ids.",
+    )
+    parser.add_argument(
+        "--ls",
+        action="store",
+        nargs="?",
+        const=ROOT_DIRECTORY_PATH,
+        type=str,
+        metavar="path",
+        help="list directory content, current directory by default.",
+    )
+    parser.add_argument(
+        "--output",
+        action="store",
+        choices=LS_OUTPUTS,
+        default=LS_OUTPUT_TABLE,
+        help="with `--ls`, print a table once all entries are read, or stream "
+        "entries as JSON lines or tab separated values.",
+    )
+    parser.add_argument(
+        "--limit",
+        action="store",
+        type=int,
+        metavar="n",
+        help="with `--ls`, print at most `n` entries.",
+    )
+    parser.add_argument(
+        "--after",
+        action="store",
+        type=str,
+        metavar="name",
+        help="with `--ls`, start after entry `name`, the last one of the "
+        "previous page.",
+    )
+    parser.add_argument(
+        "--names-only",
+        action="store_true",
+        default=False,
+        help="with `--ls`, print only names, without looking up descriptors.",
     )
     parser.add_argument(
         "--create",
@@ -82,6 +166,14 @@ def parser_factory() -> ArgumentParser:
         metavar=("path1", "path2"),
         help="link `path2` with a file which `path1` links.",
     )
+    parser.add_argument(
+        "--rename",
+        action="store",
+        nargs=2,
+        type=str,
+        metavar=("path1", "path2"),
+        help="rename or move a file or directory from `path1` to `path2`.",
+    )
     parser.add_argument(
         "--unlink",
         action="store",
@@ -111,6 +203,89 @@ def parser_factory() -> ArgumentParser:
         metavar="path",
         help="delete empty directory.",
     )
+    parser.add_argument(
+        "--rm",
+        action="store",
+        type=str,
+        metavar="path",
+        help="delete a file, symlink or directory with everything below it.",
+    )
+    parser.add_argument(
+        "--cp",
+        action="store",
+        nargs=2,
+        type=str,
+        metavar=("path1", "path2"),
+        help="copy a file, symlink or directory with everything below it "
+        "from `path1` to `path2`.",
+    )
+    parser.add_argument(
+        "--du",
+        action="store",
+        nargs="?",
+        const=ROOT_DIRECTORY_PATH,
+        type=str,
+        metavar="path",
+        help="print size, blocks and descriptors used below every directory "
+        "of `path`, current directory by default.",
+    )
+    parser.add_argument(
+        "--find",
+        action="store",
+        nargs="?",
+        const=ROOT_DIRECTORY_PATH,
+        type=str,
+        metavar="path",
+        help="print paths below `path`, current directory by default.",
+    )
+    parser.add_argument(
+        "--name",
+        action="store",
+        type=str,
+        metavar="pattern",
+        help="with `--find`, only names matching shell `pattern`.",
+    )
+    parser.add_argument(
+        "--type",
+        action="store",
+        choices=sorted(DESCRIPTOR_TYPES.values()),
+        help="with `--find`, only objects of this type.",
+    )
+    parser.add_argument(
+        "--quota",
+        action="store",
+        type=str,
+        metavar="path",
+        help="print size, blocks and descriptors used below directory `path` "
+        "with their limits.",
+    )
+    parser.add_argument(
+        "--max-size",
+        action="store",
+        type=int,
+        metavar="n",
+        help="with `--quota`, limit size of everything below the directory.",
+    )
+    parser.add_argument(
+        "--max-blocks",
+        action="store",
+        type=int,
+        metavar="n",
+        help="with `--quota`, limit blocks used below the directory.",
+    )
+    parser.add_argument(
+        "--max-inodes",
+        action="store",
+        type=int,
+        metavar="n",
+        help="with `--quota`, limit descriptors used below the directory.",
+    )
+    parser.add_argument(
+        "--clear-quota",
+        action="store_true",
+        default=False,
+        help="with `--quota`, remove limits of the directory.",
+    )
     parser.add_argument(
         "--cd",
         action="store",
@@ -134,5 +309,67 @@ def parser_factory() -> ArgumentParser:
         default=False,
         help="show current working directory.",
     )
+    parser.add_argument(
+        "--resize",
+        action="store",
+        type=int,
+        metavar="n",
+        help="grow mounted volume to `n` blocks, keeping its data.",
+    )
+    parser.add_argument(
+        "--descriptors",
+        action="store",
+        type=int,
+        metavar="n",
+        help="with `--resize`, also grow descriptor table to `n` descriptors.",
+    )
+    parser.add_argument(
+        "--defrag",
+        action="store_true",
+        default=False,
+        help="relocate file blocks into contiguous runs.",
+    )
+    parser.add_argument(
+        "--shrink",
+        action="store_true",
+        default=False,
+        help="with `--defrag`, cut trailing free blocks off the image.",
+    )
+    parser.add_argument(
+        "--frag",
+        action="store_true",
+        default=False,
+        help="print free extents and file extents statistics.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store",
+        nargs="?",
+        const="human",
+        choices=("human", "json"),
+        metavar="format",
+        help="print I/O stats of the executed command as `human` or `json`.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store",
+        type=str,
+        metavar="out",
+        help="profile the executed command, save results to `out`.",
+    )
+    parser.add_argument(
+        "--profile-format",
+        action="store",
+        choices=PROFILE_FORMATS,
+        default="pstats",
+        help="format of `--profile` output: pstats or collapsed stacks.",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store",
+        type=str,
+        metavar="out",
+        help="append block I/O records of the executed command to `out`.",
+    )
 
     return parser
@@ -0,0 +1,94 @@
+import contextlib
+import cProfile
+import os
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Generator
+from types import FrameType
+from typing import Any, Optional
+
+PROFILE_FORMATS = ("pstats", "collapsed")
+
+
+class StackProfiler:
+    """
+    Deterministic profiler recording self time of every full call stack.
+
+    Output is in collapsed-stack format (`frame;frame;frame microseconds`)
+    consumed by flame graph tools.
+    """
+
+    def __init__(self) -> None:
+        self._stack: list[str] = []
+        self._last_event = 0.0
+        self.self_time: dict[tuple[str, ...], float] = defaultdict(float)
+
+    @staticmethod
+    def _frame_label(frame: FrameType, event: str, arg: Any) -> str:
+        if event.startswith("c_"):
+            module = getattr(arg, "__module__", None) or "builtins"
+            return f"{module}:{getattr(arg, '__qualname__', repr(arg))}"
+
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+
+        return f"{filename}:{code.co_name}:{code.co_firstlineno}"
+
+    def _on_event(self, frame: FrameType, event: str, arg: Any) -> None:
+        now = time.perf_counter()
+
+        if self._stack:
+            self.self_time[tuple(self._stack)] += now - self._last_event
+
+        if event in ("call", "c_call"):
+            self._stack.append(self._frame_label(frame, event, arg))
+
+        elif self._stack:
+            self._stack.pop()
+
+        self._last_event = time.perf_counter()
+
+    def enable(self) -> None:
+        self._last_event = time.perf_counter()
+        sys.setprofile(self._on_event)
+
+    def disable(self) -> None:
+        sys.setprofile(None)
+
+    def dump_collapsed(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, elapsed in sorted(self.self_time.items()):
+                f.write(f"{';'.join(stack)} {max(int(elapsed * 1e6), 1)}\n")
+
+
+@contextlib.contextmanager
+def profiled(
+    output: Optional[str], output_format: str = "pstats"
+) -> Generator[None, Any, Any]:
+    """
+    Profile the wrapped code and save results to `output`.
+
+    Does nothing if `output` is not set.
+    """
+
+    if not output:
+        yield
+        return
+
+    if output_format == "collapsed":
+        profiler = StackProfiler()
+    else:
+        profiler = cProfile.Profile()
+
+    profiler.enable()
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+        if isinstance(profiler, StackProfiler):
+            profiler.dump_collapsed(output)
+        else:
+            profiler.dump_stats(output)
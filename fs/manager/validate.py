@@ -1,11 +1,13 @@
 from collections import Callable
+from typing import Optional
 
-from constants import FILENAME_MAXSIZE_BYTES, N_DESCRIPTORS, PATH_DIVIDER
+from constants import (FILENAME_MAXSIZE_BYTES, N_DESCRIPTORS,
+                       N_DESCRIPTORS_MAX, PATH_DIVIDER)
 
 
 def validate_path(path: str, error_cb: Callable[[str], None]) -> str:
-    if len(path.split(PATH_DIVIDER)[-1]) > FILENAME_MAXSIZE_BYTES:
-        error_cb(f"File name length must be less than {FILENAME_MAXSIZE_BYTES}.")
+    if len(path.split(PATH_DIVIDER)[-1].encode()) > FILENAME_MAXSIZE_BYTES:
+        error_cb(f"File name must be at most {FILENAME_MAXSIZE_BYTES} bytes.")
 
     if not all(path.split(PATH_DIVIDER)):
         error_cb("File path is incorrect.")
@@ -23,6 +25,32 @@ def validate_mkfs(n: int, error_cb: Callable[[str], None]) -> int:
     return n
 
 
+def validate_ids(ids: list[str], error_cb: Callable[[str], None]) -> list[int]:
+    if not all(descriptor_id.isdigit() for descriptor_id in ids):
+        error_cb("Descriptor id must be a non-negative number.")
+
+    return [int(descriptor_id) for descriptor_id in ids]
+
+
+def validate_limit(
+    limit: Optional[int], error_cb: Callable[[str], None]
+) -> Optional[int]:
+    if limit is not None and limit < 0:
+        error_cb("Cannot use limit less than 0.")
+
+    return limit
+
+
+def validate_quota(
+    limits: tuple[Optional[int], Optional[int], Optional[int]],
+    error_cb: Callable[[str], None],
+) -> tuple[Optional[int], Optional[int], Optional[int]]:
+    if any(limit is not None and limit < 0 for limit in limits):
+        error_cb("Cannot use quota limit less than 0.")
+
+    return limits
+
+
 def validate_read(
     params: tuple[str, str, str], error_cb: Callable[[str], None]
 ) -> tuple[str, int, int]:
@@ -69,3 +97,15 @@ def validate_symlink(
     path = validate_path(path, error_cb)
 
     return content, path
+
+
+def validate_resize(
+    blocks: int, descriptors: Optional[int], error_cb: Callable[[str], None]
+) -> tuple[int, Optional[int]]:
+    if blocks < 1:
+        error_cb("Cannot resize FS to less than 1 block.")
+
+    if descriptors is not None and descriptors > N_DESCRIPTORS_MAX:
+        error_cb(f"Cannot grow FS to more than {N_DESCRIPTORS_MAX} descriptors.")
+
+    return blocks, descriptors
@@ -1,6 +1,22 @@
+from collections.abc import Iterator
 from dataclasses import asdict, dataclass, field
 
-from constants import BLOCK_CONTENT_SIZE_BYTES, DIRECTORY_MAPPING_BYTES
+from constants import (BLOCK_CONTENT_SIZE_BYTES, DIRECTORY_MAPPING_BYTES,
+                       DIRECTORY_RECORD_HEADER_BYTES)
+
+# Offsets of fixed directory link slots of older volumes in a block.
+LINK_SLOTS = range(
+    0, BLOCK_CONTENT_SIZE_BYTES - DIRECTORY_MAPPING_BYTES, DIRECTORY_MAPPING_BYTES
+)
+
+
+@dataclass
+class DirectoryRecord:
+    offset: int
+    length: int
+    name: str
+    n: int
+    type_code: int
 
 
 @dataclass
@@ -13,40 +29,72 @@ class Block:
     def write_content(self, content: str, offset: int = 0):
         self.content[offset : offset + len(content)] = [ord(ch) for ch in content]
 
-    def write_link(self, name: str, descriptor_id: int) -> None:
+    def records(self) -> Iterator[DirectoryRecord]:
+        """
+        Directory records of the block, up to the first zero record length.
+        """
+
         offset = 0
 
-        for link_mapping_step in range(
-            0,
-            BLOCK_CONTENT_SIZE_BYTES - DIRECTORY_MAPPING_BYTES,
-            DIRECTORY_MAPPING_BYTES,
-        ):
-            mapping_bytes = self.content[
-                link_mapping_step : link_mapping_step + DIRECTORY_MAPPING_BYTES
+        while offset + DIRECTORY_RECORD_HEADER_BYTES <= BLOCK_CONTENT_SIZE_BYTES:
+            record_length, name_length, type_code, descriptor_id = self.content[
+                offset : offset + DIRECTORY_RECORD_HEADER_BYTES
             ]
 
-            if not any(mapping_bytes):
-                offset = link_mapping_step
-                break
+            if not record_length:
+                return
+
+            name_offset = offset + DIRECTORY_RECORD_HEADER_BYTES
+            name = self.content[name_offset : name_offset + name_length].decode()
+
+            yield DirectoryRecord(offset, record_length, name, descriptor_id, type_code)
+
+            offset += record_length
+
+    def records_end(self) -> int:
+        """
+        Offset right after the last record.
+        """
+
+        end = 0
 
-        self.content[offset : offset + len(name)] = [ord(ch) for ch in name]
-        self.content[offset + DIRECTORY_MAPPING_BYTES - 1] = descriptor_id
+        for record in self.records():
+            end = record.offset + record.length
+
+        return end
+
+    def has_room(self, name_length: int) -> bool:
+        return (
+            self.records_end() + DIRECTORY_RECORD_HEADER_BYTES + name_length
+            <= BLOCK_CONTENT_SIZE_BYTES
+        )
+
+    def write_record(self, name: bytes, descriptor_id: int, type_code: int) -> None:
+        offset = self.records_end()
+        record_length = DIRECTORY_RECORD_HEADER_BYTES + len(name)
+
+        self.content[offset : offset + record_length] = (
+            bytes([record_length, len(name), type_code, descriptor_id]) + name
+        )
 
     def get_links(self) -> dict:
+        return {record.name: record.n for record in self.records()}
+
+    def get_slot_links(self) -> dict:
+        """
+        Links of a block written by older versions in fixed slots.
+        """
+
         links = {}
 
-        for link_mapping_step in range(
-            0,
-            BLOCK_CONTENT_SIZE_BYTES - DIRECTORY_MAPPING_BYTES,
-            DIRECTORY_MAPPING_BYTES,
-        ):
+        for link_mapping_step in LINK_SLOTS:
             mapping_bytes = self.content[
                 link_mapping_step : link_mapping_step + DIRECTORY_MAPPING_BYTES
             ]
 
-            # Run out of links.
+            # Hole left by a removed link, links may follow it.
             if not any(mapping_bytes):
-                break
+                continue
 
             descriptor_id = mapping_bytes[-1]
             name_bytes = mapping_bytes[:-1]
@@ -56,28 +104,8 @@ class Block:
 
         return links
 
-    def remove_link(self, name: str) -> None:
-        for link_mapping_step in range(
-            0,
-            BLOCK_CONTENT_SIZE_BYTES - DIRECTORY_MAPPING_BYTES,
-            DIRECTORY_MAPPING_BYTES,
-        ):
-            mapping_bytes = self.content[
-                link_mapping_step : link_mapping_step + DIRECTORY_MAPPING_BYTES
-            ]
-
-            # Run out of links.
-            if not any(mapping_bytes):
-                break
-
-            name_bytes = mapping_bytes[:-1]
-            link_name = "".join(chr(b) for b in name_bytes if b)
-
-            if name == link_name:
-                self.content[
-                    link_mapping_step : link_mapping_step + DIRECTORY_MAPPING_BYTES
-                ] = [0 for _ in range(DIRECTORY_MAPPING_BYTES)]
-                break
+    def clear(self) -> None:
+        self.content[:] = bytes(BLOCK_CONTENT_SIZE_BYTES)
 
     def __repr__(self):
         attrs_str = []
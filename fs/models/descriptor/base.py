@@ -11,12 +11,27 @@ class Descriptor:
     size: int
     opened: bool
     blocks: list[Block]
+    # Payload is kept in the descriptor state, in a single unnumbered block.
+    inline: bool = False
+
+    @property
+    def block_numbers(self) -> list[int]:
+        return [] if self.inline else [block.n for block in self.blocks]
 
     def add_block(self) -> None:
         from fs.driver.memory import MemoryStorageProxy
         from fs.driver.state import SystemState
 
-        block_n = MemoryStorageProxy().get_available_block_n()
+        if self.inline:
+            # Payload outgrew the descriptor, spill it into a block first.
+            self.inline = False
+            self.blocks[0].n = MemoryStorageProxy().get_available_block_n()
+            SystemState().map_descriptor_to_blocks(self.n, [self.blocks[0].n])
+
+        # Next to the last block, so the descriptor may stay contiguous.
+        block_n = MemoryStorageProxy().get_available_block_n(
+            goal=self.blocks[-1].n + 1 if self.blocks else None
+        )
         SystemState().add_block_to_descriptor(descriptor_id=self.n, block_n=block_n)
 
         self.blocks.append(Block(n=block_n))
@@ -41,11 +56,16 @@ class Descriptor:
 
         return blocks_deleted
 
-    def update_size(self) -> None:
-        self.size = 0
+    @property
+    def stored_size(self) -> int:
+        """
+        Size as saved to block headers, count of non-zero payload bytes.
+        """
 
-        for block in self.blocks:
-            self.size += sum(map(bool, block.content))
+        return sum(sum(map(bool, block.content)) for block in self.blocks)
+
+    def update_size(self) -> None:
+        self.size = self.stored_size
 
 
 @dataclass
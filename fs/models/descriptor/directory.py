@@ -1,35 +1,140 @@
 from dataclasses import dataclass
+from typing import Optional
 
-from constants import DIRECTORY_MAPPING_BYTES
+from constants import (DIRECTORY_RECORD_HEADER_BYTES, DIRECTORY_RECORD_TYPES,
+                       FILENAME_MAXSIZE_BYTES)
+from fs.exceptions import FileNameTooLong
+from fs.models.block import Block
 from fs.models.descriptor.base import Descriptor, FSObject
 
+# Name, descriptor id and type code of a directory link.
+DirectoryLink = tuple[str, int, int]
+
+RECORD_TYPE_NAMES = {code: name for name, code in DIRECTORY_RECORD_TYPES.items()}
+
 
 @dataclass
 class DirectoryDescriptor(Descriptor):
-    def write_link(self, name: str, descriptor_id: int) -> None:
-        for block in self.blocks:
-            if not any(block.content[-DIRECTORY_MAPPING_BYTES:]):
-                block.write_link(name, descriptor_id)
-                break
-        else:
+    """
+    Links are kept as variable-length records packed from the start of the
+    first block, so only the end of the last block is appended to.
+
+    Directories of older volumes keep links in fixed slots, they are read
+    as is and rewritten as records on their first change.
+    """
+
+    def write_link(self, name: str, descriptor_id: int, descriptor_type: str) -> None:
+        name_bytes = name.encode()
+
+        if len(name_bytes) > FILENAME_MAXSIZE_BYTES:
+            raise FileNameTooLong(
+                f"File name can't be longer than {FILENAME_MAXSIZE_BYTES} bytes."
+            )
+
+        if self._has_slots():
+            self._pack(self._read_links())
+
+        if not self.blocks[-1].has_room(len(name_bytes)):
             self.add_block()
-            self.blocks[-1].write_link(name, descriptor_id)
+
+        self.blocks[-1].write_record(
+            name_bytes, descriptor_id, DIRECTORY_RECORD_TYPES[descriptor_type]
+        )
 
     def read_directory_links(self) -> dict:
-        links = {}
+        return {name: descriptor_id for name, descriptor_id, _ in self._read_links()}
 
-        for block in self.blocks:
-            links.update(block.get_links())
+    def read_directory_types(self) -> dict[str, Optional[str]]:
+        """
+        Types of linked objects kept in records, None for fixed slots.
+        """
 
-        return links
+        return {
+            name: RECORD_TYPE_NAMES.get(type_code)
+            for name, _, type_code in self._read_links()
+        }
+
+    def update_directory_link(self, name: str, descriptor_id: int) -> None:
+        if self._has_slots():
+            self._pack(self._read_links())
 
-    def remove_directory_link(self, name: str) -> None:
         for block in self.blocks:
-            block.remove_link(name)
+            for record in block.records():
+                if record.name == name:
+                    # Descriptor id is the last byte of the record header.
+                    block.content[
+                        record.offset + DIRECTORY_RECORD_HEADER_BYTES - 1
+                    ] = descriptor_id
+                    return
+
+    def remove_directory_link(self, name: str) -> list[Block]:
+        """
+        Remove link `name` and pack records after it over its place.
+
+        Blocks left empty at the end are returned to be freed, the first
+        block is always kept.
+        """
+
+        links = self._read_links()
+        kept_links = [link for link in links if link[0] != name]
+
+        if len(kept_links) == len(links):
+            return []
+
+        self._pack(kept_links)
+
+        blocks_deleted = []
+
+        while len(self.blocks) > 1 and not any(self.blocks[-1].content):
+            blocks_deleted.append(self.blocks.pop(-1))
+
+        return blocks_deleted
+
+    def clear(self) -> list[Block]:
+        blocks_deleted = []
 
-    def clear(self) -> None:
         for link in reversed(self.read_directory_links()):
-            self.remove_directory_link(link)
+            blocks_deleted += self.remove_directory_link(link)
+
+        return blocks_deleted
+
+    def _has_slots(self) -> bool:
+        # Record length is never 0 with a name after it, while a fixed slot
+        # of "." is followed by a zero byte.
+        content = self.blocks[0].content
+
+        return bool(content[0]) and not content[1]
+
+    def _read_links(self) -> list[DirectoryLink]:
+        if self._has_slots():
+            return [
+                (name, descriptor_id, 0)
+                for block in self.blocks
+                for name, descriptor_id in block.get_slot_links().items()
+            ]
+
+        return [
+            (record.name, record.n, record.type_code)
+            for block in self.blocks
+            for record in block.records()
+        ]
+
+    def _pack(self, links: list[DirectoryLink]) -> None:
+        for block in self.blocks:
+            block.clear()
+
+        i = 0
+
+        for name, descriptor_id, type_code in links:
+            name_bytes = name.encode()
+
+            while not self.blocks[i].has_room(len(name_bytes)):
+                i += 1
+
+                if i == len(self.blocks):
+                    self.add_block()
+
+            self.blocks[i].write_record(name_bytes, descriptor_id, type_code)
 
 
 @dataclass
@@ -30,19 +30,21 @@ class FileDescriptor(Descriptor):
                 content, offset, skip_blocks=skip_blocks + from_block + 1
             )
 
-    def read_content(self, size: int, offset: int = 0) -> str:
+    def read_bytes(self, size: int, offset: int = 0) -> bytes:
         from_block = offset // BLOCK_CONTENT_SIZE_BYTES
         blocks_to_read = (offset + size) // BLOCK_CONTENT_SIZE_BYTES
 
-        content = [
-            b
-            for block in self.blocks[from_block : blocks_to_read + 1]
-            for b in block.content
-        ]
-        content = content[offset : offset + size]
-        content = [chr(int(str(ch))) if ch else " " for ch in content]
+        content = b"".join(
+            block.content for block in self.blocks[from_block : blocks_to_read + 1]
+        )
+        offset -= from_block * BLOCK_CONTENT_SIZE_BYTES
+
+        return content[offset : offset + size]
+
+    def read_content(self, size: int, offset: int = 0) -> str:
+        content = self.read_bytes(size, offset)
 
-        return "".join(content)
+        return "".join(chr(ch) if ch else " " for ch in content)
 
 
 @dataclass
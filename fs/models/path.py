@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 from fs.models.descriptor.directory import DirectoryDescriptor
+from fs.models.result import DirectoryEntry
 
 
 @dataclass
@@ -9,3 +10,9 @@ class ResolvedPath:
     directory_path: str
     fs_object_name: str
     fs_object_path: str
+
+
+@dataclass
+class TreeNode:
+    path: str
+    entry: DirectoryEntry
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fs.models.descriptor.base import Descriptor
+from fs.models.descriptor.directory import DirectoryDescriptor
+from fs.models.descriptor.file import FileDescriptor
+from fs.models.descriptor.symlink import SymlinkDescriptor
+
+DESCRIPTOR_TYPES: dict[type[Descriptor], str] = {
+    DirectoryDescriptor: "directory",
+    FileDescriptor: "file",
+    SymlinkDescriptor: "symlink",
+}
+
+
+@dataclass
+class DirectoryEntry:
+    name: str
+    n: int
+    type: str
+    refs_count: int
+    size: int
+
+    @classmethod
+    def from_descriptor(cls, name: str, descriptor: Descriptor) -> "DirectoryEntry":
+        return cls(
+            name=name,
+            n=descriptor.n,
+            type=DESCRIPTOR_TYPES[type(descriptor)],
+            refs_count=descriptor.refs_count,
+            size=descriptor.size,
+        )
+
+
+@dataclass
+class StatResult:
+    n: int
+    type: str
+    refs_count: int
+    size: int
+    opened: bool
+    blocks: list[int]
+
+    @classmethod
+    def from_descriptor(cls, descriptor: Descriptor) -> "StatResult":
+        return cls(
+            n=descriptor.n,
+            type=DESCRIPTOR_TYPES[type(descriptor)],
+            refs_count=descriptor.refs_count,
+            size=descriptor.size,
+            opened=descriptor.opened,
+            blocks=descriptor.block_numbers,
+        )
+
+
+@dataclass
+class FragReport:
+    allocation: str
+    n_blocks: int
+    used_blocks: int
+    free_blocks: int
+    free_extents: int
+    largest_free_extent: int
+    # Free extents count by extent length range, e.g. `4-7` blocks.
+    free_extents_histogram: dict[str, int]
+    files: int
+    avg_extents_per_file: float
+
+
+@dataclass
+class UsageEntry:
+    path: str
+    size: int
+    blocks: int
+    # Descriptors below the path, hard linked ones counted once.
+    inodes: int
+
+
+@dataclass
+class QuotaEntry:
+    path: str
+    size: int
+    blocks: int
+    inodes: int
+    # Limits of the totals, None for no limit.
+    max_size: Optional[int]
+    max_blocks: Optional[int]
+    max_inodes: Optional[int]
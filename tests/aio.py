@@ -0,0 +1,88 @@
+import asyncio
+
+from fs.api.aio import AsyncFileSystem
+from fs.driver.state import SystemState, read_only_state
+from fs.driver.stats import collect_stats
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSAsyncApi(FSBaseMountAndMkfsTestCase):
+    def test_write_read_ordered(self) -> None:
+        async def scenario() -> list[str]:
+            async with AsyncFileSystem() as fs:
+                await fs.create("/file1")
+                fd = await fs.open("/file1")
+
+                return await asyncio.gather(
+                    fs.write(fd, 0, "abc"),
+                    fs.read(fd, 0, 3),
+                    fs.write(fd, 0, "xyz"),
+                    fs.read(fd, 0, 3),
+                )
+
+        _, first, _, second = asyncio.run(scenario())
+
+        self.assertEqual(first, b"abc")
+        self.assertEqual(second, b"xyz")
+
+    def test_aliases_ordered(self) -> None:
+        async def scenario() -> tuple[list[bytes], set[str]]:
+            async with AsyncFileSystem() as fs:
+                await fs.create("/file1")
+                await fs.link("/file1", "/file2")
+                fd1 = await fs.open("/file1")
+                fd2 = await fs.open("file2")
+
+                results = await asyncio.gather(
+                    fs.write(fd1, 0, "abc"),
+                    fs.read(fd2, 0, 3),
+                    fs.write(fd1, 0, "xyz"),
+                    fs.read(fd2, 0, 3),
+                )
+                keys = fs._resolve_keys(["file1"], []) & fs._resolve_keys(
+                    ["/file2"], [fd2]
+                )
+
+                return results, keys
+
+        (_, first, _, second), keys = asyncio.run(scenario())
+
+        self.assertEqual(first, b"abc")
+        self.assertEqual(second, b"xyz")
+        self.assertTrue(keys)
+
+    def test_concurrent_requests(self) -> None:
+        async def scenario() -> list[list]:
+            async with AsyncFileSystem(max_workers=4) as fs:
+                await asyncio.gather(*(fs.create(f"/file{i}") for i in range(5)))
+
+                return await asyncio.gather(*(fs.ls() for _ in range(8)))
+
+        listings = asyncio.run(scenario())
+
+        for listing in listings:
+            names = {entry.name for entry in listing}
+            self.assertTrue({f"file{i}" for i in range(5)} <= names)
+
+    def test_cwd(self) -> None:
+        async def scenario() -> str:
+            async with AsyncFileSystem() as fs:
+                await fs.mkdir("/dir1")
+                await fs.cd("/dir1")
+
+                return await fs.cwd()
+
+        self.assertEqual(asyncio.run(scenario()), "/dir1")
+
+    def test_read_only_state_nested(self) -> None:
+        with read_only_state(), collect_stats() as stats:
+            with read_only_state():
+                SystemState().set_cwd("")
+
+            SystemState().set_cwd("")
+
+        with collect_stats() as outside_stats:
+            SystemState().set_cwd("")
+
+        self.assertEqual(stats.config_writes, 0)
+        self.assertEqual(outside_stats.config_writes, 1)
@@ -0,0 +1,52 @@
+import logging
+
+from fs.api.filesystem import FileSystem
+from fs.models.result import DirectoryEntry, StatResult
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSApi(FSBaseMountAndMkfsTestCase):
+    def test_structured_results(self) -> None:
+        fs = FileSystem()
+        fs.create("/file1")
+        fs.mkdir("/dir1")
+
+        fd = fs.open("/file1")
+        fs.write(fd, 0, b"content")
+
+        self.assertEqual(fs.read(fd, 0, 7), b"content")
+        self.assertEqual(fs.read(fd, 3, 4), b"tent")
+
+        entries = {entry.name: entry for entry in fs.ls()}
+
+        self.assertEqual(
+            entries["file1"],
+            DirectoryEntry(name="file1", n=1, type="file", refs_count=1, size=7),
+        )
+        self.assertEqual(entries["dir1"].type, "directory")
+
+        stat = fs.stat(1)
+
+        self.assertIsInstance(stat, StatResult)
+        self.assertEqual(stat.size, 7)
+        self.assertTrue(stat.opened)
+        self.assertIsNone(fs.stat(9))
+
+    def test_state_reused(self) -> None:
+        fs = FileSystem()
+        fs.create("/file1")
+
+        fs.ls()
+
+        self.assertEqual(fs.stats.config_reads, 0)
+
+    def test_logging_optional(self) -> None:
+        with self._caplog.at_level(logging.INFO):
+            FileSystem().create("/file1")
+
+        self.assertFalse(self._caplog.records)
+
+        with self._caplog.at_level(logging.INFO):
+            FileSystem(logger=logging.getLogger("fs")).create("/file2")
+
+        self.assertTrue(self._caplog.records)
@@ -53,11 +53,7 @@ class FSBaseMountAndMkfsTestCase(FSBaseTestCase):
         descriptor_id = command._system_state.get_descriptor_id(path)
         self.assertIsNotNone(descriptor_id)
 
-        descriptor_blocks = command._system_state.get_descriptor_blocks(descriptor_id)
-
-        descriptor = command._memory_proxy.get_descriptor(
-            descriptor_id, descriptor_blocks
-        )
+        descriptor = command.get_descriptor_by_id(descriptor_id)
         self.assertIsInstance(descriptor, descriptor_type)
 
         return descriptor
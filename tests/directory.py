@@ -0,0 +1,107 @@
+from constants import DIRECTORY_MAPPING_BYTES, FILENAME_MAXSIZE_BYTES
+from fs.api.filesystem import FileSystem
+from fs.commands.ls import LsCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.state import SystemState
+from fs.exceptions import FileNameTooLong
+from fs.models.block import LINK_SLOTS, Block
+from fs.models.descriptor.directory import DirectoryDescriptor
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSDirectory(FSBaseMountAndMkfsTestCase):
+    def _links(self, path: str) -> dict:
+        descriptor = LsCommand().get_directory_descriptor_by_path(path)
+
+        return descriptor.read_directory_links()
+
+    def _blocks(self, path: str) -> list[int]:
+        state = SystemState()
+
+        return state.get_descriptor_state(state.get_descriptor_id(path)).blocks
+
+    def test_links_packed_on_remove(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+
+        for i in range(8):
+            fs.create(f"/dir1/file{i}")
+
+        self.assertEqual(len(self._blocks("/dir1")), 2)
+
+        fs.unlink("/dir1/file1")
+
+        self.assertEqual(
+            list(self._links("/dir1")),
+            [".", "..", "file0", "file2", "file3", "file4", "file5", "file6", "file7"],
+        )
+
+        fs.create("/dir1/file8")
+
+        self.assertEqual(list(self._links("/dir1"))[-1], "file8")
+
+    def test_emptied_blocks_released(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+
+        for i in range(8):
+            fs.create(f"/dir1/file{i}")
+
+        released = self._blocks("/dir1")[-1]
+
+        for i in range(5):
+            fs.unlink(f"/dir1/file{i}")
+
+        self.assertEqual(len(self._blocks("/dir1")), 1)
+        self.assertNotIn(released, MemoryStorageProxy().get_used_blocks())
+        self.assertEqual(len(self._links("/dir1")), 5)
+
+        fs.rename("/dir1/file5", "/file5")
+        fs.rm("/dir1")
+        fs.mkdir("/dir2")
+
+        self.assertEqual(list(self._links("")), [".", "..", "file5", "dir2"])
+
+    def test_long_utf8_names(self) -> None:
+        fs = FileSystem()
+        name = "довга-назва-файлу.txt"
+        fs.mkdir("/dir1")
+        fs.create(f"/dir1/{name}")
+        fs.symlink("/dir1", "/dir1/link")
+
+        descriptor = LsCommand().get_directory_descriptor_by_path("/dir1")
+
+        self.assertEqual(fs.ls("/dir1", names_only=True), [".", "..", "link", name])
+        self.assertEqual(
+            descriptor.read_directory_types(),
+            {".": "directory", "..": "directory", name: "file", "link": "symlink"},
+        )
+
+        with self.assertRaises(FileNameTooLong):
+            fs.create("/dir1/" + "x" * (FILENAME_MAXSIZE_BYTES + 1))
+
+    def test_slot_directory_rewritten_as_records(self) -> None:
+        block = Block(n=1)
+        links = ((".", 1), ("..", 0), ("", 0), ("file1", 2))
+
+        # Fixed slots of an older volume, with a hole left by a removed link.
+        for step, (name, descriptor_id) in zip(LINK_SLOTS, links):
+            block.content[step : step + len(name)] = name.encode()
+            block.content[step + DIRECTORY_MAPPING_BYTES - 1] = descriptor_id
+
+        descriptor = DirectoryDescriptor(
+            n=1, refs_count=1, size=0, opened=False, blocks=[block]
+        )
+
+        self.assertEqual(
+            descriptor.read_directory_links(), {".": 1, "..": 0, "file1": 2}
+        )
+        self.assertIsNone(descriptor.read_directory_types()["file1"])
+
+        descriptor.write_link("file2", 3, "file")
+
+        self.assertEqual(
+            [(record.name, record.n) for record in block.records()],
+            [(".", 1), ("..", 0), ("file1", 2), ("file2", 3)],
+        )
+        self.assertEqual(descriptor.read_directory_types()["file2"], "file")
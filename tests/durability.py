@@ -0,0 +1,58 @@
+from unittest import mock
+
+from constants import (DURABILITY_BATCHED, DURABILITY_NONE, DURABILITY_STRICT,
+                       N_DESCRIPTORS)
+from fs.commands.create import CreateCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.umount import UmountCommand
+from fs.driver.durability import current_flusher
+from fs.driver.state import SystemState
+from tests.conftest import FSBaseTestCase
+
+
+class TestFSDurability(FSBaseTestCase):
+    def _mount(self, durability: str) -> None:
+        MountCommand(durability=durability).run()
+        MkfsCommand(n=N_DESCRIPTORS).run()
+
+    def tearDown(self) -> None:
+        UmountCommand().exec()
+
+    def test_mode_stored_at_mount(self) -> None:
+        self._mount(DURABILITY_STRICT)
+
+        self.assertEqual(SystemState().durability, DURABILITY_STRICT)
+
+    def test_none_never_syncs(self) -> None:
+        self._mount(DURABILITY_NONE)
+
+        with mock.patch("os.fsync") as fsync:
+            stats = CreateCommand(path="file1").run()
+
+        self.assertEqual(stats.fsyncs, 0)
+        fsync.assert_not_called()
+
+    def test_strict_syncs_every_command(self) -> None:
+        self._mount(DURABILITY_STRICT)
+
+        stats = CreateCommand(path="file1").run()
+
+        # The image and the config, once per command.
+        self.assertEqual(stats.fsyncs, 2)
+
+    def test_batched_syncs_in_background(self) -> None:
+        self._mount(DURABILITY_BATCHED)
+
+        flusher = current_flusher()
+        stats = CreateCommand(path="file1").run()
+
+        self.assertEqual(stats.fsyncs, 0)
+        self.assertTrue(flusher.running)
+
+        with mock.patch("os.fsync") as fsync:
+            UmountCommand().exec()
+            MountCommand().exec()
+
+        self.assertFalse(flusher.running)
+        self.assertTrue(fsync.called)
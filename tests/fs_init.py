@@ -27,3 +27,10 @@ class TestFSInitialization(FSBaseTestCase):
 
         with command._memory_proxy.memory as m:
             self.assertEqual(len(m.read()), BLOCK_SIZE_BYTES * N_BLOCKS_MAX)
+
+    def test_mkfs_writes_only_root(self) -> None:
+        MountCommand().exec()
+
+        stats = MkfsCommand(n=N_DESCRIPTORS).run()
+
+        self.assertEqual(stats.block_writes, 1)
@@ -0,0 +1,100 @@
+from constants import BLOCK_CONTENT_SIZE_BYTES, N_DESCRIPTORS
+from fs.commands.create import CreateCommand
+from fs.commands.fstat import FstatCommand
+from fs.commands.link import LinkCommand
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.open import OpenCommand
+from fs.commands.read import ReadCommand
+from fs.commands.symlink import SymlinkCommand
+from fs.commands.umount import UmountCommand
+from fs.commands.unlink import UnlinkCommand
+from fs.commands.write import WriteCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.state import SystemState
+from fs.driver.stats import collect_stats
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSInline(FSBaseMountAndMkfsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        UmountCommand().exec()
+        MountCommand(inline=True).exec()
+        MkfsCommand(n=N_DESCRIPTORS).exec()
+
+    def _write(self, path: str, content: str) -> str:
+        command = OpenCommand(path=path)
+        command.exec()
+
+        WriteCommand(fd=command.result, offset=0, content=content).exec()
+
+        return command.result
+
+    def _read(self, fd: str, size: int) -> bytes:
+        command = ReadCommand(fd=fd, offset=0, size=size)
+        command.exec()
+
+        return command.result
+
+    def test_tiny_file_uses_no_blocks(self) -> None:
+        used_blocks = MemoryStorageProxy().get_used_blocks()
+
+        CreateCommand(path="/file1").exec()
+        fd = self._write("/file1", "tiny")
+
+        command = FstatCommand(fid=1)
+        command.exec()
+
+        self.assertEqual(command.result.blocks, [])
+        self.assertEqual(command.result.size, 4)
+        self.assertEqual(MemoryStorageProxy().get_used_blocks(), used_blocks)
+        self.assertEqual(self._read(fd, 4), b"tiny")
+
+    def test_file_spills_when_grown(self) -> None:
+        content = "x" * BLOCK_CONTENT_SIZE_BYTES + "yz"
+
+        CreateCommand(path="/file1").exec()
+        self._write("/file1", "tiny")
+        fd = self._write("/file1", content)
+
+        command = FstatCommand(fid=1)
+        command.exec()
+
+        self.assertEqual(len(command.result.blocks), 2)
+        self.assertIsNone(SystemState().get_descriptor_state(1).inline)
+        self.assertEqual(self._read(fd, len(content)), content.encode())
+
+    def test_symlink_resolves_without_block_reads(self) -> None:
+        MkdirCommand(path="/dir1").exec()
+        SymlinkCommand(content="/dir1", path="/link1").exec()
+
+        command = CreateCommand(path="/link1/file1")
+        command.exec()
+
+        self.get_file_descriptor(command, "/dir1/file1")
+
+        symlink_id = SystemState().get_descriptor_id("/link1")
+
+        with collect_stats() as stats:
+            symlink = self.get_symlink_descriptor(LsCommand(), "/link1")
+
+        self.assertEqual(stats.block_reads, 0)
+        self.assertEqual(symlink.n, symlink_id)
+        self.assertEqual(symlink.read_content(symlink.size), "/dir1")
+
+    def test_link_counts_kept_inline(self) -> None:
+        CreateCommand(path="/file1").exec()
+        LinkCommand(path1="/file1", path2="/file2").exec()
+
+        self.assertEqual(SystemState().get_descriptor_state(1).ref_count, 2)
+
+        UnlinkCommand(path="/file2").exec()
+        self.assertTrue(SystemState().check_for_descriptor(1))
+
+        UnlinkCommand(path="/file1").exec()
+        self.assertFalse(SystemState().check_for_descriptor(1))
+        self.assertIsNone(SystemState().get_descriptor_state(1).inline)
@@ -0,0 +1,149 @@
+import json
+import os
+import pstats
+import tempfile
+import threading
+
+from fs.commands.create import CreateCommand
+from fs.commands.ls import LsCommand
+from fs.driver.stats import collect_stats, format_stats
+from fs.driver.trace import (OP_READ, OP_WRITE, TRACE_RECORDS, read_trace,
+                             traced)
+from fs.manager.profiler import profiled
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSInstrumentation(FSBaseMountAndMkfsTestCase):
+    def test_command_stats(self) -> None:
+        command = CreateCommand(path="file1")
+        stats = command.run()
+
+        self.assertIs(command.stats, stats)
+        self.assertGreater(stats.block_reads, 0)
+        self.assertGreater(stats.block_writes, 0)
+        self.assertGreater(stats.bytes_written, 0)
+        self.assertGreater(stats.memory_opens, 0)
+        self.assertGreater(stats.config_writes, 0)
+        self.assertGreater(stats.elapsed, 0)
+
+    def test_nested_stats_merged(self) -> None:
+        CreateCommand(path="file1").exec()
+
+        with collect_stats() as outer_stats:
+            inner_stats = LsCommand().run()
+
+        self.assertEqual(outer_stats.block_reads, inner_stats.block_reads)
+        self.assertEqual(outer_stats.config_writes, inner_stats.config_writes)
+
+    def test_stats_json_format(self) -> None:
+        stats = CreateCommand(path="file1").run()
+        output = json.loads(format_stats("create", stats, "json"))
+
+        self.assertEqual(output["command"], "create")
+        self.assertEqual(output["block_writes"], stats.block_writes)
+
+    def test_profile_pstats(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "create.pstats")
+
+            with profiled(output, "pstats"):
+                CreateCommand(path="file1").run()
+
+            functions = [
+                function_name
+                for _, _, function_name in pstats.Stats(output).stats.keys()
+            ]
+
+        self.assertIn("exec", functions)
+        self.assertIn("get_available_block_n", functions)
+
+    def test_profile_collapsed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "create.collapsed")
+
+            with profiled(output, "collapsed"):
+                CreateCommand(path="file1").run()
+
+            with open(output) as f:
+                lines = f.read().splitlines()
+
+        self.assertTrue(lines)
+
+        for line in lines:
+            stack, elapsed = line.rsplit(" ", maxsplit=1)
+            self.assertGreater(int(elapsed), 0)
+
+        self.assertTrue(
+            any(
+                "create.py:exec" in stack and "get_available_block_n" in stack
+                for stack in lines
+            )
+        )
+
+    def test_trace_records(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "fs.trace")
+
+            with traced(output):
+                CreateCommand(path="file1").run()
+
+            with traced(output):
+                stats = LsCommand().run()
+
+            records = list(read_trace(output))
+
+        create_records = [r for r in records if r.command == "create"]
+        ls_records = [r for r in records if r.command == "ls"]
+
+        self.assertEqual(len(create_records) + len(ls_records), len(records))
+        self.assertTrue(any(r.op == OP_WRITE for r in create_records))
+        self.assertTrue(all(r.op == OP_READ for r in ls_records))
+        self.assertEqual(len(ls_records), stats.block_reads)
+        self.assertEqual(sum(r.size for r in ls_records), stats.bytes_read)
+
+    def test_trace_large_writes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "fs.trace")
+
+            with traced(output) as tracer:
+                tracer.record(OP_WRITE, 1024, 1 << 20)
+
+            old_output = os.path.join(tmp, "old.trace")
+
+            with open(old_output, "wb") as f:
+                f.write(b"FSTRACE1")
+                f.write(TRACE_RECORDS[b"FSTRACE1"].pack(0.0, OP_READ, 3, 64, 0))
+
+            records = list(read_trace(output)) + list(read_trace(old_output))
+
+            with self.assertRaises(ValueError):
+                with traced(old_output):
+                    pass
+
+        self.assertEqual(
+            [(r.op, r.block_n, r.size) for r in records],
+            [(OP_WRITE, 1024, 1 << 20), (OP_READ, 3, 64)],
+        )
+
+    def test_trace_commands_per_thread(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "fs.trace")
+
+            with traced(output) as tracer:
+                tracer.set_command("write")
+                thread = threading.Thread(
+                    target=lambda: (
+                        tracer.set_command("read"),
+                        tracer.record(OP_READ, 2, 64),
+                    )
+                )
+                thread.start()
+                thread.join()
+                tracer.record(OP_WRITE, 1, 64)
+
+            records = list(read_trace(output))
+
+        self.assertEqual(
+            [(r.op, r.command) for r in records],
+            [(OP_READ, "read"), (OP_WRITE, "write")],
+        )
@@ -0,0 +1,105 @@
+from pathlib import Path
+from unittest import mock
+
+import fs.driver.journal
+from constants import (CONFIG_PATH, JOURNAL_GROUP_COMMIT_SIZE, JOURNAL_PATH,
+                       MEMORY_PATH, N_DESCRIPTORS)
+from fs.commands.create import CreateCommand
+from fs.commands.link import LinkCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.umount import UmountCommand
+from fs.driver.journal import current_journal
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSJournal(FSBaseMountAndMkfsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        UmountCommand().exec()
+        MountCommand(journal=True).run()
+        MkfsCommand(n=N_DESCRIPTORS).run()
+
+    def tearDown(self) -> None:
+        UmountCommand().exec()
+
+    def _reopen(self) -> None:
+        current_journal().flush()
+        fs.driver.journal._journal = None
+
+    def test_changes_kept_in_journal(self) -> None:
+        image = Path(MEMORY_PATH).read_bytes()
+        config = Path(CONFIG_PATH).read_text()
+
+        command = CreateCommand(path="file1")
+        command.run()
+
+        self.get_file_descriptor(command, "/file1")
+        self.assertEqual(Path(MEMORY_PATH).read_bytes(), image)
+        self.assertEqual(Path(CONFIG_PATH).read_text(), config)
+
+    def test_replay(self) -> None:
+        CreateCommand(path="file1").run()
+        LinkCommand(path1="file1", path2="file2").run()
+
+        self._reopen()
+
+        command = CreateCommand(path="file3")
+        command.run()
+
+        for path in ("file1", "file2", "file3"):
+            self.get_file_descriptor(command, f"/{path}")
+
+    def test_checkpoint(self) -> None:
+        CreateCommand(path="file1").run()
+        current_journal().checkpoint()
+
+        self.assertEqual(Path(JOURNAL_PATH).stat().st_size, 0)
+
+        self._reopen()
+
+        command = CreateCommand(path="file2")
+        command.run()
+
+        self.get_file_descriptor(command, "/file1")
+
+    def test_group_commit(self) -> None:
+        current_journal().flush()
+
+        with mock.patch("os.fsync") as fsync:
+            for i in range(JOURNAL_GROUP_COMMIT_SIZE):
+                CreateCommand(path=f"file{i}").run()
+
+        self.assertEqual(fsync.call_count, 1)
+
+    def test_failed_command_not_committed(self) -> None:
+        journal = current_journal()
+        n_pending = len(journal._pending)
+        state = journal.read_state()
+
+        command = CreateCommand(path="file1")
+
+        with mock.patch.object(
+            command._system_state, "write", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                command.run()
+
+        self.assertEqual(len(journal._pending), n_pending)
+        self.assertEqual(journal.read_state(), state)
+
+    def test_torn_tail_ignored(self) -> None:
+        CreateCommand(path="file1").run()
+        self._reopen()
+
+        size = Path(JOURNAL_PATH).stat().st_size
+
+        with open(JOURNAL_PATH, "ab") as f:
+            f.write(b"FSJR\xff\xff")
+
+        command = CreateCommand(path="file2")
+        command.run()
+
+        self.get_file_descriptor(command, "/file1")
+        self.assertEqual(Path(JOURNAL_PATH).stat().st_size, size)
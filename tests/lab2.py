@@ -10,6 +10,7 @@ from fs.commands.open import OpenCommand
 from fs.commands.truncate import TruncateCommand
 from fs.commands.unlink import UnlinkCommand
 from fs.commands.write import WriteCommand
+from fs.driver.reclaim import current_reclaimer
 from fs.driver.utils import form_header_from_bytes
 from tests.conftest import LOREM_IPSUM, FSBaseMountAndMkfsTestCase
 
@@ -114,6 +115,7 @@ class TestFSLab2(FSBaseMountAndMkfsTestCase):
         )
 
         command.exec()
+        current_reclaimer().drain()
 
         file = command._memory_proxy.get_descriptor(
             file_descriptor, file_descriptor_blocks
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from constants import BLOCK_CONTENT_SIZE_BYTES
+from fs.commands.create import CreateCommand
+from fs.commands.link import LinkCommand
+from fs.commands.open import OpenCommand
+from fs.commands.unlink import UnlinkCommand
+from fs.commands.write import WriteCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.reclaim import current_reclaimer
+from fs.driver.state import SystemState
+from fs.exceptions import OutOfBlocks
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSLinks(FSBaseMountAndMkfsTestCase):
+    def _create(self, path: str, n_blocks: int) -> list[int]:
+        CreateCommand(path=path).exec()
+
+        command = OpenCommand(path=path)
+        command.exec()
+        WriteCommand(
+            fd=command.result,
+            offset=0,
+            content="x" * (BLOCK_CONTENT_SIZE_BYTES * (n_blocks - 1) + 1),
+        ).exec()
+
+        system_state = SystemState()
+
+        return system_state.get_descriptor_blocks(system_state.get_descriptor_id(path))
+
+    def test_link_and_unlink_write_no_blocks(self) -> None:
+        blocks = self._create("/file1", 3)
+        self.assertEqual(len(blocks), 3)
+
+        link_stats = LinkCommand(path1="/file1", path2="/file2").run()
+        unlink_stats = UnlinkCommand(path="/file2").run()
+
+        self.assertEqual(link_stats.block_writes, 0)
+        self.assertEqual(unlink_stats.block_writes, 0)
+
+        descriptor = self.get_file_descriptor(OpenCommand(), "/file1")
+        self.assertEqual(descriptor.refs_count, 1)
+        self.assertEqual(SystemState().get_descriptor_state(descriptor.n).ref_count, 1)
+
+    def test_freed_blocks_are_reclaimed_in_batches(self) -> None:
+        blocks1 = self._create("/file1", 2)
+        blocks2 = self._create("/file2", 2)
+
+        with mock.patch("fs.driver.reclaim.RECLAIM_BATCH_BLOCKS", 4):
+            UnlinkCommand(path="/file1").exec()
+
+            self.assertEqual(current_reclaimer().pending, blocks1)
+            self.assertTrue(set(blocks1) <= set(MemoryStorageProxy().get_used_blocks()))
+
+            UnlinkCommand(path="/file2").exec()
+
+        self.assertEqual(current_reclaimer().pending, [])
+        self.assertFalse(
+            set(blocks1 + blocks2) & set(MemoryStorageProxy().get_used_blocks())
+        )
+
+    def test_allocation_reclaims_queued_blocks(self) -> None:
+        blocks = self._create("/file1", 2)
+        UnlinkCommand(path="/file1").exec()
+
+        memory_proxy = MemoryStorageProxy()
+        allocated = []
+
+        with self.assertRaises(OutOfBlocks):
+            while True:
+                allocated.append(memory_proxy.get_available_block_n())
+
+        self.assertEqual(current_reclaimer().pending, [])
+        self.assertTrue(set(blocks) <= set(allocated))
+
+    def test_one_shot_command_reclaims_blocks(self) -> None:
+        blocks = self._create("/file1", 2)
+
+        with mock.patch.object(current_reclaimer(), "per_command", True):
+            stats = UnlinkCommand(path="/file1").run()
+
+        self.assertEqual(current_reclaimer().pending, [])
+        self.assertFalse(set(blocks) & set(MemoryStorageProxy().get_used_blocks()))
+        self.assertGreater(stats.block_writes + stats.holes_punched, 0)
@@ -0,0 +1,77 @@
+import json
+import logging
+
+from fs.api.filesystem import FileSystem
+from fs.commands.ls import LsCommand
+from fs.driver.stats import collect_stats
+from fs.exceptions import DirectoryNotExists
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSLs(FSBaseMountAndMkfsTestCase):
+    def _make_directory(self, fs: FileSystem) -> None:
+        fs.mkdir("/dir1")
+
+        for name in ("file2", "file1", "file3"):
+            fs.create(f"/dir1/{name}")
+
+        fs.link("/dir1/file1", "/dir1/link1")
+
+    def test_jsonl_streams_every_entry(self) -> None:
+        self._make_directory(FileSystem())
+
+        command = LsCommand(path="/dir1", output="jsonl")
+
+        with self._caplog.at_level(logging.INFO):
+            command.exec()
+
+        rows = [json.loads(record.msg) for record in self._caplog.records]
+
+        self.assertEqual(
+            [row["name"] for row in rows],
+            [".", "..", "file1", "file2", "file3", "link1"],
+        )
+        self.assertEqual(rows[1]["descriptor"], 0)
+        self.assertEqual(rows[2]["refs_count"], 2)
+        self.assertEqual(rows[2]["descriptor"], rows[5]["descriptor"])
+        self.assertEqual(command.result, "link1")
+
+    def test_tsv_pages(self) -> None:
+        self._make_directory(FileSystem())
+
+        pages, after = [], None
+
+        while True:
+            command = LsCommand(path="/dir1", output="tsv", limit=4, after=after)
+
+            with self._caplog.at_level(logging.INFO):
+                command.exec()
+
+            page = [record.msg.split("\t")[0] for record in self._caplog.records]
+            self._caplog.clear()
+
+            if not page:
+                break
+
+            pages.append(page)
+            after = command.result
+
+        self.assertEqual(pages, [[".", "..", "file1", "file2"], ["file3", "link1"]])
+
+    def test_names_only_reads_no_blocks(self) -> None:
+        fs = FileSystem()
+        self._make_directory(fs)
+
+        with collect_stats() as stats:
+            names = fs.ls("/dir1", names_only=True, after="file1")
+
+        self.assertEqual(stats.block_reads, 0)
+        self.assertEqual(stats.config_writes, 0)
+        self.assertEqual(names, ["file2", "file3", "link1"])
+
+    def test_ls_not_directory(self) -> None:
+        fs = FileSystem()
+        self._make_directory(fs)
+
+        with self.assertRaises(DirectoryNotExists):
+            fs.ls("/dir1/file1")
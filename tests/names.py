@@ -0,0 +1,95 @@
+import json
+
+from constants import CONFIG_PATH
+from fs.api.filesystem import FileSystem
+from fs.commands.find import FindCommand
+from fs.driver.names import build_name_index, find_glob, find_prefix
+from fs.driver.state import SystemState
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSNames(FSBaseMountAndMkfsTestCase):
+    def _make_tree(self, fs: FileSystem) -> None:
+        fs.mkdir("/dir1")
+        fs.mkdir("/dir1/sub")
+        fs.create("/dir1/sub/file1")
+        fs.create("/file2")
+        fs.link("/file2", "/dir1/file3")
+        fs.symlink("/dir1", "/filelink")
+
+    def _assert_index_in_sync(self) -> None:
+        state = SystemState().view
+
+        self.assertEqual(state.name_index, build_name_index(state.namespace))
+
+    def test_index_maintained(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+        self._assert_index_in_sync()
+
+        fs.rename("/dir1", "/dir2")
+        fs.unlink("/file2")
+        fs.rm("/dir2/sub")
+        fs.mkdir("/dir3")
+        fs.rmdir("/dir3")
+
+        self._assert_index_in_sync()
+        self.assertEqual(
+            [entry[0] for entry in SystemState().view.name_index],
+            ["dir2", "file3", "filelink"],
+        )
+
+    def test_find_names(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+        state = SystemState()
+
+        self.assertEqual(
+            state.find_names("file*"),
+            [
+                ("/dir1/file3", 4),
+                ("/dir1/sub/file1", 3),
+                ("/file2", 4),
+                ("/filelink", 5),
+            ],
+        )
+        self.assertEqual(state.find_names("sub"), [("/dir1/sub", 2)])
+        self.assertEqual(state.find_names("*1"), [("/dir1", 1), ("/dir1/sub/file1", 3)])
+        self.assertEqual(state.find_names("missing"), [])
+
+    def test_index_queries(self) -> None:
+        index = build_name_index({0: {"ab": 1, "abc": 2, "b": 3}, 1: {"ab": 4}})
+
+        self.assertEqual(
+            [entry[0] for entry in find_prefix(index, "ab")], ["ab", "ab", "abc"]
+        )
+        self.assertEqual([entry[2] for entry in find_glob(index, "ab")], [1, 4])
+        self.assertEqual([entry[2] for entry in find_glob(index, "?b*")], [1, 4, 2])
+
+    def test_find_uses_index(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+
+        command = FindCommand(path="/dir1", name="file*")
+        command.exec()
+
+        self.assertEqual(
+            [entry.name for entry in command.result],
+            ["/dir1/file3", "/dir1/sub/file1"],
+        )
+        self.assertEqual(command.result[0].refs_count, 2)
+
+    def test_index_rebuilt_for_old_config(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+
+        with open(CONFIG_PATH) as f:
+            raw_config = json.load(f)
+
+        del raw_config["name_index"]
+
+        with open(CONFIG_PATH, "w") as f:
+            json.dump(raw_config, f)
+
+        self._assert_index_in_sync()
+        self.assertEqual(SystemState().find_names("sub"), [("/dir1/sub", 2)])
@@ -0,0 +1,102 @@
+from typing import Optional
+
+from fs.commands.cd import CdCommand
+from fs.commands.create import CreateCommand
+from fs.commands.cwd import CwdCommand
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.open import OpenCommand
+from fs.commands.read import ReadCommand
+from fs.commands.rename import RenameCommand
+from fs.commands.write import WriteCommand
+from fs.driver.state import SystemState
+from fs.exceptions import FileAlreadyExists, FileNotExists, RenameDenied
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSRename(FSBaseMountAndMkfsTestCase):
+    def _ls(self, path: Optional[str] = None) -> dict[str, int]:
+        command = LsCommand(path=path)
+        command.exec()
+
+        return {entry.name: entry.n for entry in command.result}
+
+    def test_rename_file(self) -> None:
+        CreateCommand(path="/file1").exec()
+
+        command = OpenCommand(path="/file1")
+        command.exec()
+        WriteCommand(fd=command.result, offset=0, content="data").exec()
+
+        RenameCommand(path1="/file1", path2="/file2").exec()
+
+        self.assertFalse(SystemState().check_path_exists("/file1"))
+        self.assertIn("file2", self._ls())
+        self.assertNotIn("file1", self._ls())
+
+        descriptor = self.get_file_descriptor(LsCommand(), "/file2")
+        self.assertEqual(descriptor.read_content(4), "data")
+
+    def test_move_directory(self) -> None:
+        MkdirCommand(path="/dir1").exec()
+        MkdirCommand(path="/dir1/sub").exec()
+        CreateCommand(path="/dir1/sub/file1").exec()
+        MkdirCommand(path="/dir2").exec()
+
+        RenameCommand(path1="/dir1", path2="/dir2/moved").exec()
+
+        self.get_file_descriptor(LsCommand(), "/dir2/moved/sub/file1")
+        self.assertFalse(SystemState().check_path_exists("/dir1"))
+        self.assertFalse(SystemState().check_path_exists("/dir1/sub/file1"))
+
+        dir2_id = SystemState().get_descriptor_id("/dir2")
+        self.assertEqual(self._ls("/dir2/moved")[".."], dir2_id)
+
+    def test_move_cost_independent_of_subtree(self) -> None:
+        for name in ("small", "big", "dst1", "dst2"):
+            MkdirCommand(path=f"/{name}").exec()
+
+        MkdirCommand(path="/big/sub").exec()
+
+        for i in range(4):
+            CreateCommand(path=f"/big/sub/file{i}").exec()
+
+        small_stats = RenameCommand(path1="/small", path2="/dst1/small").run()
+        big_stats = RenameCommand(path1="/big", path2="/dst2/big").run()
+
+        self.assertEqual(big_stats.block_writes, small_stats.block_writes)
+        self.assertEqual(big_stats.config_writes, small_stats.config_writes)
+
+    def test_opened_fd_and_cwd_follow(self) -> None:
+        MkdirCommand(path="/dir1").exec()
+        CreateCommand(path="/dir1/file1").exec()
+
+        command = OpenCommand(path="/dir1/file1")
+        command.exec()
+        fd = command.result
+
+        CdCommand(path="/dir1").exec()
+        RenameCommand(path1="/dir1", path2="/dir2").exec()
+
+        WriteCommand(fd=fd, offset=0, content="data").exec()
+
+        command = ReadCommand(fd=fd, offset=0, size=4)
+        command.exec()
+        self.assertEqual(command.result, b"data")
+
+        command = CwdCommand()
+        command.exec()
+        self.assertEqual(command.result, "/dir2")
+
+    def test_rename_denied(self) -> None:
+        MkdirCommand(path="/dir1").exec()
+        CreateCommand(path="/file1").exec()
+
+        with self.assertRaises(RenameDenied):
+            RenameCommand(path1="/dir1", path2="/dir1/inner").exec()
+
+        with self.assertRaises(FileAlreadyExists):
+            RenameCommand(path1="/file1", path2="/dir1").exec()
+
+        with self.assertRaises(FileNotExists):
+            RenameCommand(path1="/missing", path2="/file2").exec()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+from fs.api.filesystem import FileSystem
+from fs.commands.stat import StatCommand
+from fs.driver.stats import collect_stats
+from fs.driver.trace import read_trace, traced
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSStat(FSBaseMountAndMkfsTestCase):
+    def _make_objects(self, fs: FileSystem) -> None:
+        fs.mkdir("/dir1")
+        fs.create("/dir1/file1")
+        fs.create("/file2")
+        fs.symlink("/dir1", "/link1")
+
+        fd = fs.open("/dir1/file1")
+        fs.write(fd, 0, b"content")
+
+    def test_matches_fstat(self) -> None:
+        fs = FileSystem()
+        self._make_objects(fs)
+
+        results = fs.stat_many(paths=["/dir1/file1", "/link1/file1", "/file2"])
+
+        self.assertEqual(results[0], fs.stat(2))
+        self.assertEqual(results[1], fs.stat(2))
+        self.assertEqual(results[2], fs.stat(3))
+        self.assertTrue(results[0].opened)
+        self.assertEqual(results[0].size, 7)
+        self.assertEqual(fs.stat_many(ids=[0, 1]), [fs.stat(0), fs.stat(1)])
+
+    def test_missing_objects(self) -> None:
+        fs = FileSystem()
+        self._make_objects(fs)
+
+        results = fs.stat_many(paths=["/missing", "/file2"], ids=[9, 1000])
+
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1].n, 3)
+        self.assertEqual(results[2:], [None, None])
+
+    def test_headers_read_in_block_order(self) -> None:
+        fs = FileSystem()
+        self._make_objects(fs)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "fs.trace")
+
+            with traced(output), collect_stats() as stats:
+                StatCommand(paths=["/file2", "/dir1/file1", "/dir1"], ids=[0]).run()
+
+            records = list(read_trace(output))
+
+        blocks = [record.block_n for record in records]
+
+        self.assertEqual(stats.memory_opens, 1)
+        self.assertEqual(stats.config_reads, 1)
+        self.assertEqual(stats.config_writes, 0)
+        self.assertEqual(len(blocks), 4)
+        self.assertEqual(blocks, sorted(blocks))
@@ -0,0 +1,202 @@
+from fs.commands.cp import CpCommand
+from fs.commands.create import CreateCommand
+from fs.commands.du import DuCommand
+from fs.commands.find import FindCommand
+from fs.commands.link import LinkCommand
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.open import OpenCommand
+from fs.commands.read import ReadCommand
+from fs.commands.rm import RmCommand
+from fs.commands.symlink import SymlinkCommand
+from fs.commands.write import WriteCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.state import SystemState
+from fs.exceptions import (CopyDenied, FileNotExists, OutOfDescriptors,
+                           RemoveDenied)
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSTree(FSBaseMountAndMkfsTestCase):
+    def _write(self, path: str, content: str) -> None:
+        command = OpenCommand(path=path)
+        command.exec()
+
+        WriteCommand(fd=command.result, offset=0, content=content).exec()
+
+    def _read(self, path: str, size: int) -> bytes:
+        command = OpenCommand(path=path)
+        command.exec()
+
+        command = ReadCommand(fd=command.result, offset=0, size=size)
+        command.exec()
+
+        return command.result
+
+    def _make_tree(self, root: str, n_files: int = 2) -> None:
+        MkdirCommand(path=root).exec()
+        MkdirCommand(path=f"{root}/sub").exec()
+
+        for i in range(n_files):
+            CreateCommand(path=f"{root}/sub/file{i}").exec()
+            self._write(f"{root}/sub/file{i}", f"data{i}")
+
+    def test_rm_removes_tree(self) -> None:
+        used_blocks = MemoryStorageProxy().get_used_blocks()
+
+        self._make_tree("/dir1")
+
+        command = RmCommand(path="/dir1")
+        command.exec()
+
+        self.assertEqual(command.result, 4)
+        self.assertFalse(SystemState().check_path_exists("/dir1"))
+        self.assertEqual(MemoryStorageProxy().get_used_blocks(), used_blocks)
+
+        for descriptor_id in range(1, 5):
+            self.assertFalse(SystemState().check_for_descriptor(descriptor_id))
+
+        command = LsCommand()
+        command.exec()
+        self.assertNotIn("dir1", [entry.name for entry in command.result])
+
+    def test_rm_keeps_files_linked_outside(self) -> None:
+        self._make_tree("/dir1")
+        LinkCommand(path1="/dir1/sub/file0", path2="/file2").exec()
+
+        RmCommand(path="/dir1").exec()
+
+        self.assertEqual(self._read("/file2", 5), b"data0")
+        self.assertEqual(self.get_file_descriptor(LsCommand(), "/file2").refs_count, 1)
+
+    def test_rm_state_writes_independent_of_tree(self) -> None:
+        self._make_tree("/small", n_files=1)
+        self._make_tree("/big", n_files=4)
+
+        small_stats = RmCommand(path="/small").run()
+        big_stats = RmCommand(path="/big").run()
+
+        self.assertEqual(big_stats.config_writes, small_stats.config_writes)
+        self.assertEqual(big_stats.config_writes, 1)
+
+    def test_rm_denied(self) -> None:
+        with self.assertRaises(RemoveDenied):
+            RmCommand(path=".").exec()
+
+        with self.assertRaises(FileNotExists):
+            RmCommand(path="/missing").exec()
+
+    def test_cp_copies_tree(self) -> None:
+        self._make_tree("/dir1", n_files=1)
+        SymlinkCommand(content="/dir1/sub", path="/dir1/link1").exec()
+        MkdirCommand(path="/dir2").exec()
+
+        command = CpCommand(path1="/dir1", path2="/dir2/copy")
+        command.exec()
+
+        self.assertEqual(command.result, 4)
+        self.assertEqual(self._read("/dir2/copy/sub/file0", 5), b"data0")
+
+        symlink = self.get_symlink_descriptor(LsCommand(), "/dir2/copy/link1")
+        self.assertEqual(symlink.read_content(symlink.size), "/dir1/sub")
+
+        self._write("/dir2/copy/sub/file0", "other")
+        self.assertEqual(self._read("/dir1/sub/file0", 5), b"data0")
+
+        command = LsCommand(path="/dir2/copy")
+        command.exec()
+        links = {entry.name: entry.n for entry in command.result}
+        self.assertEqual(links[".."], SystemState().get_descriptor_id("/dir2"))
+
+    def test_cp_denied(self) -> None:
+        self._make_tree("/dir1")
+
+        with self.assertRaises(CopyDenied):
+            CpCommand(path1="/dir1", path2="/dir1/sub/copy").exec()
+
+    def test_cp_failed_partway(self) -> None:
+        self._make_tree("/dir1")
+        CpCommand(path1="/dir1", path2="/copy1").exec()
+        used_blocks = MemoryStorageProxy().get_used_blocks()
+
+        # Descriptors run out after the copy of "/dir1" itself.
+        with self.assertRaises(OutOfDescriptors):
+            CpCommand(path1="/dir1", path2="/copy2").exec()
+
+        self.assertFalse(SystemState().check_path_exists("/copy2"))
+        self.assertEqual(MemoryStorageProxy().get_used_blocks(), used_blocks)
+
+        RmCommand(path="/copy1").exec()
+        CpCommand(path1="/dir1", path2="/copy2").exec()
+
+        self.assertEqual(self._read("/copy2/sub/file1", 5), b"data1")
+
+    def test_du_totals(self) -> None:
+        self._make_tree("/dir1")
+        LinkCommand(path1="/dir1/sub/file0", path2="/dir1/zlink").exec()
+
+        command = DuCommand(path="/dir1")
+        command.exec()
+        usage = {entry.path: entry for entry in command.result}
+
+        self.assertEqual(list(usage), ["/dir1/sub", "/dir1"])
+
+        sub = self.get_directory_descriptor(command, "/dir1/sub")
+        dir1 = self.get_directory_descriptor(command, "/dir1")
+
+        self.assertEqual(usage["/dir1/sub"].size, sub.size + 10)
+        self.assertEqual(usage["/dir1/sub"].inodes, 3)
+        self.assertEqual(usage["/dir1"].size, dir1.size + sub.size + 10)
+        self.assertEqual(usage["/dir1"].blocks, 4)
+        self.assertEqual(usage["/dir1"].inodes, 4)
+
+    def test_du_root(self) -> None:
+        self._make_tree("/dir1")
+
+        command = DuCommand(path="/")
+        command.exec()
+
+        self.assertEqual(
+            [entry.path for entry in command.result], ["/dir1/sub", "/dir1", "/"]
+        )
+        self.assertEqual(command.result[-1].inodes, 5)
+
+    def test_find_root(self) -> None:
+        self._make_tree("/dir1", n_files=1)
+
+        for path in ("/", ""):
+            command = FindCommand(path=path)
+            command.exec()
+
+            self.assertEqual(
+                [entry.name for entry in command.result],
+                ["/", "/dir1", "/dir1/sub", "/dir1/sub/file0"],
+            )
+
+        command = FindCommand(path="/", name="file*")
+        command.exec()
+        self.assertEqual([entry.name for entry in command.result], ["/dir1/sub/file0"])
+
+    def test_find_filters(self) -> None:
+        self._make_tree("/dir1")
+        SymlinkCommand(content="/dir1", path="/dir1/sub/link1").exec()
+
+        command = FindCommand(path="/dir1")
+        command.exec()
+        self.assertEqual(
+            [entry.name for entry in command.result],
+            [
+                "/dir1",
+                "/dir1/sub",
+                "/dir1/sub/file0",
+                "/dir1/sub/file1",
+                "/dir1/sub/link1",
+            ],
+        )
+
+        command = FindCommand(name="file*", type="file")
+        command.exec()
+        self.assertEqual(
+            [entry.name for entry in command.result],
+            ["/dir1/sub/file0", "/dir1/sub/file1"],
+        )
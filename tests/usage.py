@@ -0,0 +1,125 @@
+from fs.api.filesystem import FileSystem
+from fs.commands.du import DuCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.stats import collect_stats
+from fs.exceptions import QuotaExceeded
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSUsage(FSBaseMountAndMkfsTestCase):
+    def _assert_kept_matches_walked(self, path: str = "") -> None:
+        kept = DuCommand().kept_usage(path)
+        walked = DuCommand().walked_usage(path)
+
+        self.assertIsNotNone(kept)
+        self.assertEqual(
+            sorted(kept, key=lambda entry: entry.path),
+            sorted(walked, key=lambda entry: entry.path),
+        )
+
+    def test_totals_kept_on_changes(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+        fs.mkdir("/dir1/sub")
+        fs.create("/dir1/sub/file1")
+        self._assert_kept_matches_walked()
+
+        fd = fs.open("/dir1/sub/file1")
+        fs.write(fd, 0, b"x" * 100)
+        fs.close(fd)
+        self._assert_kept_matches_walked()
+
+        fs.truncate("/dir1/sub/file1", 10)
+        fs.link("/dir1/sub/file1", "/file2")
+        self._assert_kept_matches_walked()
+
+        fs.unlink("/dir1/sub/file1")
+        fs.rename("/dir1/sub", "/sub")
+        fs.cp("/sub", "/dir1/copy")
+        self._assert_kept_matches_walked()
+
+        fs.rm("/sub")
+        fs.unlink("/file2")
+        self._assert_kept_matches_walked()
+
+        self.assertEqual(fs.du("/dir1/copy")[0].inodes, 1)
+
+    def test_totals_read_without_blocks(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+        fs.create("/dir1/file1")
+
+        with collect_stats() as stats:
+            entry = fs.quota("/dir1")
+
+        self.assertEqual(stats.memory_opens, 0)
+        self.assertEqual(entry.inodes, 2)
+        self.assertIsNone(entry.max_inodes)
+
+    def test_quota_enforced(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+        fs.create("/dir1/file1")
+        fs.create("/file2")
+
+        # Size of the directory itself is counted too.
+        size = fs.quota("/dir1").size + 50
+        entry = fs.quota("/dir1", inodes=2, size=size)
+
+        self.assertEqual((entry.max_inodes, entry.max_size), (2, size))
+
+        with self.assertRaises(QuotaExceeded):
+            fs.create("/dir1/file3")
+
+        with self.assertRaises(QuotaExceeded):
+            fs.rename("/file2", "/dir1/file2")
+
+        fd = fs.open("/dir1/file1")
+
+        with self.assertRaises(QuotaExceeded):
+            fs.write(fd, 0, b"x" * 51)
+
+        fs.write(fd, 0, b"x" * 50)
+
+        self.assertEqual(fs.ls("/dir1", names_only=True), [".", "..", "file1"])
+        self.assertEqual(fs.quota("/dir1").size, size)
+        self._assert_kept_matches_walked()
+
+    def test_quota_cleared(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+        fs.quota("/dir1", inodes=1)
+
+        with self.assertRaises(QuotaExceeded):
+            fs.create("/dir1/file1")
+
+        entry = fs.quota("/dir1", clear=True)
+        fs.create("/dir1/file1")
+
+        self.assertIsNone(entry.max_inodes)
+        self.assertEqual(fs.quota("/dir1").inodes, 2)
+
+    def test_rejected_changes_free_blocks(self) -> None:
+        fs = FileSystem()
+        fs.mkdir("/dir1")
+        fs.create("/dir1/file1")
+        fs.quota("/dir1", blocks=4)
+        used_blocks = MemoryStorageProxy().get_used_blocks()
+
+        fd = fs.open("/dir1/file1")
+
+        for _ in range(3):
+            with self.assertRaises(QuotaExceeded):
+                fs.write(fd, 0, b"x" * 300)
+
+        self.assertEqual(MemoryStorageProxy().get_used_blocks(), used_blocks)
+
+        fs.quota("/dir1", blocks=fs.quota("/dir1").blocks)
+
+        for i in range(3):
+            with self.assertRaises(QuotaExceeded):
+                fs.create(f"/dir1/file{i + 2}")
+
+        self.assertEqual(MemoryStorageProxy().get_used_blocks(), used_blocks)
+        self._assert_kept_matches_walked()
+
@@ -0,0 +1,366 @@
+import os
+import tempfile
+from unittest import mock
+
+from constants import (ALLOCATION_BEST_FIT, ALLOCATION_FIRST_FIT,
+                       ALLOCATION_GROUP_BLOCKS, ALLOCATION_LOCALITY,
+                       ALLOCATION_NEXT_FIT, BLOCK_CONTENT_SIZE_BYTES,
+                       BLOCK_SIZE_BYTES, MEMORY_PATH, N_BLOCKS_MAX,
+                       N_DESCRIPTORS)
+from fs.commands.create import CreateCommand
+from fs.commands.defrag import DefragCommand, count_fragments
+from fs.commands.frag import FragCommand, extents_histogram
+from fs.commands.ls import LsCommand
+from fs.commands.mkdir import MkdirCommand
+from fs.commands.mkfs import MkfsCommand
+from fs.commands.mount import MountCommand
+from fs.commands.open import OpenCommand
+from fs.commands.resize import ResizeCommand
+from fs.commands.truncate import TruncateCommand
+from fs.commands.umount import UmountCommand
+from fs.commands.unlink import UnlinkCommand
+from fs.commands.write import WriteCommand
+from fs.driver.memory import MemoryStorageProxy
+from fs.driver.reclaim import current_reclaimer
+from fs.driver.sparse import coalesce_blocks, punch_hole
+from fs.driver.state import SystemState
+from fs.exceptions import OutOfBlocks, OutOfDescriptors, ResizeDenied
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+def punch_supported() -> bool:
+    with tempfile.TemporaryFile() as f:
+        f.write(bytes(BLOCK_SIZE_BYTES))
+
+        return punch_hole(f, 0, BLOCK_SIZE_BYTES)
+
+
+class TestFSVolume(FSBaseMountAndMkfsTestCase):
+    def _fill_blocks(self) -> None:
+        memory_proxy = MemoryStorageProxy()
+
+        with self.assertRaises(OutOfBlocks):
+            while True:
+                memory_proxy.get_available_block_n()
+
+    def test_resize_grows_blocks(self) -> None:
+        self._fill_blocks()
+
+        command = ResizeCommand(blocks=N_BLOCKS_MAX + 10)
+        command.exec()
+
+        self.assertEqual(command._memory_proxy.get_n_blocks(), N_BLOCKS_MAX + 10)
+        self.assertEqual(command._memory_proxy.get_available_block_n(), N_BLOCKS_MAX)
+
+    def test_resize_keeps_data(self) -> None:
+        MkdirCommand(path="/dir1").exec()
+        CreateCommand(path="/dir1/file1").exec()
+
+        command = ResizeCommand(blocks=N_BLOCKS_MAX * 2)
+        stats = command.run()
+
+        self.assertEqual(stats.block_writes, 0)
+        self.get_directory_descriptor(command, "/dir1")
+        self.get_file_descriptor(command, "/dir1/file1")
+
+    def test_resize_grows_descriptors(self) -> None:
+        for i in range(N_DESCRIPTORS - 1):
+            CreateCommand(path=f"/file{i}").exec()
+
+        with self.assertRaises(OutOfDescriptors):
+            CreateCommand(path="/extra").exec()
+
+        ResizeCommand(blocks=N_BLOCKS_MAX, descriptors=N_DESCRIPTORS + 5).exec()
+
+        command = CreateCommand(path="/extra")
+        command.exec()
+
+        self.get_file_descriptor(command, "/extra")
+        self.assertEqual(SystemState().get_n_descriptors(), N_DESCRIPTORS + 5)
+
+    def test_resize_shrink_denied(self) -> None:
+        with self.assertRaises(ResizeDenied):
+            ResizeCommand(blocks=N_BLOCKS_MAX - 1).exec()
+
+        with self.assertRaises(ResizeDenied):
+            ResizeCommand(blocks=N_BLOCKS_MAX, descriptors=1).exec()
+
+    def _make_fragmented(self) -> None:
+        for i in range(3):
+            CreateCommand(path=f"/file{i}").exec()
+
+        # Second blocks of files land after all first blocks.
+        for i in range(3):
+            command = OpenCommand(path=f"/file{i}")
+            command.exec()
+
+            WriteCommand(
+                fd=command.result,
+                offset=0,
+                content="x" * (BLOCK_CONTENT_SIZE_BYTES + 1),
+            ).exec()
+
+        UnlinkCommand(path="/file1").exec()
+
+        blocks_map = SystemState().get_blocks_map()
+        self.assertTrue(any(count_fragments(b) > 1 for b in blocks_map.values()))
+
+    def test_defrag_contiguous(self) -> None:
+        self._make_fragmented()
+
+        content = {
+            i: self.get_file_descriptor(LsCommand(), f"/file{i}").read_content(57)
+            for i in (0, 2)
+        }
+
+        command = DefragCommand()
+        command.exec()
+
+        blocks_map = SystemState().get_blocks_map()
+
+        for blocks in blocks_map.values():
+            self.assertEqual(count_fragments(blocks), 1)
+
+        self.assertEqual(
+            sorted(b for blocks in blocks_map.values() for b in blocks),
+            list(range(sum(map(len, blocks_map.values())))),
+        )
+
+        for i in (0, 2):
+            descriptor = self.get_file_descriptor(LsCommand(), f"/file{i}")
+            self.assertEqual(descriptor.read_content(57), content[i])
+
+    def test_defrag_crash_keeps_files(self) -> None:
+        self._make_fragmented()
+
+        def read_files() -> dict[int, str]:
+            return {
+                i: self.get_file_descriptor(LsCommand(), f"/file{i}").read_content(
+                    BLOCK_CONTENT_SIZE_BYTES + 1
+                )
+                for i in (0, 2)
+            }
+
+        for i in (0, 2):
+            command = OpenCommand(path=f"/file{i}")
+            command.exec()
+            WriteCommand(
+                fd=command.result,
+                offset=0,
+                content=str(i) * (BLOCK_CONTENT_SIZE_BYTES + 1),
+            ).exec()
+
+        content = read_files()
+        command = DefragCommand()
+
+        # Block maps are never replaced, as if the process died after copying.
+        with mock.patch.object(
+            command._system_state, "remap_blocks", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                command.exec()
+
+        self.assertEqual(read_files(), content)
+
+    def test_defrag_moves_fewest(self) -> None:
+        for i in range(5):
+            CreateCommand(path=f"/file{i}").exec()
+
+        UnlinkCommand(path="/file1").exec()
+        blocks_map = SystemState().get_blocks_map()
+
+        command = DefragCommand()
+        command.exec()
+
+        new_blocks_map = SystemState().get_blocks_map()
+        moved = [n for n in new_blocks_map if new_blocks_map[n] != blocks_map[n]]
+
+        self.assertEqual(command.result, 1)
+        self.assertEqual(moved, [SystemState().get_descriptor_id("/file4")])
+        self.assertEqual(new_blocks_map[moved[0]], [2])
+
+    def test_defrag_moves_cycle(self) -> None:
+        CreateCommand(path="/file1").exec()
+
+        command = OpenCommand(path="/file1")
+        command.exec()
+        WriteCommand(
+            fd=command.result,
+            offset=0,
+            content="a" * BLOCK_CONTENT_SIZE_BYTES + "b" * BLOCK_CONTENT_SIZE_BYTES,
+        ).exec()
+
+        # Blocks of the file swapped, each is the target of the other.
+        descriptor_id = SystemState().get_descriptor_id("/file1")
+        blocks = SystemState().get_blocks_map()[descriptor_id]
+        MemoryStorageProxy().move_blocks({blocks[0]: blocks[1], blocks[1]: blocks[0]})
+        SystemState().remap_blocks({descriptor_id: blocks[::-1]})
+        content = self.get_file_descriptor(LsCommand(), "/file1").read_content(
+            BLOCK_CONTENT_SIZE_BYTES * 2
+        )
+
+        command = DefragCommand()
+        command.exec()
+
+        descriptor = self.get_file_descriptor(LsCommand(), "/file1")
+
+        self.assertEqual(command.result, 3)
+        self.assertEqual(SystemState().get_blocks_map()[descriptor_id], blocks)
+        self.assertEqual(descriptor.read_content(BLOCK_CONTENT_SIZE_BYTES * 2), content)
+        self.assertEqual(MemoryStorageProxy().get_used_blocks(), [0, *blocks])
+
+    def test_defrag_packed_is_noop(self) -> None:
+        CreateCommand(path="/file1").exec()
+
+        stats = DefragCommand().run()
+
+        self.assertEqual(stats.block_writes, 0)
+
+    def test_defrag_shrink(self) -> None:
+        self._make_fragmented()
+
+        command = DefragCommand(shrink=True)
+        command.exec()
+
+        n_used = sum(map(len, SystemState().get_blocks_map().values()))
+
+        self.assertEqual(os.path.getsize(MEMORY_PATH), n_used * BLOCK_SIZE_BYTES)
+        self.assertEqual(command._memory_proxy.get_n_blocks(), N_BLOCKS_MAX)
+        self.assertEqual(command._memory_proxy.get_used_blocks(), list(range(n_used)))
+
+        # Blocks cut off the image are still free to use.
+        MkdirCommand(path="/dir1").exec()
+        CreateCommand(path="/dir1/file1").exec()
+
+        command = FragCommand()
+        command.exec()
+
+        self.assertEqual(command.result.used_blocks, n_used + 2)
+        self.assertEqual(command.result.free_blocks, N_BLOCKS_MAX - n_used - 2)
+
+    def test_coalesce_blocks(self) -> None:
+        self.assertEqual(
+            coalesce_blocks([7, 3, 4, 5, 9, 8, 1]), [(1, 1), (3, 3), (7, 3)]
+        )
+
+    def test_truncate_frees_blocks(self) -> None:
+        CreateCommand(path="/file1").exec()
+
+        command = OpenCommand(path="/file1")
+        command.exec()
+        WriteCommand(
+            fd=command.result, offset=0, content="x" * BLOCK_CONTENT_SIZE_BYTES * 4
+        ).exec()
+
+        blocks = SystemState().get_blocks_map()[1]
+        stats = TruncateCommand(path="/file1", size=1).run()
+        freed_blocks = set(blocks) - set(SystemState().get_blocks_map()[1])
+
+        self.assertTrue(freed_blocks)
+
+        memory_proxy = MemoryStorageProxy()
+
+        for block_n in freed_blocks:
+            header, block = memory_proxy.read_block(block_n)
+            self.assertFalse(header.used)
+            self.assertFalse(any(block.content))
+
+        self.assertEqual(
+            stats.holes_punched, len(coalesce_blocks(freed_blocks)) * punch_supported()
+        )
+
+    def test_unlink_frees_blocks(self) -> None:
+        CreateCommand(path="/file1").exec()
+        used_blocks = MemoryStorageProxy().get_used_blocks()
+        file_blocks = SystemState().get_descriptor_blocks(1)
+
+        UnlinkCommand(path="/file1").exec()
+
+        self.assertEqual(current_reclaimer().pending, file_blocks)
+        self.assertEqual(current_reclaimer().drain(), 1)
+        self.assertEqual(
+            len(MemoryStorageProxy().get_used_blocks()), len(used_blocks) - 1
+        )
+
+    def _remount(self, allocation: str) -> None:
+        UmountCommand().exec()
+        MountCommand(allocation=allocation).exec()
+        MkfsCommand(n=N_DESCRIPTORS).exec()
+
+    def _first_block(self, path: str) -> int:
+        system_state = SystemState()
+        descriptor_id = system_state.get_descriptor_id(path)
+
+        return system_state.get_descriptor_blocks(descriptor_id)[0]
+
+    def _make_holes(self, allocation: str) -> None:
+        # Short names keep root directory in its single block, so free
+        # extents are blocks 2-3, block 5 and the tail from block 7.
+        self._remount(allocation)
+
+        for i in range(6):
+            CreateCommand(path=f"/f{i}").exec()
+
+        for i in (1, 2, 4):
+            UnlinkCommand(path=f"/f{i}").exec()
+
+        current_reclaimer().drain()
+        CreateCommand(path="/new").exec()
+
+    def test_first_fit_takes_lowest(self) -> None:
+        self._make_holes(ALLOCATION_FIRST_FIT)
+
+        self.assertEqual(self._first_block("/new"), 2)
+
+    def test_next_fit_rotates(self) -> None:
+        self._make_holes(ALLOCATION_NEXT_FIT)
+
+        self.assertEqual(self._first_block("/new"), 7)
+
+    def test_best_fit_takes_smallest_extent(self) -> None:
+        self._make_holes(ALLOCATION_BEST_FIT)
+
+        self.assertEqual(self._first_block("/new"), 5)
+
+    def test_locality_groups_directories(self) -> None:
+        self._remount(ALLOCATION_LOCALITY)
+
+        for name in ("dir1", "dir2"):
+            MkdirCommand(path=f"/{name}").exec()
+            CreateCommand(path=f"/{name}/file1").exec()
+
+        for name in ("dir1", "dir2"):
+            group = self._first_block(f"/{name}") // ALLOCATION_GROUP_BLOCKS
+
+            self.assertNotEqual(group, 0)
+            self.assertEqual(
+                self._first_block(f"/{name}/file1") // ALLOCATION_GROUP_BLOCKS, group
+            )
+
+    def test_extents_histogram(self) -> None:
+        self.assertEqual(
+            extents_histogram([(0, 1), (5, 9), (20, 2), (30, 3), (40, 1)]),
+            {"1": 2, "2-3": 2, "8-15": 1},
+        )
+
+    def test_frag_report(self) -> None:
+        self._make_fragmented()
+
+        command = FragCommand()
+        command.exec()
+        report = command.result
+
+        self.assertEqual(report.allocation, ALLOCATION_FIRST_FIT)
+        self.assertEqual(report.n_blocks, N_BLOCKS_MAX)
+        self.assertEqual(report.used_blocks + report.free_blocks, N_BLOCKS_MAX)
+        self.assertGreater(report.avg_extents_per_file, 1)
+
+        DefragCommand().exec()
+
+        command = FragCommand()
+        command.exec()
+        report = command.result
+
+        self.assertEqual(report.avg_extents_per_file, 1)
+        self.assertEqual(report.free_extents, 1)
+        self.assertEqual(report.largest_free_extent, report.free_blocks)
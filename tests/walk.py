@@ -0,0 +1,82 @@
+from fs.api.filesystem import FileSystem
+from fs.driver.state import SystemState
+from fs.driver.stats import collect_stats
+from fs.exceptions import DirectoryNotExists
+from fs.models.result import DirectoryEntry
+from tests.conftest import FSBaseMountAndMkfsTestCase
+
+
+class TestFSWalk(FSBaseMountAndMkfsTestCase):
+    def _make_tree(self, fs: FileSystem) -> None:
+        fs.mkdir("/dir1")
+        fs.mkdir("/dir1/sub")
+        fs.mkdir("/dir2")
+        fs.create("/dir1/file1")
+        fs.create("/dir1/sub/file2")
+        fs.symlink("/dir2", "/dir1/link1")
+
+        fd = fs.open("/dir1/file1")
+        fs.write(fd, 0, b"content")
+
+    def test_scandir_reads_no_blocks(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+
+        iterator = fs.scandir("/dir1")
+
+        with collect_stats() as stats:
+            entries = list(iterator)
+
+        self.assertEqual(stats.block_reads, 0)
+        self.assertEqual(
+            [(entry.name, entry.type) for entry in entries],
+            [("file1", "file"), ("link1", "symlink"), ("sub", "directory")],
+        )
+        self.assertEqual(
+            entries[0],
+            DirectoryEntry(name="file1", n=4, type="file", refs_count=1, size=7),
+        )
+
+    def test_walk_topdown_prunes(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+
+        walked = []
+
+        for path, directories, others in fs.walk():
+            walked.append((path, [entry.name for entry in others]))
+            directories[:] = [entry for entry in directories if entry.name != "dir2"]
+
+        self.assertEqual(
+            walked,
+            [("", []), ("/dir1", ["file1", "link1"]), ("/dir1/sub", ["file2"])],
+        )
+
+    def test_walk_bottom_up(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+
+        paths = [path for path, _, _ in fs.walk("/dir1", topdown=False)]
+
+        self.assertEqual(paths, ["/dir1/sub", "/dir1"])
+
+    def test_legacy_volume_reads_headers(self) -> None:
+        fs = FileSystem()
+        self._make_tree(fs)
+
+        with SystemState().state as s:
+            for descriptor_state in s.descriptors:
+                descriptor_state.type = None
+                descriptor_state.size = None
+
+        entries = {entry.name: entry for entry in FileSystem().scandir("/dir1")}
+
+        self.assertEqual(entries["file1"].size, 7)
+        self.assertEqual(entries["sub"].type, "directory")
+
+    def test_scandir_of_file(self) -> None:
+        fs = FileSystem()
+        fs.create("/file1")
+
+        with self.assertRaises(DirectoryNotExists):
+            fs.scandir("/file1")